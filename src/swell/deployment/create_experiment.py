@@ -13,16 +13,17 @@ import datetime
 import os
 import shutil
 import sys
-import yaml
 from typing import Union, Optional
 
 from swell.deployment.prepare_config_and_suite.prepare_config_and_suite import \
      PrepareExperimentConfigAndSuite
 from swell.swell_path import get_swell_path
+from swell.utilities.config import write_task_keys_index
 from swell.utilities.dictionary import add_comments_to_dictionary, dict_get
 from swell.utilities.jinja2 import template_string_jinja2
 from swell.utilities.logger import Logger
 from swell.utilities.slurm import prepare_scheduling_dict
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -44,7 +45,7 @@ def clone_config(
 
     # Open the target experiment YAML. It will be used as the override
     with open(configuration, 'r') as f:
-        override_dict = yaml.safe_load(f)
+        override_dict = load_yaml(f)
 
     # Check that override_dict has a suite key and get the suite name
     if 'suite_to_run' not in override_dict:
@@ -124,7 +125,7 @@ def prepare_config(
         logger.info(f"Reading SLURM directives from {slurm}.")
         assert os.path.exists(slurm)
         with open(slurm, "r") as slurmfile:
-            slurm_dict = yaml.safe_load(slurmfile)
+            slurm_dict = load_yaml(slurmfile)
         # Ensure that SLURM dict is _only_ used for SLURM directives.
         slurm_invalid_keys = set(slurm_dict.keys()).difference({
             "slurm_directives_global",
@@ -136,13 +137,13 @@ def prepare_config(
 
     # Expand all environment vars in the dictionary
     # ---------------------------------------------
-    experiment_dict_string = yaml.dump(experiment_dict, default_flow_style=False, sort_keys=False)
+    experiment_dict_string = dump_yaml(experiment_dict, default_flow_style=False, sort_keys=False)
     experiment_dict_string = os.path.expandvars(experiment_dict_string)
-    experiment_dict = yaml.safe_load(experiment_dict_string)
+    experiment_dict = load_yaml(experiment_dict_string)
 
     # Add comments to dictionary
     # --------------------------
-    experiment_dict_string = yaml.dump(experiment_dict, default_flow_style=False, sort_keys=False)
+    experiment_dict_string = dump_yaml(experiment_dict, default_flow_style=False, sort_keys=False)
 
     experiment_dict_string_comments = add_comments_to_dictionary(logger, experiment_dict_string,
                                                                  comment_dict)
@@ -175,7 +176,7 @@ def create_experiment_directory(
 
     # Load the string using yaml
     # --------------------------
-    experiment_dict = yaml.safe_load(experiment_dict_str)
+    experiment_dict = load_yaml(experiment_dict_str)
 
     # Experiment ID and root from the user input
     # ------------------------------------------
@@ -198,6 +199,11 @@ def create_experiment_directory(
     with open(os.path.join(exp_suite_path, 'experiment.yaml'), 'w') as file:
         file.write(experiment_dict_str)
 
+    # Write the index of the experiment keys each task can access, so that tasks do not need to
+    # parse the task questions
+    # -------------------------------------------------------------------------------------------
+    write_task_keys_index(exp_suite_path)
+
     # At this point we need to write the complete suite file with all templates resolved. Call the
     # function to build the scheduling dictionary, combine with the experiment dictionary,
     # resolve the templates and write the suite file to the experiment suite directory.
@@ -9,9 +9,9 @@
 
 
 import os
-import yaml
 
 from swell.swell_path import get_swell_path
+from swell.utilities.yaml_io import load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -51,7 +51,7 @@ def login_or_compute(platform) -> str:
         return 'login'
 
     with open(properties_file, 'r') as properties_file_open:
-        properties = yaml.safe_load(properties_file_open)
+        properties = load_yaml(properties_file_open)
 
     # Query the hostname by issuing shell command hostname
     hostname = os.popen('hostname').read().strip()
@@ -10,7 +10,6 @@
 
 import copy
 import os
-import yaml
 from typing import Union, Tuple, Optional
 
 from swell.swell_path import get_swell_path
@@ -18,6 +17,7 @@ from swell.deployment.prepare_config_and_suite.question_and_answer_cli import Ge
 from swell.deployment.prepare_config_and_suite.question_and_answer_defaults import GetAnswerDefaults
 from swell.utilities.logger import Logger
 from swell.utilities.jinja2 import template_string_jinja2
+from swell.utilities.yaml_io import load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -124,12 +124,12 @@ class PrepareExperimentConfigAndSuite:
         # Read suite questions into a dictionary
         suite_questions_file = os.path.join(get_swell_path(), 'suites', 'suite_questions.yaml')
         with open(suite_questions_file, 'r') as ymlfile:
-            question_dictionary = yaml.safe_load(ymlfile)
+            question_dictionary = load_yaml(ymlfile)
 
         # Read task questions into a dictionary
         task_questions_file = os.path.join(get_swell_path(), 'tasks', 'task_questions.yaml')
         with open(task_questions_file, 'r') as ymlfile:
-            question_dictionary_tasks = yaml.safe_load(ymlfile)
+            question_dictionary_tasks = load_yaml(ymlfile)
 
         # Loop through question_dictionary_tasks. If the key does not already exist add to the
         # question_dictionary. If the key does exist then only add the tasks key to the existing
@@ -241,7 +241,7 @@ class PrepareExperimentConfigAndSuite:
             platform_dict_file = os.path.join(get_swell_path(), 'deployment', 'platforms',
                                               self.platform, f'{suite_task}_questions.yaml')
             with open(platform_dict_file, 'r') as ymlfile:
-                platform_defaults.update(yaml.safe_load(ymlfile))
+                platform_defaults.update(load_yaml(ymlfile))
 
         # Loop over the keys in self.question_dictionary_model_ind and update with platform_defaults
         # if that dictionary shares the key
@@ -261,7 +261,7 @@ class PrepareExperimentConfigAndSuite:
                                                    'interfaces', model,
                                                    f'{suite_task}_questions.yaml')
                     with open(model_dict_file, 'r') as ymlfile:
-                        model_defaults.update(yaml.safe_load(ymlfile))
+                        model_defaults.update(load_yaml(ymlfile))
 
                 # Loop over the keys in self.question_dictionary_model_ind and update with
                 # model_defaults or platform_defaults if that dictionary shares the key
@@ -296,7 +296,7 @@ class PrepareExperimentConfigAndSuite:
                                  self.suite + '-tier1.yaml')
         if os.path.exists(test_file):
             with open(test_file, 'r') as ymlfile:
-                override_dict = yaml.safe_load(ymlfile)
+                override_dict = load_yaml(ymlfile)
 
         # Now append with any user provided override
         if self.override is not None:
@@ -305,7 +305,7 @@ class PrepareExperimentConfigAndSuite:
                 override_dict.update(self.override)
             elif isinstance(self.override, str):
                 with open(self.override, 'r') as ymlfile:
-                    override_dict.update(yaml.safe_load(ymlfile))
+                    override_dict.update(load_yaml(ymlfile))
             else:
                 self.logger.abort(f'Override must be a dictionary or a path to a yaml file.')
 
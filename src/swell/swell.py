@@ -12,16 +12,17 @@ import click
 from typing import Union, Optional, Literal
 
 from swell.deployment.platforms.platforms import get_platforms
-from swell.deployment.create_experiment import clone_config, create_experiment_directory
-from swell.deployment.launch_experiment import launch_experiment
 from swell.tasks.base.task_base import task_wrapper, get_tasks
 from swell.test.test_driver import test_wrapper, valid_tests
-from swell.test.suite_tests.suite_tests import run_suite
 from swell.utilities.suite_utils import get_suites
 from swell.utilities.welcome_message import write_welcome_message
 from swell.utilities.scripts.utility_driver import get_utilities, utility_wrapper
 
 
+# Note that the modules behind create, clone, launch and t1test (and the interactive question
+# packages they use) are imported inside the commands. Every cylc job runs 'swell task' so the
+# imports at the top of this file are kept to what the command line itself needs.
+
 # --------------------------------------------------------------------------------------------------
 
 
@@ -77,6 +78,8 @@ model_help = 'Data assimilation system. I.e. the model being initialized by data
 ensemble_help = 'When handling ensemble workflows using a parallel strategy, ' + \
                 'specify which packet of ensemble members to consider.'
 
+server_stop_help = 'Stop the task server of the experiment.'
+
 slurm_help = """
 Customize SLURM directives, globally (e.g., account name), for specific tasks,
 or for task-model combinations.
@@ -112,6 +115,8 @@ def create(
         suite (str): Name of the suite you wish to run. \n
 
     """
+    from swell.deployment.create_experiment import create_experiment_directory
+
     # Create the experiment directory
     create_experiment_directory(suite, input_method, platform, override, advanced, slurm)
 
@@ -143,6 +148,8 @@ def clone(
         clone from. \n
 
     """
+    from swell.deployment.create_experiment import clone_config, create_experiment_directory
+
     # Create experiment configuration by cloning from existing experiment
     experiment_dict_str = clone_config(configuration, experiment_id, input_method, platform,
                                        advanced)
@@ -172,6 +179,8 @@ def launch(
         suite_path (str): Path to where the flow.cylc and associated suite files are located. \n
 
     """
+    from swell.deployment.launch_experiment import launch_experiment
+
     launch_experiment(suite_path, no_detach, log_path)
 
 
@@ -207,6 +216,36 @@ def task(
 # --------------------------------------------------------------------------------------------------
 
 
+@swell_driver.command()
+@click.argument('config')
+@click.option('--stop', 'stop', is_flag=True, default=False, help=server_stop_help)
+def server(
+    config: str,
+    stop: bool
+) -> None:
+    """
+    Run a task server for an experiment
+
+    This command starts a server that keeps swell loaded for the tasks of an experiment. While it
+    runs, 'swell task' commands of short tasks (links, moves and cleans) using the same
+    configuration file are executed by the server, avoiding the start up cost of a new process for
+    every task. Other tasks run in their own process as usual.
+
+    Arguments:\n
+        config (str): Path to the experiment configuration file used by the tasks.\n
+
+    """
+    from swell.tasks.base.task_server import serve_tasks, stop_task_server
+
+    if stop:
+        stop_task_server(config)
+    else:
+        serve_tasks(config)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
 @swell_driver.command()
 @click.argument('utility', type=click.Choice(get_utilities()))
 def utility(utility: str) -> None:
@@ -252,6 +291,8 @@ def t1test(suite: Literal["hofx", "3dvar", "ufo_testing"]) -> None:
     Arguments:
         suite (str): Name of the suite to run (e.g., hofx, 3dvar, ufo_testing)
     """
+    from swell.test.suite_tests.suite_tests import run_suite
+
     run_suite(suite)
 
 
@@ -10,13 +10,15 @@
 
 
 # standard imports
+from __future__ import annotations
 from abc import ABC, abstractmethod
 import glob
 import importlib
 import os
+import sys
 import time
 from datetime import datetime as dt
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Union, Optional
 
 # swell imports
 from swell.swell_path import get_swell_path
@@ -25,8 +27,19 @@ from swell.utilities.config import Config
 from swell.utilities.data_assimilation_window_params import DataAssimilationWindowParams
 from swell.utilities.datetime_util import Datetime
 from swell.utilities.logger import Logger
-from swell.utilities.render_jedi_interface_files import JediConfigRendering
-from swell.utilities.geos import Geos
+from swell.tasks.base.task_server import dispatch_task
+
+# The JEDI rendering and GEOS helpers depend on numpy, netCDF4, f90nml and jinja2. They are only
+# imported when a task first uses them so that simple tasks start quickly.
+if TYPE_CHECKING:
+    from swell.utilities.render_jedi_interface_files import JediConfigRendering
+    from swell.utilities.geos import Geos
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Directory of the cycle where rendered JEDI configurations are cached when requested
+rendered_cache_dir_name = 'rendered_config_cache'
 
 
 # --------------------------------------------------------------------------------------------------
@@ -72,7 +85,9 @@ class taskBase(ABC):
 
         # Create a configuration object
         # -----------------------------
+        config_start = time.perf_counter()
         self.config = Config(config_input, self.logger, task_name, self.__model__)
+        self.config_construction_time = time.perf_counter() - config_start
 
         # All experiment have the experiment root and id and suite
         # --------------------------------------------------------
@@ -102,15 +117,11 @@ class taskBase(ABC):
                 cycle_dir = self.cycle_dir()
                 os.makedirs(cycle_dir, 0o755, exist_ok=True)
 
-        # Add JEDI config rendering helper
-        # --------------------------------
-        self.jedi_rendering = JediConfigRendering(self.logger, self.__experiment_root__,
-                                                  self.__experiment_id__, cycle_dir,
-                                                  self.__datetime__, self.__model__)
-
-        # Add GEOS utils
-        # --------------
-        self.geos = Geos(self.logger, self.cycle_forecast_dir)
+        # JEDI config rendering and GEOS helpers are created on first use
+        # ---------------------------------------------------------------
+        self.__cycle_dir__ = cycle_dir
+        self.__jedi_rendering__ = None
+        self.__geos__ = None
 
         # Create some extra helpers available when the datetime is present
         # ----------------------------------------------------------------
@@ -122,6 +133,46 @@ class taskBase(ABC):
 
     # ----------------------------------------------------------------------------------------------
 
+    # JEDI config rendering helper
+    @property
+    def jedi_rendering(self) -> JediConfigRendering:
+
+        if self.__jedi_rendering__ is None:
+
+            from swell.utilities.render_jedi_interface_files import JediConfigRendering
+
+            # Rendered configurations are only cached on disk, for the later tasks of the cycle,
+            # when requested. CleanCycle removes the cache.
+            rendered_cache_dir = None
+            if self.__cycle_dir__ is not None and self.config.__rendered_config_disk_cache__:
+                rendered_cache_dir = os.path.join(self.__cycle_dir__, rendered_cache_dir_name)
+
+            self.__jedi_rendering__ = JediConfigRendering(self.logger, self.__experiment_root__,
+                                                          self.__experiment_id__,
+                                                          self.__cycle_dir__, self.__datetime__,
+                                                          self.__model__,
+                                                          os.path.join(self.experiment_path(),
+                                                                       'run', 'jinja2_cache'),
+                                                          rendered_cache_dir)
+
+        return self.__jedi_rendering__
+
+    # ----------------------------------------------------------------------------------------------
+
+    # GEOS utils
+    @property
+    def geos(self) -> Geos:
+
+        if self.__geos__ is None:
+
+            from swell.utilities.geos import Geos
+
+            self.__geos__ = Geos(self.logger, self.cycle_forecast_dir)
+
+        return self.__geos__
+
+    # ----------------------------------------------------------------------------------------------
+
     # Execute is the place where a task does its work. It's defined as abstract in the base class
     # in order to force the sub classes (tasks) to implement it.
     @abstractmethod
@@ -306,12 +357,33 @@ def task_wrapper(
     ensemblePacket: Optional[str]
 ) -> None:
 
+    # Run short tasks on the experiment's task server if one is running (see task_server.py)
+    exit_code = dispatch_task(task, config, datetime, model, ensemblePacket)
+
+    if exit_code is None:
+        run_task(task, config, datetime, model, ensemblePacket)
+    elif exit_code != 0:
+        sys.exit(exit_code)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def run_task(
+    task: str,
+    config: str,
+    datetime: Union[str, dt, None],
+    model: Optional[str],
+    ensemblePacket: Optional[str]
+) -> None:
+
     # Create the object
     constrc_start = time.perf_counter()
     creator = taskFactory()
     task_object = creator.create_task(task, config, datetime, model, ensemblePacket)
     constrc_final = time.perf_counter()
     constrc_time = f'Constructed in {constrc_final - constrc_start:0.4f} seconds'
+    config_time = f'  Config constructed in {task_object.config_construction_time:0.4f} seconds'
 
     # Execute task
     execute_start = time.perf_counter()
@@ -325,6 +397,7 @@ def task_wrapper(
     task_object.logger.info('-----------------------------')
     task_object.logger.info('Timing statistics:')
     task_object.logger.info(constrc_time)
+    task_object.logger.info(config_time)
     task_object.logger.info(execute_time)
     task_object.logger.info('-----------------------------')
 
@@ -0,0 +1,436 @@
+# (C) Copyright 2021- United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+
+
+# --------------------------------------------------------------------------------------------------
+#
+#  Optional task server for an experiment. Every cylc job normally runs 'swell task' in a new
+#  Python process, which re-imports swell and its dependencies and re-reads the experiment
+#  configuration. When a server has been started with
+#
+#    swell server <path_to_experiment.yaml>
+#
+#  task_wrapper sends the short tasks listed in server_tasks (links, moves and cleans, for which
+#  the start up dominates the run time) to the server instead. The server keeps these task modules
+#  imported and the configuration parsed, and forks a new process for each task so that a failing
+#  task cannot affect the server or other tasks. The output of the task goes to the output of the
+#  cylc job and the job exits with the exit code of the task. Other tasks, and all tasks when no
+#  server is running, run in the job process as usual. Long running tasks (e.g. running JEDI or
+#  transferring files with R2D2) gain nothing from the server and are kept out of it so that they
+#  get a process of their own, with the resources of their job, rather than a copy of the server.
+#
+#  Tasks run in processes forked from the server, so they run in the cgroup and with the resource
+#  limits of the server (e.g. of the node or batch job where it was started) rather than those of
+#  the cylc job, and they take the working directory and the whole environment sent by the client.
+#  The server therefore only accepts tasks from the user running it: the socket is created with
+#  mode 0600 and connections from processes of other users are closed without running anything.
+#  The job likewise only sends a task (with its environment and output) to a socket file of its
+#  own user, held by a process of its own user, and otherwise runs the task itself.
+#
+# --------------------------------------------------------------------------------------------------
+
+
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import traceback
+from typing import Optional
+
+from swell.utilities.logger import Logger
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Format of the header giving the length of a request
+header_format = '!Q'
+
+# Short tasks that are run by the task server when there is one
+server_tasks = [
+    'BuildGeosByLinking',
+    'BuildJediByLinking',
+    'CleanCycle',
+    'GenerateBClimatologyByLinking',
+    'LinkGeosOutput',
+    'MoveDaRestart',
+    'MoveForecastRestart',
+    'RemoveForecastDir',
+    'SaveRestart',
+]
+
+# Modules that tasks import on first use of the JEDI rendering and GEOS helpers
+preload_modules = ['swell.utilities.render_jedi_interface_files', 'swell.utilities.geos']
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def user_socket_dir() -> str:
+
+    '''
+        Function returns a directory for the sockets of the user. It is only used when it belongs
+        to the user and no one else can access it, so that another user cannot put a socket in the
+        place of the server. PermissionError is raised otherwise.
+    '''
+
+    socket_dir = os.environ.get('XDG_RUNTIME_DIR')
+
+    if not socket_dir:
+        socket_dir = os.path.join(tempfile.gettempdir(), f'swell-{os.getuid()}')
+        try:
+            os.mkdir(socket_dir, 0o700)
+        except FileExistsError:
+            pass
+
+    socket_dir_stat = os.lstat(socket_dir)
+    if not stat.S_ISDIR(socket_dir_stat.st_mode) or socket_dir_stat.st_uid != os.getuid() or \
+       socket_dir_stat.st_mode & 0o077:
+        raise PermissionError(f'Directory {socket_dir} for the task server socket must be a ' +
+                              'directory that only the user can access')
+
+    return socket_dir
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def task_server_socket(config: str) -> str:
+
+    # The server of an experiment listens next to the experiment configuration
+    config_dir = os.path.dirname(os.path.realpath(config))
+    socket_path = os.path.join(config_dir, 'task_server.sock')
+
+    # Paths of Unix sockets are limited to about 100 characters
+    if len(socket_path) > 100:
+        config_dir_hash = hashlib.sha1(config_dir.encode()).hexdigest()[:16]
+        socket_path = os.path.join(user_socket_dir(), f'swell_task_server_{config_dir_hash}.sock')
+
+    return socket_path
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def peer_uid(connection: socket.socket) -> int:
+
+    # User of the process at the other end of a Unix socket connection
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                        struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', credentials)
+
+    return uid
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def send_request(
+    config: str,
+    request: dict,
+    fds: Optional[list] = None
+) -> Optional[socket.socket]:
+
+    # Nothing to do if the experiment has no server, or if the socket is not one of a server of
+    # the user
+    try:
+        socket_stat = os.lstat(task_server_socket(config))
+    except OSError:
+        return None
+
+    if not stat.S_ISSOCK(socket_stat.st_mode) or socket_stat.st_uid != os.getuid():
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # The request is a header with its length (sent with any file descriptors) and the JSON
+    # encoded request. A server that is gone or not accepting is the same as no server.
+    try:
+        client.connect(task_server_socket(config))
+        if peer_uid(client) != os.getuid():
+            client.close()
+            return None
+        request_bytes = json.dumps(request).encode()
+        socket.send_fds(client, [struct.pack(header_format, len(request_bytes))], fds or [])
+        client.sendall(request_bytes)
+    except OSError:
+        client.close()
+        return None
+
+    return client
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def receive_int(connection: socket.socket) -> Optional[int]:
+
+    # Integer sent by the server on a line of its own, None if the connection closed first or
+    # the line is not an integer
+    line = b''
+    while not line.endswith(b'\n'):
+        data = connection.recv(1)
+        if not data:
+            return None
+        line += data
+
+    try:
+        return int(line.decode().strip())
+    except ValueError:
+        return None
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def dispatch_task(
+    task: str,
+    config: str,
+    datetime: Optional[str],
+    model: Optional[str],
+    ensemblePacket: Optional[str]
+) -> Optional[int]:
+
+    '''
+        Function runs the task on the task server of the experiment and returns the exit code of
+        the task. None is returned when there is no server or the task is not one of the tasks run
+        by the server, in which case the caller runs the task.
+    '''
+
+    if task not in server_tasks:
+        return None
+
+    request = {
+        'command': 'run',
+        'task': task,
+        'config': os.path.realpath(config),
+        'datetime': None if datetime is None else str(datetime),
+        'model': model,
+        'ensemblePacket': ensemblePacket,
+        'cwd': os.getcwd(),
+        'environment': dict(os.environ),
+    }
+
+    # Pass the standard output and error of the process so the task writes to the output of
+    # this job
+    sys.stdout.flush()
+    sys.stderr.flush()
+    client = send_request(config, request, [1, 2])
+
+    if client is None:
+        return None
+
+    with client:
+
+        # The server replies with the process id of the task, then its exit code. Only a process
+        # id (not 0 or a negative process group) is ever signalled.
+        task_pid = receive_int(client)
+        if task_pid is None or task_pid <= 0:
+            return 1
+
+        # If the job is killed, kill the task as well
+        def forward_signal(signum: int, frame: object) -> None:
+            os.kill(task_pid, signum)
+            sys.exit(128 + signum)
+
+        signal.signal(signal.SIGTERM, forward_signal)
+        signal.signal(signal.SIGINT, forward_signal)
+
+        # No exit code means that the task process died
+        exit_code = receive_int(client)
+
+    return 1 if exit_code is None else exit_code
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def stop_task_server(config: str) -> None:
+
+    logger = Logger('TaskServer')
+
+    client = send_request(config, {'command': 'stop'})
+
+    if client is None:
+        logger.info(f'No task server is running for {config}')
+    else:
+        client.close()
+        logger.info(f'Stopping the task server for {config}')
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def run_task_in_process(request: dict) -> int:
+
+    from swell.tasks.base.task_base import run_task
+
+    # Run the task and turn the way it ended into an exit code, as the interpreter would
+    try:
+        run_task(request['task'], request['config'], request['datetime'], request['model'],
+                 request['ensemblePacket'])
+        exit_code = 0
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    return exit_code
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class TaskRequestHandler(socketserver.BaseRequestHandler):
+
+    # Each request is handled in a process forked from the server
+    def handle(self) -> None:
+
+        # The server stops on SIGTERM, the task should not
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        # Read the request. Connections that close without a request (e.g. a new server checking
+        # whether this one is alive) are ignored.
+        header, fds, _, _ = socket.recv_fds(self.request, struct.calcsize(header_format), 2)
+        if len(header) < struct.calcsize(header_format):
+            for fd in fds:
+                os.close(fd)
+            return
+
+        request_length = struct.unpack(header_format, header)[0]
+
+        request_bytes = b''
+        while len(request_bytes) < request_length:
+            data = self.request.recv(request_length - len(request_bytes))
+            if not data:
+                return
+            request_bytes += data
+
+        request = json.loads(request_bytes)
+
+        if request['command'] == 'stop':
+            os.kill(os.getppid(), signal.SIGTERM)
+            return
+
+        # Take on the output, working directory and environment of the job
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, std_fd in zip(fds, [1, 2]):
+            os.dup2(fd, std_fd)
+            os.close(fd)
+
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['environment'])
+
+        self.request.sendall(f'{os.getpid()}\n'.encode())
+
+        exit_code = run_task_in_process(request)
+
+        self.request.sendall(f'{exit_code}\n'.encode())
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class TaskServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+
+    # Allow as many tasks at once as cylc submits
+    max_children = 256
+
+    # ----------------------------------------------------------------------------------------------
+
+    def verify_request(self, request: socket.socket, client_address: str) -> bool:
+
+        # Only run tasks for processes of the user running the server
+        return peer_uid(request) == os.getuid()
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def serve_tasks(config: str) -> None:
+
+    from swell.utilities.case_switching import camel_case_to_snake_case
+    from swell.utilities.config import get_task_keys, read_experiment_dict
+
+    logger = Logger('TaskServer')
+
+    # Only one server per experiment, but a socket left behind by a server that died is removed
+    try:
+        socket_path = task_server_socket(config)
+    except PermissionError as e:
+        logger.abort(str(e))
+
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            logger.abort(f'A task server is already listening on {socket_path}')
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+        finally:
+            probe.close()
+
+    # Warm up: read the experiment configuration and import the tasks run by the server
+    config = os.path.realpath(config)
+    read_experiment_dict(config)
+    get_task_keys(config, '')
+
+    for module in preload_modules:
+        importlib.import_module(module)
+
+    for task in server_tasks:
+        try:
+            importlib.import_module('swell.tasks.' + camel_case_to_snake_case(task))
+        except ImportError as e:
+            logger.info(f'Task {task} will be imported when it runs ({e})')
+
+    # Create the socket readable and writable by the user only
+    umask = os.umask(0o177)
+    try:
+        server = TaskServer(socket_path, TaskRequestHandler)
+    finally:
+        os.umask(umask)
+
+    # Serve until stopped. The signal can arrive anywhere in the server (where an exception
+    # raised by the handler may be ignored), so serve_forever is asked to return instead. The
+    # shutdown waits for serve_forever to return and so cannot be called from the handler itself.
+    def stop(signum: int, frame: object) -> None:
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+
+    logger.info(f'Task server for {config} listening on {socket_path}')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.remove(socket_path)
+        server.server_close()
+        logger.info('Task server stopped')
+
+
+# --------------------------------------------------------------------------------------------------
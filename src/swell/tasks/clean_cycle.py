@@ -8,7 +8,8 @@
 # --------------------------------------------------------------------------------------------------
 
 import os
-from swell.tasks.base.task_base import taskBase
+import shutil
+from swell.tasks.base.task_base import rendered_cache_dir_name, taskBase
 import glob
 
 # --------------------------------------------------------------------------------------------------
@@ -27,6 +28,12 @@ class CleanCycle(taskBase):
 
     def execute(self) -> None:
 
+        # Remove the rendered JEDI configurations cached by the tasks of the cycle
+        rendered_cache_dir = os.path.join(self.cycle_dir(), rendered_cache_dir_name)
+        if os.path.isdir(rendered_cache_dir):
+            self.logger.info(f'Removing item {rendered_cache_dir}')
+            shutil.rmtree(rendered_cache_dir)
+
         # Parse config
         clean_patterns = self.config.clean_patterns(None)
 
@@ -9,12 +9,12 @@
 
 
 import os
-import yaml
 
 from eva.eva_driver import eva
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.jinja2 import template_string_jinja2
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -47,14 +47,14 @@ class EvaJediLog(taskBase):
 
         # Override the eva dictionary
         eva_str = template_string_jinja2(self.logger, eva_str_template, eva_override)
-        eva_dict = yaml.safe_load(eva_str)
+        eva_dict = load_yaml(eva_str)
 
         # Write eva dictionary to file
         # ----------------------------
         conf_output = os.path.join(self.cycle_dir(), 'eva', 'jedi_log', 'jedi_log_eva.yaml')
         os.makedirs(os.path.dirname(conf_output), exist_ok=True)
         with open(conf_output, 'w') as outfile:
-            yaml.dump(eva_dict, outfile, default_flow_style=False)
+            dump_yaml(eva_dict, outfile, default_flow_style=False)
 
         # Call eva
         # --------
@@ -10,7 +10,6 @@
 
 from multiprocessing import Pool
 import os
-import yaml
 
 from eva.eva_driver import eva
 
@@ -19,7 +18,9 @@ from swell.tasks.base.task_base import taskBase
 from swell.utilities.dictionary import remove_matching_keys, replace_string_in_dictionary
 from swell.utilities.jinja2 import template_string_jinja2
 from swell.utilities.observations import ioda_name_to_long_name
-from swell.utilities.run_jedi_executables import check_obs
+from swell.utilities.obs_manifest import obs_output_file
+from swell.utilities.run_jedi_executables import check_obs_batch
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -90,30 +91,30 @@ class EvaObservations(taskBase):
         # Set the observing system records path
         self.jedi_rendering.set_obs_records_path(self.config.observing_system_records_path(None))
 
-        for observation in self.config.observations():
+        # Load the observation dictionaries and check which observations were used
+        observations = self.config.observations()
+        observation_dicts = self.jedi_rendering.render_interface_observations_batch(observations)
+        use_observations = check_obs_batch(self.jedi_rendering.observing_system_records_path,
+                                           observation_dicts, self.cycle_time_dto())
 
-            # Load the observation dictionary
-            observation_dict = self.jedi_rendering.render_interface_observations(observation)
+        for observation, observation_dict in observation_dicts.items():
 
-            # Check if observation was used
-            use_obs = check_obs(self.jedi_rendering.observing_system_records_path, observation,
-                                observation_dict, self.cycle_time_dto())
-            if not use_obs:
+            # Skip observations that were not used
+            if not use_observations[observation]:
                 continue
 
             # Split the full path into path and filename
             obs_path_file = observation_dict['obs space']['obsdataout']['engine']['obsfile']
             cycle_dir, obs_file = os.path.split(obs_path_file)
 
-            # Check for need to add 0000 to the file
-            # --------------------------------------
-            if not os.path.exists(obs_path_file):
+            # File written by the executable, which can have a _0000 suffix
+            # -------------------------------------------------------------
+            obs_path_file_out = obs_output_file(obs_path_file)
+            if obs_path_file_out is None:
                 obs_path_file_name, obs_path_file_ext = os.path.splitext(obs_path_file)
-                obs_path_file_0000 = obs_path_file_name + '_0000' + obs_path_file_ext
-                if not os.path.exists(obs_path_file_0000):
-                    self.logger.abort(f'No observation file found for {obs_path_file} or ' +
-                                      f'{obs_path_file_0000}')
-                obs_path_file = obs_path_file_0000
+                self.logger.abort(f'No observation file found for {obs_path_file} or ' +
+                                  f'{obs_path_file_name}_0000{obs_path_file_ext}')
+            obs_path_file = obs_path_file_out
 
             # Get instrument ioda and full name
             # ---------------------------------
@@ -164,7 +165,7 @@ class EvaObservations(taskBase):
             # Override the eva dictionary
             # ---------------------------
             eva_str = template_string_jinja2(self.logger, eva_str_template, eva_override)
-            eva_dict = yaml.safe_load(eva_str)
+            eva_dict = load_yaml(eva_str)
 
             # Remove channel keys if not needed
             # ---------------------------------
@@ -178,7 +179,7 @@ class EvaObservations(taskBase):
             conf_output = os.path.join(self.cycle_dir(), 'eva', ioda_name, ioda_name+'_eva.yaml')
             os.makedirs(os.path.dirname(conf_output), exist_ok=True)
             with open(conf_output, 'w') as outfile:
-                yaml.dump(eva_dict, outfile, default_flow_style=False)
+                dump_yaml(eva_dict, outfile, default_flow_style=False)
 
             # Add eva dictionary to list
             # --------------------------
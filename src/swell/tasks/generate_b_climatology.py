@@ -6,12 +6,12 @@
 
 # -----------------------------------------------
 import os
-import yaml
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.shell_commands import run_subprocess, run_track_log_subprocess
 from swell.utilities.run_jedi_executables import jedi_dictionary_iterator
 from swell.utilities.file_system_operations import check_if_files_exist_in_path
+from swell.utilities.yaml_io import dump_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -75,7 +75,7 @@ class GenerateBClimatology(taskBase):
         jedi_config_dict = self.generate_jedi_config()
 
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Get the JEDI interface metadata
         # -------------------------------
@@ -138,7 +138,7 @@ class GenerateBClimatology(taskBase):
         # Write the expanded dictionary to YAML file
         # ------------------------------------------
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Source JEDI modules (scipy and numpy dependent) and execute calc_scales.py
         # Could be a generalized function depending on the repeated use of this
@@ -188,7 +188,7 @@ class GenerateBClimatology(taskBase):
         jedi_dictionary_iterator(jedi_config_dict, self.jedi_rendering)
 
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Get the JEDI interface metadata
         # -------------------------------
@@ -9,7 +9,7 @@
 
 
 from swell.tasks.base.task_base import taskBase
-from swell.utilities.r2d2 import create_r2d2_config
+from swell.utilities.r2d2 import create_r2d2_config, R2D2TransferPool
 
 import isodate
 import os
@@ -33,6 +33,10 @@ class GetBackground(taskBase):
 
         """Acquires background files for a given experiment and cycle
 
+           The files of every fc entry and background step are fetched concurrently by a bounded
+           pool of workers (r2d2_transfer_workers), with each fetch retried up to
+           r2d2_transfer_attempts times.
+
            Parameters
            ----------
              All inputs are extracted from the JEDI experiment file configuration.
@@ -52,6 +56,8 @@ class GetBackground(taskBase):
         window_offset = self.config.window_offset()
         window_type = self.config.window_type()
         r2d2_local_path = self.config.r2d2_local_path()
+        r2d2_transfer_workers = self.config.r2d2_transfer_workers(8)
+        r2d2_transfer_attempts = self.config.r2d2_transfer_attempts(3)
 
         # Get window parameters
         local_background_time = self.da_window_params.local_background_time(window_offset,
@@ -125,6 +131,10 @@ class GetBackground(taskBase):
         # Get r2d2 dictionary
         r2d2_dict = self.jedi_rendering.render_interface_model('r2d2')
 
+        # Pool of workers that fetches all the background files from R2D2 concurrently
+        # ----------------------------------------------------------------------------
+        fetch_pool = R2D2TransferPool(self.logger, r2d2_transfer_workers, r2d2_transfer_attempts)
+
         # Loop over fc
         # ------------
         for fc in r2d2_dict['fetch']['fc']:
@@ -146,18 +156,20 @@ class GetBackground(taskBase):
                 # ---------------------------------------------------
                 target_file = background_time.strftime(target_file_template)
 
-                fetch(
-                    date=forecast_start_time,
-                    target_file=target_file,
-                    model=r2d2_model_dict[model_component],
-                    file_type=file_type,
-                    fc_date_rendering='analysis',
-                    step=bkg_step,
-                    resolution=horizontal_resolution,
-                    type='fc',
-                    experiment=background_experiment)
-
-                # Change permission
-                os.chmod(target_file, 0o644)
+                fetch_pool.add(target_file, fetch,
+                               date=forecast_start_time,
+                               target_file=target_file,
+                               model=r2d2_model_dict[model_component],
+                               file_type=file_type,
+                               fc_date_rendering='analysis',
+                               step=bkg_step,
+                               resolution=horizontal_resolution,
+                               type='fc',
+                               experiment=background_experiment)
+
+        # Fetch all the files and change the permission of each as soon as it is fetched
+        # ------------------------------------------------------------------------------
+        for target_file in fetch_pool.run():
+            os.chmod(target_file, 0o644)
 
 # --------------------------------------------------------------------------------------------------
@@ -11,11 +11,17 @@ import isodate
 import numpy as np
 import os
 import netCDF4 as nc
-from typing import Union
+import time
+from contextlib import ExitStack
+from multiprocessing import Pool
+from typing import Tuple, Union
 
 from datetime import timedelta, datetime as dt
+from swell.deployment.platforms.platforms import login_or_compute
 from swell.tasks.base.task_base import taskBase
-from swell.utilities.r2d2 import create_r2d2_config
+from swell.utilities.logger import Logger
+from swell.utilities.obs_manifest import add_to_manifest, manifest_entry
+from swell.utilities.r2d2 import create_r2d2_config, R2D2TransferPool
 from swell.utilities.datetime_util import datetime_formats
 from r2d2 import fetch
 
@@ -23,6 +29,157 @@ from r2d2 import fetch
 # --------------------------------------------------------------------------------------------------
 
 
+def read_and_combine(
+    logger: Logger,
+    input_filenames: list,
+    output_filename: str,
+    block_elements: int = 4194304
+) -> None:
+
+    '''
+    Combines multiple IODA v3 netcdf input files into a single output.
+    Combining multiple files require final (total) location dimension size to be
+    calculated in advance.
+
+    Basically, this function creates an output file that duplicates the first
+    input file's attributes and then fills with appended data from the input files.
+
+    Each input file is opened only once. The Location offset of every input file in
+    the output is computed up front so that each variable can be streamed, a block of
+    locations at a time, directly into its slice of the pre-sized output variable. The
+    memory needed is therefore bounded by the block size rather than the total number
+    of locations.
+
+    Channel dimension shows up as a second dimension and sometimes as a single
+    dimension. Both cases require special handling and introduces additional
+    exceptions to the code. Final channel dimension size remains the same.
+    '''
+
+    # Create a new file for writing, remove the file if it already exists
+    # --------------------------------------------------------------------------
+    logger.info(f"Creating file {output_filename}")
+    if os.path.exists(output_filename):
+        os.remove(output_filename)
+
+    logger.info(f"Combining files {input_filenames} ")
+
+    with ExitStack() as stack:
+
+        # Open all the input files once, they stay open for the duration of the combine
+        # -----------------------------------------------------------------------------
+        in_datasets = [stack.enter_context(nc.Dataset(input_filename, 'r'))
+                       for input_filename in input_filenames]
+
+        # Get the total dimension size for each dimension. Location requires special
+        # handling to get the cumulative sum of the dimension size and the offset of
+        # each input file in the output file
+        # ---------------------------------------------------------------------------
+        out_dim_size = {'Location': 0}
+        location_offsets = []
+        for ds in in_datasets:
+            location_offsets.append(out_dim_size['Location'])
+            for dim_name, dim in ds.dimensions.items():
+                if dim_name == 'Location':
+                    out_dim_size[dim_name] += dim.size
+                else:
+                    out_dim_size[dim_name] = dim.size
+
+        with nc.Dataset(output_filename, 'w') as out_ds:
+
+            # Create an output file template based on the first input file
+            # ------------------------------------------------------------
+            ds = in_datasets[0]
+
+            for dim_name, dim in ds.dimensions.items():
+                out_ds.createDimension(dim_name, out_dim_size[dim_name])
+
+            # Loop through groups and process variables
+            # -----------------------------------------
+            for group_name, group in ds.groups.items():
+
+                # Create the groups in output file
+                # --------------------------------
+                out_group = out_ds.createGroup(group_name)
+
+                # Loop over variables from input files, combine, and write to the new file
+                # ------------------------------------------------------------------------
+                for var_name, var in group.variables.items():
+
+                    # Get the dimensions of the variable
+                    # ----------------------------------
+                    var_dims = var.dimensions
+
+                    # Fill value needs to be assigned while creating variables
+                    # --------------------------------------------------------
+                    fill_value = None
+                    if '_FillValue' in var.ncattrs():
+                        fill_value = var.getncattr('_FillValue')
+
+                    out_var = out_group.createVariable(var_name, var.dtype, var_dims,
+                                                       fill_value=fill_value)
+                    for attr_name in var.ncattrs():
+                        if attr_name == '_FillValue':
+                            continue
+                        out_var.setncattr(attr_name, var.getncattr(attr_name))
+
+                    # Data is copied as stored, without masking or scaling
+                    # -----------------------------------------------------
+                    out_var.set_auto_maskandscale(False)
+
+                    # Channel dimensions remain the same, so only the first file is copied
+                    # ---------------------------------------------------------------------
+                    if var_dims[0] != 'Location':
+                        var.set_auto_maskandscale(False)
+                        out_var[...] = var[...]
+                        continue
+
+                    # Number of locations to copy at a time for this variable
+                    # ---------------------------------------------------------
+                    row_size = int(np.prod(var.shape[1:]))
+                    block_size = max(1, block_elements // max(1, row_size))
+
+                    # Stream each input file into its slice of the output variable
+                    # ------------------------------------------------------------
+                    for in_ds, location_offset in zip(in_datasets, location_offsets):
+                        in_var = in_ds[group_name][var_name]
+                        in_var.set_auto_maskandscale(False)
+                        nlocs = in_var.shape[0]
+                        for block_begin in range(0, nlocs, block_size):
+                            block_end = min(block_begin + block_size, nlocs)
+                            out_var[location_offset + block_begin:
+                                    location_offset + block_end, ...] = \
+                                in_var[block_begin:block_end, ...]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def combine_observation_files(
+    logger: Logger,
+    observation: str,
+    input_filenames: list,
+    output_filename: str
+) -> Tuple[str, float, dict]:
+
+    # Combine (or rename if there is only one sub-window) the observation files. This is run
+    # by the worker processes of the combine pool so returns the time spent for reporting, and
+    # the manifest entry of the combined file so that its checksum is computed in the worker
+    combine_start = time.perf_counter()
+
+    if len(input_filenames) == 1:
+        os.rename(input_filenames[0], output_filename)
+    else:
+        read_and_combine(logger, input_filenames, output_filename)
+
+    # Change permission
+    os.chmod(output_filename, 0o644)
+
+    return observation, time.perf_counter() - combine_start, manifest_entry(output_filename, 'obs')
+
+
+# --------------------------------------------------------------------------------------------------
+
+
 class GetObservations(taskBase):
 
     def execute(self) -> None:
@@ -80,6 +237,13 @@ class GetObservations(taskBase):
                 ------------------------------------------------------------------------------------
         output:                                                FILE1
 
+        All the files (observations, bias coefficients, covariances, time lapse and aircraft
+        bias files) are listed up front and fetched concurrently by a bounded pool of workers
+        (r2d2_transfer_workers), with each fetch retried up to r2d2_transfer_attempts times.
+        The files of an observation are combined as soon as all of its fetches are complete.
+        Combines of different observations run concurrently in a pool of processes whose size is
+        observation_combine_workers, or is based on the node type when that is not set.
+
         Parameters
         ----------
         All inputs are extracted from the JEDI experiment file configuration.
@@ -101,6 +265,9 @@ class GetObservations(taskBase):
         window_offset = self.config.window_offset()
         r2d2_local_path = self.config.r2d2_local_path()
         cycling_varbc = self.config.cycling_varbc(None)
+        r2d2_transfer_workers = self.config.r2d2_transfer_workers(8)
+        r2d2_transfer_attempts = self.config.r2d2_transfer_attempts(3)
+        observation_combine_workers = self.config.observation_combine_workers(0)
 
         # Set the observing system records path
         self.jedi_rendering.set_obs_records_path(self.config.observing_system_records_path(None))
@@ -132,41 +299,57 @@ class GetObservations(taskBase):
         # --------------------
         create_r2d2_config(self.logger, self.platform(), self.cycle_dir(), r2d2_local_path)
 
-        # Loop over observation operators
-        # -------------------------------
-        for observation in observations:
+        # Number of processes combining observation files, if not set by the experiment
+        # configuration this is determined by whether running on a login or compute node
+        # ------------------------------------------------------------------------------
+        if observation_combine_workers > 0:
+            number_of_workers = observation_combine_workers
+        elif login_or_compute(self.platform()) == 'compute':
+            number_of_workers = 40
+        else:
+            number_of_workers = 6
+        number_of_workers = max(1, min(number_of_workers, len(observations)))
+
+        # Pool of workers that fetches all the files from R2D2 concurrently
+        # -----------------------------------------------------------------
+        fetch_pool = R2D2TransferPool(self.logger, r2d2_transfer_workers, r2d2_transfer_attempts)
+
+        # Files that are processed once all the fetches for an observation have completed
+        # --------------------------------------------------------------------------------
+        combine_input_files = {}
+        combine_target_file = {}
+        permission_files = {}
 
-            # Open the observation operator dictionary
-            # ----------------------------------------
-            observation_dict = self.jedi_rendering.render_interface_observations(observation)
+        # Role in the observation manifest of each of the bias correction and time lapse files
+        # ------------------------------------------------------------------------------------
+        file_roles = {}
+
+        # Open the observation operator dictionaries
+        # ------------------------------------------
+        observation_dicts = self.jedi_rendering.render_interface_observations_batch(observations)
+
+        # Loop over observation operators and assemble the list of files to be fetched
+        # ----------------------------------------------------------------------------
+        for observation, observation_dict in observation_dicts.items():
 
             # Fetch observation files
             # -----------------------
-            combine_input_files = []
-            # Here, we are fetching
+            combine_input_files[observation] = []
+            permission_files[observation] = []
             for obs_num, obs_time in enumerate(obs_list_dto):
                 obs_window_begin = dt.strftime(obs_time, datetime_formats['iso_format'])
                 target_file = os.path.join(self.cycle_dir(), f'{observation}.{obs_num}.nc4')
-                combine_input_files.append(target_file)
-                fetch(date=obs_window_begin,
-                      target_file=target_file,
-                      provider=obs_provider,
-                      obs_type=observation,
-                      time_window=obs_window_length,
-                      type='ob',
-                      experiment=obs_experiment)
-            target_file = observation_dict['obs space']['obsdatain']['engine']['obsfile']
-            self.logger.info(f'Processing observation file {target_file}')
-
-            # If obs_list_dto has one member, then just rename the file
-            # ---------------------------------------------------------
-            if len(obs_list_dto) == 1:
-                os.rename(combine_input_files[0], target_file)
-            else:
-                self.read_and_combine(combine_input_files, target_file)
-
-            # Change permission
-            os.chmod(target_file, 0o644)
+                combine_input_files[observation].append(target_file)
+                fetch_pool.add(observation, fetch,
+                               date=obs_window_begin,
+                               target_file=target_file,
+                               provider=obs_provider,
+                               obs_type=observation,
+                               time_window=obs_window_length,
+                               type='ob',
+                               experiment=obs_experiment)
+            combine_target_file[observation] = \
+                observation_dict['obs space']['obsdatain']['engine']['obsfile']
 
             # Aircraft bias correction files
             # ------------------------------
@@ -186,16 +369,16 @@ class GetObservations(taskBase):
 
                     self.logger.info(f'Processing aircraft bias file {target_file}')
 
-                    fetch(date=background_time,
-                          target_file=target_file,
-                          provider='gsi',
-                          obs_type=target_file_type,
-                          type='bc',
-                          experiment=obs_experiment,
-                          file_type='csv')
-
-                    # Change permission
-                    os.chmod(target_file, 0o644)
+                    fetch_pool.add(observation, fetch,
+                                   date=background_time,
+                                   target_file=target_file,
+                                   provider='gsi',
+                                   obs_type=target_file_type,
+                                   type='bc',
+                                   experiment=obs_experiment,
+                                   file_type='csv')
+                    permission_files[observation].append(target_file)
+                    file_roles[target_file] = 'bias'
 
             # Otherwise there is only work to do if the observation operator has bias correction
             # ----------------------------------------------------------------------------------
@@ -232,26 +415,28 @@ class GetObservations(taskBase):
             # This will skip the fetch if we are cycling VarBC
             if fetch_required:
                 self.logger.info(f'Processing satellite bias file {target_sbccoef}')
-                fetch(date=background_time,
-                      target_file=target_sbccoef,
-                      provider='gsi',
-                      obs_type=observation,
-                      type='bc',
-                      experiment=obs_experiment,
-                      file_type='satbias')
+                fetch_pool.add(observation, fetch,
+                               date=background_time,
+                               target_file=target_sbccoef,
+                               provider='gsi',
+                               obs_type=observation,
+                               type='bc',
+                               experiment=obs_experiment,
+                               file_type='satbias')
 
                 self.logger.info(f'Processing satellite bias file {target_sbccovr}')
-                fetch(date=background_time,
-                      target_file=target_sbccovr,
-                      provider='gsi',
-                      obs_type=observation,
-                      type='bc',
-                      experiment=obs_experiment,
-                      file_type='satbias_cov')
-
-            # Change permission
-            os.chmod(target_sbccoef, 0o644)
-            os.chmod(target_sbccovr, 0o644)
+                fetch_pool.add(observation, fetch,
+                               date=background_time,
+                               target_file=target_sbccovr,
+                               provider='gsi',
+                               obs_type=observation,
+                               type='bc',
+                               experiment=obs_experiment,
+                               file_type='satbias_cov')
+
+            permission_files[observation] += [target_sbccoef, target_sbccovr]
+            file_roles[target_sbccoef] = 'bias'
+            file_roles[target_sbccovr] = 'bias'
 
             # Satellite time lapse
             # --------------------
@@ -259,16 +444,59 @@ class GetObservations(taskBase):
 
                 self.logger.info(f'Processing time lapse file {target_file}')
 
-                fetch(date=background_time,
-                      target_file=target_file,
-                      provider='gsi',
-                      obs_type=observation,
-                      type='bc',
-                      experiment=obs_experiment,
-                      file_type='tlapse')
+                fetch_pool.add(observation, fetch,
+                               date=background_time,
+                               target_file=target_file,
+                               provider='gsi',
+                               obs_type=observation,
+                               type='bc',
+                               experiment=obs_experiment,
+                               file_type='tlapse')
+                permission_files[observation].append(target_file)
+                file_roles[target_file] = 'tlapse'
+
+        # Fetch all the files. As soon as all the files of an observation have been fetched
+        # its observation files are combined (or renamed) by the pool of combine processes
+        # while the remaining fetches carry on. The process pool is created before any fetch
+        # thread is started so that the workers are not forked from a multi-threaded process.
+        # -----------------------------------------------------------------------------------
+        self.logger.info(f'Combining observation files with {number_of_workers} workers')
+
+        with Pool(processes=number_of_workers) as pool:
+
+            combine_results = []
+            for observation in fetch_pool.run():
+
+                target_file = combine_target_file[observation]
+                self.logger.info(f'Processing observation file {target_file}')
+
+                combine_results.append(pool.apply_async(combine_observation_files,
+                                                        (self.logger, observation,
+                                                         combine_input_files[observation],
+                                                         target_file)))
 
                 # Change permission
-                os.chmod(target_file, 0o644)
+                # -----------------
+                for permission_file in permission_files[observation]:
+                    os.chmod(permission_file, 0o644)
+
+            # Wait for all the combines and report the time taken for each observation
+            # -------------------------------------------------------------------------
+            manifest_entries = {}
+            for combine_result in combine_results:
+                observation, combine_time, entry = combine_result.get()
+                self.logger.info(f'Combined {observation} observation files in ' +
+                                 f'{combine_time:0.4f} seconds')
+                manifest_entries[combine_target_file[observation]] = entry
+
+        # Write the observation manifest of the cycle, listing every observation, bias correction
+        # and time lapse file with its sizes and checksum for the tasks that use the files
+        # ---------------------------------------------------------------------------------------
+        for target_file, role in file_roles.items():
+            manifest_entries[target_file] = manifest_entry(target_file, role)
+
+        add_to_manifest(manifest_entries)
+        self.logger.info(f'Added {len(manifest_entries)} files to the observation manifest')
 
     # ----------------------------------------------------------------------------------------------
 
@@ -324,9 +552,6 @@ class GetObservations(taskBase):
 
     # ----------------------------------------------------------------------------------------------
 
-    # Read and combine variable data from multiple files
-    # --------------------------------------------------
-
     def create_obs_time_list(
         self,
         obs_times: list,
@@ -368,112 +593,5 @@ class GetObservations(taskBase):
         subset_list = [dt for dt in obs_time_list if start_date <= dt < end_date]
 
         return subset_list
-    # ----------------------------------------------------------------------------------------------
-
-    # Get the target data from the netcdf file
-    # ----------------------------------------
-    def get_data(self, input_file: str, group: str, var_name: str) -> object:
-        with nc.Dataset(input_file, 'r') as ds:
-            return ds[group][var_name][:]
-
-    # ----------------------------------------------------------------------------------------------
-
-    def read_and_combine(self, input_filenames: list, output_filename: str) -> None:
-        '''
-        Combines multiple IODA v3 netcdf input files into a single output.
-        Combining multiple files require final (total) location dimension size to be
-        calculated in advance.
-
-        Basically, this function creates an output file that duplicates the first
-        input file's attributes and then fills with appended data from the input files.
-
-        Channel dimension shows up as a second dimension and sometimes as a single
-        dimension. Both cases require special handling and introduces additional
-        exceptions to the code. Final channel dimension size remains the same.
-        '''
-
-        # Create a new file for writing, remove the file if it already exists
-        # --------------------------------------------------------------------------
-        self.logger.info(f"Creating file {output_filename}")
-        if os.path.exists(output_filename):
-            os.remove(output_filename)
-
-        # Loop through the input files and get the total dimension size for each dimension
-        # Location requires special handling to get the cumulative sum of the dimension size
-        # ---------------------------------------------------------------------------------
-        out_dim_size = {'Location': 0}
-        for input_filename in input_filenames:
-            with nc.Dataset(input_filename, 'r') as ds:
-                for dim_name, dim in ds.dimensions.items():
-                    if dim_name == 'Location':
-                        out_dim_size[dim_name] += dim.size
-                    else:
-                        out_dim_size[dim_name] = dim.size
-
-        with nc.Dataset(output_filename, 'w') as out_ds:
-            # Open the input NetCDF files for reading
-            # ---------------------------------------
-            self.logger.info(f"Combining files {input_filenames} ")
 
-            # Create an output file template based on the first input file
-            # ------------------------------------------------------------
-            with nc.Dataset(input_filenames[0], 'r') as ds:
-                # Access groups and create dimensions
-                # -----------------------------------
-                input_groups = ds.groups.keys()
-
-                for dim_name, dim in ds.dimensions.items():
-                    out_ds.createDimension(dim_name, out_dim_size[dim_name])
-
-                # Loop through groups and process variables
-                # -----------------------------------------
-                for group_name in input_groups:
-                    group = ds[group_name]
-
-                    # Create the groups in output file
-                    # --------------------------------
-                    out_group = out_ds.createGroup(group_name)
-
-                    # Access variables within a group
-                    # -------------------------------
-                    variables_in_group = group.variables.keys()
-
-                    # Loop over variables from input files, combine, and write to the new file
-                    # ------------------------------------------------------------------------
-                    for var_name in variables_in_group:
-                        list_data = []
-
-                        # Get the dimensions of the variable
-                        # ----------------------------------
-                        var_dims = group[var_name].dimensions
-
-                        # Loop over all the files and combine the variable data into a list
-                        # Channel dimensions remain the same, so we can break the loop
-                        # ----------------------------------------------------------------
-                        for input_file in input_filenames:
-                            list_data.append(self.get_data(input_file, group_name, var_name))
-                            # Only break if the first dimension is Channel
-                            if var_dims[0] == 'Channel':
-                                break
-
-                        # Concatenate the masked arrays along the first dimension
-                        # --------------------------------------------------------
-                        variable_data = np.ma.concatenate(list_data, axis=0)
-
-                        # Fill value needs to be assigned while creating variables
-                        # --------------------------------------------------------
-                        subset_var = out_group.createVariable(var_name,
-                                                              variable_data.dtype,
-                                                              var_dims,
-                                                              fill_value=group[var_name].
-                                                              getncattr('_FillValue'))
-                        for attr_name in group[var_name].ncattrs():
-                            if attr_name == '_FillValue':
-                                continue
-                            subset_var.setncattr(attr_name, group[var_name].getncattr(attr_name))
-
-                        # Write subset data to the new file
-                        # --------------------------------
-                        subset_var[:] = variable_data
-
-# ----------------------------------------------------------------------------------------------
+# --------------------------------------------------------------------------------------------------
@@ -15,6 +15,7 @@ from generate_aircraft_bias_csv import csv_write
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.dictionary import write_dict_to_yaml
+from swell.utilities.gsi_satbias import read_satbias_table, tlapse_lines
 from swell.utilities.shell_commands import run_track_log_subprocess
 
 
@@ -112,6 +113,16 @@ class GsiBcToIoda(taskBase):
         satbias_converter_dict['input coeff file'] = bc_files[satbias_file_index]
         satbias_converter_dict['input err file'] = bc_files[satbiaspc_file_index]
 
+        # Read the satbias coefficient file once, giving the records of each sensor. The records
+        # are used for the tlapse files and to report sensors missing from the file, satbias2ioda
+        # reads the coefficients from the file itself.
+        satbias_table = read_satbias_table(satbias_converter_dict['input coeff file'])
+
+        for sensor in sensors:
+            if sensor not in satbias_table:
+                self.logger.info(f'In GsiBcToIoda sensor {sensor} is not in the satbias file ' +
+                                 f'{satbias_converter_dict["input coeff file"]}.')
+
         # Add the default predictors
         default_predictors = []
         default_predictors.append('constant')
@@ -166,16 +177,10 @@ class GsiBcToIoda(taskBase):
 
         run_track_log_subprocess(self.logger, [satbias_converter_exe, satbias_converter_yaml])
 
-        # Run tlapse converter (just a grep)
+        # Write the tlapse files (sensor, channel and tlapse of each record of the sensor)
         for sensor, sensor_tlapse in zip(sensors, sensors_tlapse):
-            sensor_tlapse_file = ''
-            with open(satbias_converter_dict['input coeff file'], 'r') as f:
-                for line in f.readlines():
-                    if sensor in line:
-                        sensor_tlapse_file = sensor_tlapse_file + ' '.join(line.split()[1:4]) + '\n'
-            # Write to tlapse file
             with open(os.path.join(self.cycle_dir(), sensor_tlapse), 'w') as file_open:
-                file_open.write(sensor_tlapse_file)
+                file_open.write(tlapse_lines(satbias_table, sensor))
 
         # Do the conversion of the aircraft bias correction files
         # -------------------------------------------------------
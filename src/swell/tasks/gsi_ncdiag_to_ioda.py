@@ -13,14 +13,97 @@ import datetime
 import glob
 import os
 import re
+import time
+from multiprocessing import Pool
+from typing import Optional, Tuple
 
 # Ioda converters
 import pyiodaconv.gsi_ncdiag as gsid
 from pyiodaconv.combine_obsspace import combine_obsspace
 
+from swell.deployment.platforms.platforms import login_or_compute
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.datetime_util import datetime_formats
-from swell.utilities.shell_commands import run_subprocess, create_executable_file
+from swell.utilities.logger import Logger
+from swell.utilities.netcdf_files import subset_locations
+from swell.utilities.obs_manifest import add_to_manifest, manifest_entry
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Memory needed to convert a GSI file, as a multiple of the size of the file. The converters hold
+# all the variables of the GSI file and of the IODA files being written in memory.
+conversion_memory_factor = 4
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def available_memory() -> Optional[int]:
+
+    # Memory (bytes) available for new processes, or None if it cannot be determined
+    try:
+        with open('/proc/meminfo', 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def convert_gsi_file(
+    logger: Logger,
+    name: str,
+    diag_type: str,
+    gsi_file: str,
+    output_dir: str,
+    platforms: Optional[list],
+    produce_geovals: bool
+) -> Tuple[str, float]:
+
+    # Convert one GSI ncdiag file (conventional, radiance or ozone) to IODA files and optionally
+    # GeoVaLs files. This is run by the worker processes of the conversion pool so returns the
+    # time spent for reporting
+    convert_start = time.perf_counter()
+
+    if diag_type == 'conventional':
+
+        Diag = gsid.Conv(gsi_file)
+        Diag.read()
+        Diag.toIODAobs(output_dir, platforms=platforms)
+
+        if produce_geovals:
+            logger.info(f'Processing GeoVaLs from {name}')
+            Diag.toGeovals(output_dir)
+
+        Diag.close()
+
+    elif diag_type == 'radiance':
+
+        Diag = gsid.Radiances(gsi_file)
+        Diag.read()
+        Diag.toIODAobs(output_dir, False, False, False, False)
+
+        if produce_geovals:
+            Diag.toGeovals(output_dir)
+
+        Diag.close()
+
+    else:
+
+        Diag = gsid.Ozone(gsi_file)
+        Diag.read()
+        Diag.toIODAobs(output_dir)
+
+        if produce_geovals:
+            Diag.toGeovals(output_dir)
+
+    return name, time.perf_counter() - convert_start
 
 
 # --------------------------------------------------------------------------------------------------
@@ -36,6 +119,7 @@ class GsiNcdiagToIoda(taskBase):
         single_observations = self.config.single_observations()
         produce_geovals = self.config.produce_geovals()
         window_offset = self.config.window_offset()
+        ncdiag_conversion_workers = self.config.ncdiag_conversion_workers(0)
 
         # Get window beginning time
         window_begin = self.da_window_params.window_begin(window_offset)
@@ -111,14 +195,14 @@ class GsiNcdiagToIoda(taskBase):
                 if os.path.exists(os.path.join(self.cycle_dir(), geo_file)):
                     os.remove(os.path.join(self.cycle_dir(), geo_file))
 
-        # First process the conventional data (if needed)
-        # -----------------------------------------------
-        for gsi_type_to_process in gsi_types_to_process:
+        # List of GSI files to convert. Each file is converted independently of the others so
+        # the conversions can run concurrently. Each entry is the arguments of convert_gsi_file.
+        # --------------------------------------------------------------------------------------
+        conversions = []
 
-            log_str = f'Processing GSI file {gsi_type_to_process}'
-            self.logger.info('', wrap=False)
-            self.logger.info(log_str)
-            self.logger.info('-'*len(log_str))
+        # First the conventional data (if needed)
+        # ---------------------------------------
+        for gsi_type_to_process in gsi_types_to_process:
 
             # If prof in the name then it is aircraft data. Adjust path and rename
             if 'prof' in gsi_type_to_process:
@@ -143,25 +227,79 @@ class GsiNcdiagToIoda(taskBase):
             self.logger.assert_abort(len(gsi_conv_file) == 1, 'The search for GSI ncdiags files ' +
                                      f'returned more than one file. Files: \'{gsi_conv_file}\'')
 
-            # Open the file
-            Diag = gsid.Conv(gsi_conv_file[0])
-            Diag.read()
-
             # Assemble list of needed platforms
             needed_platforms = []
             for platform in gsid.conv_platforms[gsi_type_to_process_actual]:
                 if platform in needed_ioda_types:
                     needed_platforms.append(platform)
 
-            # Extract data
-            Diag.toIODAobs(self.cycle_dir(), platforms=needed_platforms)
+            conversions.append((gsi_type_to_process, 'conventional', gsi_conv_file[0],
+                                needed_platforms))
 
-            if produce_geovals:
-                self.logger.info('', wrap=False)
-                self.logger.info(f'Processing GeoVaLs from {gsi_type_to_process_actual}')
-                Diag.toGeovals(self.cycle_dir())
+        # Get list of the observations that are ozone observations
+        # --------------------------------------------------------
+        ozone_sensors = gsid.oz_lay_sensors + gsid.oz_lev_sensors
+        ozone_observations = []
+        for observation in observations:
+            for ozone_sensor in ozone_sensors:
+                if ozone_sensor in observation:
+                    ozone_observations.append(observation)
+
+        # Then the radiances and ozone
+        # ----------------------------
+        for observation in observations:
+
+            observation_search_name = copy.copy(observation)
+
+            # For avhrr replace the search with just avhrr
+            if 'avhrr3' in observation_search_name:
+                observation_search_name = observation_search_name.replace('avhrr3', 'avhrr')
 
-            Diag.close()
+            gsi_obs_file = glob.glob(os.path.join(gsi_diag_dir, f'*{observation_search_name}*'))
+
+            # Skip this observation if not files were found
+            if len(gsi_obs_file) == 0:
+                self.logger.info(f'No observation files found for {observation}. Skipping convert')
+                continue
+
+            diag_type = 'ozone' if observation in ozone_observations else 'radiance'
+            conversions.append((observation, diag_type, gsi_obs_file[0], None))
+
+        # Convert the files
+        # -----------------
+        number_of_workers = self.conversion_workers(ncdiag_conversion_workers,
+                                                    [conversion[2] for conversion in conversions])
+
+        log_str = f'Converting {len(conversions)} GSI files with {number_of_workers} workers'
+        self.logger.info('', wrap=False)
+        self.logger.info(log_str)
+        self.logger.info('-'*len(log_str))
+
+        conversion_args = [(self.logger, name, diag_type, gsi_file, self.cycle_dir(), platforms,
+                            produce_geovals)
+                           for name, diag_type, gsi_file, platforms in conversions]
+
+        conversions_start = time.perf_counter()
+
+        if number_of_workers == 1:
+            for args in conversion_args:
+                self.logger.info(f'Converting {args[2]} ({args[1]})')
+                name, convert_time = convert_gsi_file(*args)
+                self.logger.info(f'Converted {name} in {convert_time:0.4f} seconds')
+        else:
+            with Pool(processes=number_of_workers) as pool:
+                convert_results = []
+                for args in conversion_args:
+                    self.logger.info(f'Converting {args[2]} ({args[1]})')
+                    convert_results.append(pool.apply_async(convert_gsi_file, args))
+
+                # Wait for all the conversions and report the time taken for each file
+                for convert_result in convert_results:
+                    name, convert_time = convert_result.get()
+                    self.logger.info(f'Converted {name} in {convert_time:0.4f} seconds')
+
+        self.logger.info('Converted all GSI files in ' +
+                         f'{time.perf_counter() - conversions_start:0.4f} seconds')
 
         # Rename gps files from gps_bend if they exist
         if 'gps' in observations_orig:
@@ -196,26 +334,15 @@ class GsiNcdiagToIoda(taskBase):
                                                       ioda_type_geoval_pattern))
                     ioda_path_geovalfiles = sorted(ioda_path_geovalfiles)
                     for ioda_geoval_file_name in ioda_path_geovalfiles:
-                        self.logger.info('Converting to a singler-observation file: ' +
+                        self.logger.info('Converting to a single-observation file: ' +
                                          f'{ioda_geoval_file_name}')
-                        os.system(f'ncks -d nlocs,0,0,1 -Q -O {ioda_geoval_file_name} ' +
-                                  f'{ioda_geoval_file_name}')
+                        subset_locations(self.logger, ioda_geoval_file_name, 'nlocs')
 
                 # Save single observation in obs files
                 for ioda_obs_file_name in ioda_path_files:
-                    # Create a bash file to process ioda_obs files because command lines fails.
-                    module_path_miniconda = '/discover/nobackup/drholdaw/opt/modulefiles/core/'
-                    make_file_name = ioda_obs_file_name + '.sh'
-                    make_file = f'#!/bin/bash \n' + \
-                                f'module use -a {module_path_miniconda} \n' + \
-                                f'ml miniconda/py39_23.3.1 \n' + \
-                                f'ncks -d Location,0,0,1 -Q -O {ioda_obs_file_name} ' + \
-                                f'{ioda_obs_file_name}'
-                    self.logger.info('Making a single-observation file by executing ' +
-                                     f'{make_file_name}')
-                    create_executable_file(self.logger, make_file_name, make_file)
-                    run_subprocess(self.logger, make_file_name)
-                    os.remove(make_file_name)
+                    self.logger.info('Converting to a single-observation file: ' +
+                                     f'{ioda_obs_file_name}')
+                    subset_locations(self.logger, ioda_obs_file_name, 'Location')
 
             # For sfc make sure there are no surface ship files
             if needed_ioda_type == 'sfc':
@@ -277,55 +404,6 @@ class GsiNcdiagToIoda(taskBase):
             else:
                 self.logger.abort(f'Combine failed for {needed_ioda_type}, file name issue.')
 
-        # Get list of the observations that are ozone observations
-        # --------------------------------------------------------
-        ozone_sensors = gsid.oz_lay_sensors + gsid.oz_lev_sensors
-        ozone_observations = []
-        for observation in observations:
-            for ozone_sensor in ozone_sensors:
-                if ozone_sensor in observation:
-                    ozone_observations.append(observation)
-
-        # Transform radiances and ozone
-        # -----------------------------
-        for observation in observations:
-
-            self.logger.info(f'Converting {observation} to IODA format')
-
-            observation_search_name = copy.copy(observation)
-
-            # For avhrr replace the search with just avhrr
-            if 'avhrr3' in observation_search_name:
-                observation_search_name = observation_search_name.replace('avhrr3', 'avhrr')
-
-            gsi_obs_file = glob.glob(os.path.join(gsi_diag_dir, f'*{observation_search_name}*'))
-
-            # Skip this observation if not files were found
-            if len(gsi_obs_file) == 0:
-                self.logger.info(f'No observation files found for {observation}. Skipping convert')
-                continue
-
-            if observation not in ozone_observations:
-
-                # Radiances
-                Diag = gsid.Radiances(gsi_obs_file[0])
-                Diag.read()
-                Diag.toIODAobs(self.cycle_dir(), False, False, False, False)
-
-            else:
-
-                # Ozone
-                Diag = gsid.Ozone(gsi_obs_file[0])
-                Diag.read()
-                Diag.toIODAobs(self.cycle_dir())
-
-            # GeoVaLs call
-            if produce_geovals:
-                Diag.toGeovals(self.cycle_dir())
-
-            if observation not in ozone_observations:
-                Diag.close()
-
         # Rename avhrr files to avhrr3
         # ----------------------------
         gsi_datetime = re.sub('\D', '', self.cycle_time())[0:10]  # noqa
@@ -341,6 +419,8 @@ class GsiNcdiagToIoda(taskBase):
 
         # Rename files to be swell compliant
         # ----------------------------------
+        manifest_files = {}
+
         for observation in observations_orig:
 
             self.logger.info(f'Renaming \'{observation}\' to be swell compliant')
@@ -368,7 +448,9 @@ class GsiNcdiagToIoda(taskBase):
 
             # Make single ozone or radiance observation files
             if single_observations and observation in observations:
-                os.system(f'ncks -d Location,0,0,1 -Q -O {ioda_obs_out} {ioda_obs_out}')
+                subset_locations(self.logger, ioda_obs_out, 'Location')
+
+            manifest_files[ioda_obs_out] = 'obs'
 
             # Rename GeoVaLs file if need be
             if produce_geovals:
@@ -383,7 +465,9 @@ class GsiNcdiagToIoda(taskBase):
                 os.rename(ioda_geoval_in, ioda_geoval_out)
 
                 if single_observations and observation in observations:
-                    os.system(f'ncks -d nlocs,0,0,1 -Q -O {ioda_geoval_out} {ioda_geoval_out}')
+                    subset_locations(self.logger, ioda_geoval_out, 'nlocs')
+
+                manifest_files[ioda_geoval_out] = 'geovals'
 
         # Remove left over files
         # ------------------------------
@@ -399,4 +483,43 @@ class GsiNcdiagToIoda(taskBase):
                 self.logger.info(f' - Removing {os.path.basename(geoval_file)}')
                 os.remove(geoval_file)
 
+        # Add the files to the observation manifest of the cycle
+        # ------------------------------------------------------
+        add_to_manifest({manifest_file: manifest_entry(manifest_file, role)
+                         for manifest_file, role in manifest_files.items()})
+        self.logger.info(f'Added {len(manifest_files)} files to the observation manifest')
+
+    # ----------------------------------------------------------------------------------------------
+
+    def conversion_workers(self, ncdiag_conversion_workers: int, gsi_files: list) -> int:
+
+        '''
+            Number of processes converting GSI files. Unless set in the experiment configuration
+            this is based on the node type, limited by the number of cores and by the memory
+            available for converting the largest files at the same time.
+        '''
+
+        if ncdiag_conversion_workers > 0:
+            return max(1, min(ncdiag_conversion_workers, len(gsi_files)))
+
+        if login_or_compute(self.platform()) == 'compute':
+            number_of_workers = 40
+        else:
+            number_of_workers = 6
+
+        number_of_workers = min(number_of_workers, os.cpu_count() or 1, len(gsi_files))
+
+        memory = available_memory()
+        if memory is not None and gsi_files:
+            file_sizes = sorted((os.path.getsize(gsi_file) for gsi_file in gsi_files),
+                                reverse=True)
+            memory_needed = 0
+            for worker, file_size in enumerate(file_sizes[:number_of_workers]):
+                memory_needed += conversion_memory_factor * file_size
+                if memory_needed > memory:
+                    number_of_workers = worker
+                    break
+
+        return max(1, number_of_workers)
+
 # --------------------------------------------------------------------------------------------------
@@ -12,10 +12,10 @@ import isodate
 import os
 from netCDF4 import Dataset
 import numpy as np
-import xarray as xr
 from typing import Tuple
 
 from swell.utilities.datetime_util import datetime_formats
+from swell.utilities.netcdf_files import copy_file_renamed
 from swell.tasks.base.task_base import taskBase
 
 # --------------------------------------------------------------------------------------------------
@@ -190,57 +190,62 @@ class LinkGeosOutput(taskBase):
                               ) -> None:
 
         # Since history already has the aggregated variables, we just need to rename
-        # the dimensions and variables to match SOCA requirements
-        ds = xr.open_dataset(src_history)
-
-        # rename the dimensions to xaxis_1 and yaxis_1 and rename the variables
-        ds = ds.rename({'ni': 'xaxis_1', 'nj': 'yaxis_1'})
-        ds = ds.rename({'aice': 'aicen', 'hi': 'hicen', 'hs': 'hsnon'})
-
-        # Save as a new file
-        ds.to_netcdf(dst_history, mode='w')
+        # the dimensions to xaxis_1 and yaxis_1 and the variables to match SOCA requirements.
+        # The new file is written a block at a time rather than from a copy in memory.
+        copy_file_renamed(self.logger, src_history, dst_history,
+                          dimension_names={'ni': 'xaxis_1', 'nj': 'yaxis_1'},
+                          variable_names={'aice': 'aicen', 'hi': 'hicen', 'hs': 'hsnon'})
 
     # ----------------------------------------------------------------------------------------------
 
     def prepare_cice6_restart(self) -> Tuple[str, str]:
         # CICE6 input in SOCA requires aggregation of multiple variables and
-        # time dimension added to the dataset.
+        # time dimension added to the dataset. The categories are summed a block of
+        # rows at a time so only a block of each variable is held in memory.
         # SOCA needs icea area (aicen), ice volume (vicen), and snow area (vsnon)
         # --------------------------------------------------------------------
         soca2cice_vars = {'aicen': 'aicen',
                           'hicen': 'vicen',
                           'hsnon': 'vsnon'}
 
-        # read CICE6 restart
-        # -----------------
-        ds = xr.open_dataset(self.forecast_dir(['RESTART', 'iced.nc']))
-        nj = np.shape(ds['aicen'])[1]
-        ni = np.shape(ds['aicen'])[2]
+        fname_out = os.path.join(self.cycle_dir(), 'cice.res.' + self.bkgr_time_iso + '.nc')
 
-        # populate xarray with aggregated quantities
-        # ------------------------------------------
-        aggds = xr.merge(xr.DataArray(
-                        name=varname,
-                        data=np.reshape(np.sum(ds[soca2cice_vars[varname]].values, axis=0),
-                                        (1, nj, ni)),
-                        dims=['time', 'yaxis_1', 'xaxis_1']) for varname in soca2cice_vars.keys())
+        # Number of rows (nj) of the categories summed at a time
+        # ------------------------------------------------------
+        block_elements = 16777216
 
-        # remove fill value
-        # -----------------
-        encoding = {varname: {'_FillValue': False} for varname in soca2cice_vars.keys()}
+        # read CICE6 restart and write the aggregated quantities, a block of rows at a time
+        # ----------------------------------------------------------------------------------
+        with Dataset(self.forecast_dir(['RESTART', 'iced.nc']), 'r') as ds, \
+             Dataset(fname_out, 'w', format='NETCDF4') as ncf:
 
-        fname_out = os.path.join(self.cycle_dir(), 'cice.res.' + self.bkgr_time_iso + '.nc')
+            ncat, nj, ni = ds['aicen'].shape
+            rows = max(1, block_elements // (ncat * ni))
+
+            ncf.createDimension('time', None)
+            ncf.createDimension('yaxis_1', nj)
+            ncf.createDimension('xaxis_1', ni)
+
+            # time coordinate
+            # ---------------
+            t = ncf.createVariable('time', 'f8', ('time'))
+            t[:] = 1.0
+
+            for varname, cice_varname in soca2cice_vars.items():
+
+                cice_var = ds[cice_varname]
+                cice_var.set_auto_maskandscale(False)
 
-        # save datasets
-        # -------------
-        aggds.to_netcdf(fname_out, format='NETCDF4', unlimited_dims='time', encoding=encoding)
+                # no fill value
+                # -------------
+                agg_var = ncf.createVariable(varname, cice_var.dtype,
+                                             ('time', 'yaxis_1', 'xaxis_1'), fill_value=False)
 
-        # xarray doesn't allow variables and dim that have the same name, switch to netCDF4
-        # ---------------------------------------------------------------------------------
-        ncf = Dataset(fname_out, 'a')
-        t = ncf.createVariable('time', 'f8', ('time'))
-        t[:] = 1.0
-        ncf.close()
+                # sum over the categories
+                # -----------------------
+                for row in range(0, nj, rows):
+                    row_end = min(row + rows, nj)
+                    agg_var[0, row:row_end, :] = np.sum(cice_var[:, row:row_end, :], axis=0)
 
         # Generic CICE6 rst file source format for SOCA
         # ---------------------------------------
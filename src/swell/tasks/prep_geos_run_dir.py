@@ -9,12 +9,12 @@
 
 import os
 import glob
-import yaml
 
 from datetime import datetime as dt
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.file_system_operations import copy_to_dst_dir, check_if_files_exist_in_path
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -431,7 +431,7 @@ class PrepGeosRunDir(taskBase):
             self.logger.info('Modifying WSUB_ExtData.yaml')
 
             with open(self.forecast_dir('WSUB_ExtData.yaml'), 'r') as f:
-                wsub = yaml.safe_load(f)
+                wsub = load_yaml(f)
 
             # Modifying one particular value
             # -----------------------------
@@ -439,7 +439,7 @@ class PrepGeosRunDir(taskBase):
 
             # Write the updated YAML back to the file
             with open(self.forecast_dir('WSUB_ExtData.yaml'), 'w') as f:
-                yaml.dump(wsub, f, sort_keys=False)
+                dump_yaml(wsub, f, sort_keys=False)
 
     # ----------------------------------------------------------------------------------------------
 
@@ -470,7 +470,7 @@ class PrepGeosRunDir(taskBase):
         rcdict['RECORD_REF_TIME'] = da_begin_dto.strftime("%H%M%S")
 
         with open(rcfile, "w") as f:
-            yaml.dump(rcdict, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(rcdict, f, default_flow_style=False, sort_keys=False)
 
         return self.geos.rc_to_bool(rcdict)
 
@@ -492,7 +492,7 @@ class PrepGeosRunDir(taskBase):
         rcdict['JOB_SGMT'] = time_string
 
         with open(rcfile, "w") as f:
-            yaml.dump(rcdict, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(rcdict, f, default_flow_style=False, sort_keys=False)
 
         return self.geos.rc_to_bool(rcdict)
 
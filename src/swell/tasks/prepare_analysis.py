@@ -9,11 +9,12 @@
 
 import glob
 import netCDF4 as nc
+import numpy as np
 import os
 import shutil
 from typing import Union
 
-from swell.utilities.shell_commands import run_subprocess
+from swell.utilities.netcdf_files import copy_variable, copy_variable_data
 from swell.tasks.base.task_base import taskBase
 
 # --------------------------------------------------------------------------------------------------
@@ -119,25 +120,45 @@ class PrepareAnalysis(taskBase):
             f_incr = filepath
 
         mom6_incr = self.at_cycledir('mom6_increment.nc')
-        h_ana = self.at_cycledir('h.nc')
 
-        # Define the command to extract and append the h variable from the increment
-        # file to the analysis file (-O option overwrites the existing file)
-        # -----------------------------------------------------------------------
-        command = f'ncks -O -v h {f_ana} {h_ana} \n' + \
-            f'ncks -A -v h {h_ana} {f_incr} \n' + \
-            f'mv {f_incr} {mom6_incr}'
+        self.logger.info(f'Adding the layer thickness (h) from {f_ana} to {f_incr}')
 
-        # Containerized run of NCO tools via CLI
-        # --------------------------------------
-        run_subprocess(self.logger, ['/bin/bash', '-c', command])
+        # Copy h (with its dimensions, their coordinate variables and its attributes) from the
+        # analysis into the increment file, replacing it if it is there already
+        # -----------------------------------------------------------------------------------
+        with nc.Dataset(f_ana, 'r') as ds_ana, nc.Dataset(f_incr, 'r+') as ds_incr:
+
+            h_ana = ds_ana.variables['h']
+
+            for dim_name in h_ana.dimensions:
+                dim = ds_ana.dimensions[dim_name]
+                if dim_name in ds_incr.dimensions:
+                    self.logger.assert_abort(
+                        ds_incr.dimensions[dim_name].size == dim.size,
+                        f'Dimension {dim_name} of h in {f_ana} has a different size in {f_incr}')
+                else:
+                    ds_incr.createDimension(dim_name, None if dim.isunlimited() else dim.size)
+                if dim_name in ds_ana.variables and dim_name not in ds_incr.variables:
+                    copy_variable(ds_ana.variables[dim_name], ds_incr)
+
+            if 'h' in ds_incr.variables:
+                copy_variable_data(h_ana, ds_incr.variables['h'])
+            else:
+                copy_variable(h_ana, ds_incr)
+
+        # The increment file with h is the MOM6 increment
+        # -----------------------------------------------
+        os.replace(f_incr, mom6_incr)
 
     # --------------------------------------------------------------------------------------------------
 
-    def replace_ocn(self, f_rst: str, ana_pth: str) -> None:
+    def replace_ocn(self, f_rst: str, ana_path: str) -> None:
 
-        # TODO: This will fail for multiple restart files and no IAU
-        # ----------------------------------------------------------
+        # MOM6 restarts of high resolution simulations are split into multiple files
+        # (MOM.res.nc, MOM.res_1.nc, ...), each variable is updated in the file holding it
+        # ---------------------------------------------------------------------------------
+        f_rst_name, f_rst_ext = os.path.splitext(f_rst)
+        f_rsts = [f_rst] + sorted(glob.glob(f_rst_name + '_[0-9]*' + f_rst_ext))
 
         for filepath in list(glob.glob(ana_path)):
             f_ana = filepath
@@ -145,7 +166,7 @@ class PrepareAnalysis(taskBase):
         # Open read and write and rename dimensions
         # -----------------------------------------
         ds_ana = nc.Dataset(f_ana, 'r+')
-        ds_rst = nc.Dataset(f_rst, 'r+')
+        ds_rsts = [nc.Dataset(f, 'r+') for f in f_rsts]
 
         # WARNING: This method only works for read + write mode
         # ----------------------------------------------------------
@@ -153,15 +174,31 @@ class PrepareAnalysis(taskBase):
         ds_ana.renameDimension('yaxis_1', 'lath')
         ds_ana.renameDimension('zaxis_1', 'Layer')
 
+        # Copy the variables a level at a time so that only one level of a variable is in
+        # memory, and write them to disk once all of them have been copied
+        # --------------------------------------------------------------------------------
         for soca_var in self.soca_ana:
             var = self.SOCA_dict[soca_var]
-            self.logger.info(f'Updating {var} in restart')
 
-            ds_rst.variables[var][:] = ds_ana.variables[var][:]
+            ds_rst_var = [ds_rst for ds_rst in ds_rsts if var in ds_rst.variables]
+            self.logger.assert_abort(len(ds_rst_var) > 0, f'Variable {var} is not in any of ' +
+                                     f'the restart files {f_rsts}')
+
+            self.logger.info(f'Updating {var} in restart {ds_rst_var[0].filepath()}')
+            level_size = int(np.prod(ds_ana.variables[var].shape[-2:]))
+            copy_variable_data(ds_ana.variables[var], ds_rst_var[0].variables[var],
+                               block_elements=level_size, mask_and_scale=True)
+
+        for ds_rst in ds_rsts:
             ds_rst.sync()
+            ds_rst.close()
         ds_ana.close()
-        ds_rst.close()
 
-        shutil.move(f_rst, self.forecast_dir(['RESTART', 'MOM.res.nc']))
+        # Restarts written at a record time are renamed to the generic names
+        # -------------------------------------------------------------------
+        record_str = os.path.basename(f_rst_name)[len('MOM.res'):]
+        for f in f_rsts:
+            dst = os.path.join(os.path.dirname(f), os.path.basename(f).replace(record_str, '', 1))
+            shutil.move(f, dst)
 
 # --------------------------------------------------------------------------------------------------
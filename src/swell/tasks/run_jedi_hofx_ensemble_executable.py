@@ -9,13 +9,13 @@
 
 
 import os
-import yaml
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.run_jedi_executables import jedi_dictionary_iterator
 
 from swell.utilities.run_jedi_executables import run_executable
 from swell.tasks.run_jedi_hofx_executable import RunJediHofxExecutable
+from swell.utilities.yaml_io import dump_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -135,7 +135,7 @@ class RunJediHofxEnsembleExecutable(RunJediHofxExecutable, taskBase):
         # Write the expanded dictionary to YAML file
         # ------------------------------------------
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Call execute of RunJediHofxExecutable to render hofx templates for each member
         # ------------------------------------------------------------------------------
@@ -10,12 +10,36 @@
 
 import glob
 import os
-import yaml
-from typing import Optional
+import time
+from multiprocessing import Pool
+from typing import Optional, Tuple
 
+from swell.deployment.platforms.platforms import login_or_compute
 from swell.tasks.base.task_base import taskBase
+from swell.utilities.logger import Logger
 from swell.utilities.netcdf_files import combine_files_without_groups
-from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable
+from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable, \
+    record_obs_output_files
+from swell.utilities.yaml_io import dump_yaml
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def combine_geovals(
+    logger: Logger,
+    observation: str,
+    geovals_files: list,
+    output_file: str
+) -> Tuple[str, float]:
+
+    # Combine the GeoVaLs files written by each processor, removing them afterwards. This is run
+    # by the worker processes of the combine pool so returns the time spent for reporting
+    combine_start = time.perf_counter()
+
+    combine_files_without_groups(logger, geovals_files, output_file, 'nlocs', True)
+
+    return observation, time.perf_counter() - combine_start
 
 
 # --------------------------------------------------------------------------------------------------
@@ -41,6 +65,7 @@ class RunJediHofxExecutable(taskBase):
         jedi_forecast_model = self.config.jedi_forecast_model(None)
         generate_yaml_and_exit = self.config.generate_yaml_and_exit(False)
         save_geovals = self.config.save_geovals(False)
+        observation_combine_workers = self.config.observation_combine_workers(0)
 
         # Set the observing system records path
         self.jedi_rendering.set_obs_records_path(self.config.observing_system_records_path(None))
@@ -136,7 +161,7 @@ class RunJediHofxExecutable(taskBase):
             # Write the expanded dictionary to YAML file
             # ------------------------------------------
             with open(jedi_config_file, 'w') as jedi_config_file_open:
-                yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+                dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
             # Jedi executable name
             # --------------------
@@ -151,6 +176,7 @@ class RunJediHofxExecutable(taskBase):
                 self.logger.info('Running '+jedi_executable_path+' with '+str(np)+' processors.')
                 run_executable(self.logger, self.cycle_dir(), np, jedi_executable_path,
                                jedi_config_file, output_log_file)
+                record_obs_output_files(self.logger, jedi_config_dict)
             else:
                 self.logger.info('YAML generated, now exiting.')
 
@@ -158,8 +184,20 @@ class RunJediHofxExecutable(taskBase):
             # ----------------------------------------------
             if save_geovals:
 
-                # Combine the GeoVaLs
-                # -------------------
+                # Number of processes combining GeoVaLs files, if not set by the experiment
+                # configuration this is determined by whether running on a login or compute node
+                # ------------------------------------------------------------------------------
+                if observation_combine_workers > 0:
+                    number_of_workers = observation_combine_workers
+                elif login_or_compute(self.platform()) == 'compute':
+                    number_of_workers = 40
+                else:
+                    number_of_workers = 6
+                number_of_workers = max(1, min(number_of_workers, len(observations)))
+
+                # Combine the GeoVaLs, the observations are combined concurrently
+                # ---------------------------------------------------------------
+                combine_args = []
                 for observation in observations:
 
                     self.logger.info(f'Combining GeoVaLs files for {observation}')
@@ -178,9 +216,14 @@ class RunJediHofxExecutable(taskBase):
                                              f' files does not match number of processors:\n' +
                                              f' np={np}, len(geovals_files) = {len(geovals_files)}')
 
-                    # Write the concatenated dataset to a new file
-                    combine_files_without_groups(self.logger, geovals_files, output_file, 'nlocs',
-                                                 True)
+                    combine_args.append((self.logger, observation, geovals_files, output_file))
+
+                # Write the concatenated datasets to new files
+                self.logger.info(f'Combining GeoVaLs files with {number_of_workers} workers')
+                with Pool(processes=number_of_workers) as pool:
+                    for observation, combine_time in pool.starmap(combine_geovals, combine_args):
+                        self.logger.info(f'Combined {observation} GeoVaLs files in ' +
+                                         f'{combine_time:0.4f} seconds')
 
         else:
             for mem in ensemble_members:
@@ -240,7 +283,7 @@ class RunJediHofxExecutable(taskBase):
                 # Write the expanded dictionary to YAML file
                 # ------------------------------------------
                 with open(jedi_config_file, 'w') as jedi_config_file_open:
-                    yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+                    dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
     # ----------------------------------------------------------------------------------------------
 
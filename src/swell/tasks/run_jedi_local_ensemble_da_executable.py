@@ -9,10 +9,10 @@
 
 
 import os
-import yaml
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable
+from swell.utilities.yaml_io import dump_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -178,7 +178,7 @@ class RunJediLocalEnsembleDaExecutable(taskBase):
         # Write the expanded dictionary to YAML file
         # ------------------------------------------
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Get the JEDI interface metadata
         # -------------------------------
@@ -10,11 +10,11 @@
 
 import copy
 import os
-import yaml
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.dictionary import update_dict
 from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable
+from swell.utilities.yaml_io import dump_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -143,15 +143,15 @@ class RunJediUfoTestsExecutable(taskBase):
         # ---------------------------------------
         # file = os.path.join(self.cycle_dir(), 'jedi_test_ObsOperator_config.yaml')
         # with open(file, 'w') as jedi_config_file_open:
-        #     yaml.dump(jedi_operator_dict, jedi_config_file_open, default_flow_style=False)
+        #     dump_yaml(jedi_operator_dict, jedi_config_file_open, default_flow_style=False)
 
         # file = os.path.join(self.cycle_dir(), 'jedi_test_ObsOperatorTLAD_config.yaml')
         # with open(file, 'w') as jedi_config_file_open:
-        #     yaml.dump(jedi_operator_dict, jedi_config_file_open, default_flow_style=False)
+        #     dump_yaml(jedi_operator_dict, jedi_config_file_open, default_flow_style=False)
 
         file = os.path.join(self.cycle_dir(), 'jedi_test_ObsFilters_config.yaml')
         with open(file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_filter_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_filter_dict, jedi_config_file_open, default_flow_style=False)
 
         # Tests to run
         # ------------
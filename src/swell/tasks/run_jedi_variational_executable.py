@@ -9,10 +9,11 @@
 
 
 import os
-import yaml
 
 from swell.tasks.base.task_base import taskBase
-from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable
+from swell.utilities.run_jedi_executables import jedi_dictionary_iterator, run_executable, \
+    record_obs_output_files
+from swell.utilities.yaml_io import dump_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -119,7 +120,7 @@ class RunJediVariationalExecutable(taskBase):
         # Write the expanded dictionary to YAML file
         # ------------------------------------------
         with open(jedi_config_file, 'w') as jedi_config_file_open:
-            yaml.dump(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
+            dump_yaml(jedi_config_dict, jedi_config_file_open, default_flow_style=False)
 
         # Get the JEDI interface metadata
         # -------------------------------
@@ -141,6 +142,7 @@ class RunJediVariationalExecutable(taskBase):
             self.logger.info('Running '+jedi_executable_path+' with '+str(np)+' processors.')
             run_executable(self.logger, self.cycle_dir(), np, jedi_executable_path,
                            jedi_config_file, output_log_file)
+            record_obs_output_files(self.logger, jedi_config_dict)
         else:
             self.logger.info('YAML generated, now exiting.')
 
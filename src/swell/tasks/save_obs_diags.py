@@ -11,7 +11,8 @@ import os
 from swell.tasks.base.task_base import taskBase
 from r2d2 import store
 from swell.utilities.r2d2 import create_r2d2_config
-from swell.utilities.run_jedi_executables import check_obs
+from swell.utilities.obs_manifest import obs_output_file
+from swell.utilities.run_jedi_executables import check_obs_batch
 
 # --------------------------------------------------------------------------------------------------
 
@@ -49,17 +50,18 @@ class SaveObsDiags(taskBase):
         # --------------------
         create_r2d2_config(self.logger, self.platform(), self.cycle_dir(), r2d2_local_path)
 
+        # Load the observation dictionaries and check which observations were used
+        # ------------------------------------------------------------------------
+        observation_dicts = self.jedi_rendering.render_interface_observations_batch(observations)
+        use_observations = check_obs_batch(self.jedi_rendering.observing_system_records_path,
+                                           observation_dicts, self.cycle_time_dto())
+
         # Loop over observation operators
         # -------------------------------
-        for observation in observations:
-
-            # Load the observation dictionary
-            observation_dict = self.jedi_rendering.render_interface_observations(observation)
+        for observation, observation_dict in observation_dicts.items():
 
-            # Check if observation was used
-            use_obs = check_obs(self.jedi_rendering.observing_system_records_path, observation,
-                                observation_dict, self.cycle_time_dto())
-            if not use_obs:
+            # Skip observations that were not used
+            if not use_observations[observation]:
                 continue
 
             # Store observation files
@@ -67,14 +69,13 @@ class SaveObsDiags(taskBase):
             name = observation_dict['obs space']['name']
             obs_path_file = observation_dict['obs space']['obsdataout']['engine']['obsfile']
 
-            # Check for need to add 0000 to the file
-            if not os.path.exists(obs_path_file):
+            # File written by the executable, which can have a _0000 suffix
+            obs_path_file_out = obs_output_file(obs_path_file)
+            if obs_path_file_out is None:
                 obs_path_file_name, obs_path_file_ext = os.path.splitext(obs_path_file)
-                obs_path_file_0000 = obs_path_file_name + '_0000' + obs_path_file_ext
-                if not os.path.exists(obs_path_file_0000):
-                    self.logger.abort(f'No observation file found for {obs_path_file} or ' +
-                                      f'{obs_path_file_0000}')
-                obs_path_file = obs_path_file_0000
+                self.logger.abort(f'No observation file found for {obs_path_file} or ' +
+                                  f'{obs_path_file_name}_0000{obs_path_file_ext}')
+            obs_path_file = obs_path_file_out
 
             store(date=window_begin,
                   provider='ncdiag',
@@ -46,6 +46,7 @@ class StageJedi(taskBase):
 
         vertical_resolution = self.config.vertical_resolution()
         gsibec_configuration = self.config.gsibec_configuration(None)
+        staging_strategy = self.config.staging_strategy('copy')
 
         # Add jedi interface template keys
         self.jedi_rendering.add_key('horizontal_resolution', horizontal_resolution)
@@ -71,13 +72,17 @@ class StageJedi(taskBase):
         # Open file and template it
         stage_dict = self.jedi_rendering.render_interface_model(stage_file)
 
-        # Run the file handler
-        # --------------------
+        # Run the file handler, staging the files that are copied with the staging strategy
+        # -----------------------------------------------------------------------------------
         try:
-            fh = get_file_handler(stage_dict)
+            fh = get_file_handler(stage_dict, staging=staging_strategy)
             if not fh.is_ready():
                 self.logger.abort('One or more files not ready')
             else:
                 fh.get()
         except SWELLError as e:
             self.logger.abort(str(e))
+
+        # Report the bytes copied and linked
+        # ----------------------------------
+        self.logger.info(f'{stage_file} ({staging_strategy} staging): ' + fh.staging_report())
@@ -16,7 +16,7 @@ from r2d2 import store
 
 from swell.tasks.base.task_base import taskBase
 from swell.utilities.datetime_util import datetime_formats
-from swell.utilities.r2d2 import create_r2d2_config
+from swell.utilities.r2d2 import create_r2d2_config, R2D2TransferPool
 
 
 # --------------------------------------------------------------------------------------------------
@@ -28,6 +28,10 @@ class StoreBackground(taskBase):
 
         """Store background files for a given experiment and cycle in R2D2
 
+           The files of every file type and background step are stored concurrently by a bounded
+           pool of workers (r2d2_transfer_workers), with each store retried up to
+           r2d2_transfer_attempts times.
+
            Parameters
            ----------
              All inputs are extracted from the JEDI experiment file configuration.
@@ -49,6 +53,8 @@ class StoreBackground(taskBase):
         background_experiment = self.config.background_experiment()
         background_frequency = self.config.background_frequency()
         r2d2_local_path = self.config.r2d2_local_path()
+        r2d2_transfer_workers = self.config.r2d2_transfer_workers(8)
+        r2d2_transfer_attempts = self.config.r2d2_transfer_attempts(3)
 
         # Position relative to center of the window where forecast starts
         forecast_offset = self.config.analysis_forecast_window_offset()
@@ -107,6 +113,9 @@ class StoreBackground(taskBase):
         # Get r2d2 dictionary
         r2d2_dict = self.jedi_rendering.render_interface_model('r2d2')
 
+        # Pool of workers that stores all the background files in R2D2 concurrently
+        store_pool = R2D2TransferPool(self.logger, r2d2_transfer_workers, r2d2_transfer_attempts)
+
         # Loop over fc
         for fc in r2d2_dict['store']['fc']:
 
@@ -133,13 +142,18 @@ class StoreBackground(taskBase):
                     target_file = target_file_type_template.replace("$(valid_date)", valid_time_str)
                     target_file = os.path.join(self.cycle_dir(), target_file)
 
-                    # Perform the store
-                    store(date=forecast_start_time,
-                          source_file=target_file,
-                          model='geos',
-                          file_type='bkg',
-                          fc_date_rendering='analysis',
-                          step=bkg_step,
-                          resolution=self.config.horizontal_resolution(),
-                          type='fc',
-                          experiment=background_experiment)
+                    # Add the store to the pool
+                    store_pool.add(target_file, store,
+                                   date=forecast_start_time,
+                                   source_file=target_file,
+                                   model='geos',
+                                   file_type='bkg',
+                                   fc_date_rendering='analysis',
+                                   step=bkg_step,
+                                   resolution=self.config.horizontal_resolution(),
+                                   type='fc',
+                                   experiment=background_experiment)
+
+        # Perform all the stores
+        for target_file in store_pool.run():
+            self.logger.info(f'Stored {target_file}')
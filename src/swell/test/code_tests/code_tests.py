@@ -13,10 +13,21 @@ import unittest
 
 from swell.utilities.logger import Logger
 from swell.test.code_tests.slurm_test import SLURMConfigTest
+from swell.test.code_tests.test_filehandler import FileHandlerTest
+from swell.test.code_tests.test_gsi_satbias import GsiSatbiasTest
+from swell.test.code_tests.test_link_geos_output import LinkGeosOutputTest
+from swell.test.code_tests.test_obs_manifest import ObsManifestTest
 from swell.test.code_tests.test_pinned_versions import PinnedVersionsTest
+from swell.test.code_tests.test_prepare_analysis import PrepareAnalysisTest
 from swell.test.code_tests.unused_variables_test import UnusedVariablesTest
 from swell.test.code_tests.question_dictionary_comparison_test import QuestionDictionaryTest
 from swell.test.code_tests.test_generate_observing_system import GenerateObservingSystemTest
+from swell.test.code_tests.test_r2d2_transfer_pool import R2D2TransferPoolTest
+from swell.test.code_tests.test_rendered_config_cache import RenderedConfigCacheTest
+from swell.test.code_tests.test_startup import StartupTest
+from swell.test.code_tests.test_task_keys import TaskKeysIndexTest
+from swell.test.code_tests.test_task_server import TaskServerTest
+from swell.test.code_tests.test_yaml_io import YamlIOTest
 
 
 # --------------------------------------------------------------------------------------------------
@@ -49,6 +60,39 @@ def code_tests() -> None:
     # Load Pinned Versions Test
     test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(PinnedVersionsTest))
 
+    # Load task keys index tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TaskKeysIndexTest))
+
+    # Load YAML I/O tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(YamlIOTest))
+
+    # Load GSI satbias parser tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(GsiSatbiasTest))
+
+    # Load observation manifest tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(ObsManifestTest))
+
+    # Load file handler staging tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(FileHandlerTest))
+
+    # Load rendered configuration cache tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(RenderedConfigCacheTest))
+
+    # Load R2D2 transfer pool tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(R2D2TransferPoolTest))
+
+    # Load restart update tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(PrepareAnalysisTest))
+
+    # Load CICE6 background preparation tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(LinkGeosOutputTest))
+
+    # Load start up time tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(StartupTest))
+
+    # Load task server tests
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TaskServerTest))
+
     # Create a test runner
     test_runner = unittest.TextTestRunner()
 
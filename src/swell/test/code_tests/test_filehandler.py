@@ -0,0 +1,155 @@
+import glob
+import os
+import tempfile
+import time
+import unittest
+from typing import Optional
+
+from swell.utilities.exceptions import SWELLConfigError
+from swell.utilities.filehandler import get_file_handler
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def stage_config(src_dir: str, dst_dir: str) -> list:
+
+    # Stage dictionary copying every file of the source directory
+    return [{'copy_files': {'directories': [[os.path.join(src_dir, '*'), dst_dir]]}}]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class FileHandlerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.src_dir = os.path.join(self.work_dir.name, 'static')
+        os.makedirs(self.src_dir)
+
+        self.sizes = {'fv_core.res.nc': 3000, 'crtm_coeff.bin': 2000, 'bump_nicas.nc': 1000}
+        for filename, size in self.sizes.items():
+            with open(os.path.join(self.src_dir, filename), 'wb') as f:
+                f.write(os.urandom(size))
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def stage(self, staging: str, dst_name: Optional[str] = None) -> tuple:
+
+        dst_dir = os.path.join(self.work_dir.name, dst_name or staging)
+        fh = get_file_handler(stage_config(self.src_dir, dst_dir), staging=staging)
+        self.assertTrue(fh.is_ready())
+        fh.get()
+
+        # Staged files have the content of the source files
+        for filename in self.sizes:
+            with open(os.path.join(self.src_dir, filename), 'rb') as f_src, \
+                 open(os.path.join(dst_dir, filename), 'rb') as f_dst:
+                self.assertEqual(f_src.read(), f_dst.read())
+
+        return fh, dst_dir
+
+    def test_copy(self) -> None:
+
+        fh, dst_dir = self.stage('copy')
+        self.assertEqual(fh.staged_files['copy'], 3)
+        self.assertEqual(fh.staged_bytes['copy'], sum(self.sizes.values()))
+
+    def test_hardlink(self) -> None:
+
+        fh, dst_dir = self.stage('hardlink')
+        self.assertEqual(fh.staged_bytes['hardlink'], sum(self.sizes.values()))
+        self.assertEqual(fh.staged_bytes['copy'], 0)
+        for filename in self.sizes:
+            self.assertTrue(os.path.samefile(os.path.join(self.src_dir, filename),
+                                             os.path.join(dst_dir, filename)))
+
+        # Staging again leaves the links in place
+        fh.get()
+        self.assertEqual(fh.staged_files['hardlink'], 6)
+        self.assertIn('0.0 MB copied', fh.staging_report())
+
+    def test_reflink(self) -> None:
+
+        # Filesystems without copy-on-write clones fall back to copying
+        fh, dst_dir = self.stage('reflink')
+        self.assertEqual(fh.staged_bytes['reflink'] + fh.staged_bytes['copy'],
+                         sum(self.sizes.values()))
+
+    def test_symlink(self) -> None:
+
+        fh, dst_dir = self.stage('symlink')
+        self.assertEqual(fh.staged_files['symlink'], 3)
+        for filename in self.sizes:
+            self.assertTrue(os.path.islink(os.path.join(dst_dir, filename)))
+
+    def test_change_strategy(self) -> None:
+
+        src_file = os.path.join(self.src_dir, 'fv_core.res.nc')
+        with open(src_file, 'rb') as f:
+            src_content = f.read()
+
+        # Copy over hard links and symbolic links of an earlier staging
+        for staging in ['hardlink', 'symlink']:
+            self.stage(staging, 'cycle')
+            fh, dst_dir = self.stage('copy', 'cycle')
+            dst_file = os.path.join(dst_dir, 'fv_core.res.nc')
+            self.assertFalse(os.path.islink(dst_file))
+            self.assertFalse(os.path.samefile(src_file, dst_file))
+
+            # The staged copy can be changed without changing the source
+            with open(dst_file, 'wb') as f:
+                f.write(b'changed')
+            with open(src_file, 'rb') as f:
+                self.assertEqual(f.read(), src_content)
+
+        # Links over copies of an earlier staging
+        fh, dst_dir = self.stage('symlink', 'cycle')
+        self.assertEqual(fh.staged_files['symlink'], 3)
+        self.assertTrue(os.path.islink(os.path.join(dst_dir, 'fv_core.res.nc')))
+
+        self.stage('copy', 'cycle')
+        fh, dst_dir = self.stage('hardlink', 'cycle')
+        self.assertEqual(fh.staged_files['hardlink'], 3)
+        self.assertTrue(os.path.samefile(src_file, os.path.join(dst_dir, 'fv_core.res.nc')))
+
+    def test_scan_matches_glob(self) -> None:
+
+        open(os.path.join(self.src_dir, '.hidden.nc'), 'w').close()
+        os.makedirs(os.path.join(self.src_dir, 'sub'))
+        open(os.path.join(self.src_dir, 'sub', 'inner.nc'), 'w').close()
+
+        fh = get_file_handler(stage_config(self.src_dir, self.work_dir.name))
+        for pattern in ['*', '*.nc', '.*', 'fv_core.res.nc', 'missing.nc', '[bc]*', 's?b',
+                        '*/inner.nc', 'sub/*', 'missing/*']:
+            pattern = os.path.join(self.src_dir, pattern)
+            self.assertEqual(sorted(fh.glob(pattern)), sorted(glob.glob(pattern)))
+
+    def test_min_age(self) -> None:
+
+        config = [{'src': self.src_dir, 'dst': self.work_dir.name, 'min_count': 3,
+                   'min_age': 3600}]
+
+        # Files that were just written are not old enough
+        fh = get_file_handler(config)
+        self.assertFalse(fh.is_ready())
+
+        for filename in self.sizes:
+            old_time = time.time() - 7200
+            os.utime(os.path.join(self.src_dir, filename), (old_time, old_time))
+        self.assertTrue(fh.is_ready())
+
+        # Not enough files
+        config[0]['min_count'] = 4
+        self.assertFalse(get_file_handler(config).is_ready())
+
+    def test_unknown_strategy(self) -> None:
+
+        with self.assertRaises(SWELLConfigError):
+            get_file_handler(stage_config(self.src_dir, self.work_dir.name), staging='move')
+
+
+# --------------------------------------------------------------------------------------------------
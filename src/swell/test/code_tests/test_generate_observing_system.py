@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import unittest
 import subprocess
 from datetime import datetime as dt
@@ -91,3 +93,47 @@ class GenerateObservingSystemTest(unittest.TestCase):
                                                   observations[idx], self.dt_cycle_time,
                                                   self.logger)
             assert (use_flags[idx] == generated_use_flags)
+
+    def test_channels_turned_on_and_off(self):
+
+        """ Test turning channels on and off across overlapping record date ranges """
+
+        # Channels 12 and 13 are active until 2012, then only 12 (turn off). Channel 51 is
+        # added for 2015 only (turn on)
+        active_tbl = [
+            "n19 20090414 000000 21001231 240000 amsua 6 4 5 6 9 10 11",
+            "n19 20090414 000000 20120101 000000 amsua 2 12 13",
+            "n19 20120101 000000 21001231 240000 amsua 1 12 # ch13 off",
+            "npp 20120101 000000 21001231 240000 cris-fsr 2 27 28",
+            "npp 20120101 000000 20150101 000000 cris-fsr 2 37 49",
+            "npp 20150101 000000 20160101 000000 cris-fsr 3 37 49 51 # add 51",
+        ]
+        available_tbl = [
+            "n19 20090414 000000 21001231 240000 amsua 15 1-15",
+            "npp 20120101 000000 21001231 240000 cris-fsr 6 27 28 37 49 51 52",
+        ]
+
+        tempdir = tempfile.mkdtemp()
+        for name, lines in zip(['active', 'available'], [active_tbl, available_tbl]):
+            with open(os.path.join(tempdir, name + '_channels.tbl'), 'w') as tbl:
+                tbl.write('\n'.join(lines) + '\n')
+
+        sat_records = ObservingSystemRecords("channel")
+        sat_records.parse_records(tempdir)
+        sat_records.save_yamls(os.path.join(tempdir, 'output'))
+
+        amsua_before = [-1, -1, -1, 1, 1, 1, -1, -1, 1, 1, 1, 1, 1, -1, -1]
+        amsua_after = [-1, -1, -1, 1, 1, 1, -1, -1, 1, 1, 1, 1, -1, -1, -1]
+        expected = [
+            ("amsua_n19", "20100101T000000Z", amsua_before),
+            ("amsua_n19", "20130101T000000Z", amsua_after),
+            ("cris-fsr_npp", "20130101T000000Z", [1, 1, 1, 1, -1, -1]),
+            ("cris-fsr_npp", "20150601T000000Z", [1, 1, 1, 1, 1, -1]),
+        ]
+        for observation, cycle_time, use_flags in expected:
+            _, generated_use_flags = get_channels(os.path.join(tempdir, 'output'), observation,
+                                                  dt.strptime(cycle_time, "%Y%m%dT%H%M%SZ"),
+                                                  self.logger)
+            assert (use_flags == generated_use_flags)
+
+        shutil.rmtree(tempdir)
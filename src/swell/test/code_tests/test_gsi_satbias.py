@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from swell.utilities.gsi_satbias import read_satbias_table, tlapse_lines
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Records of three sensors whose names contain each other (the first is a prefix of the second
+# and a substring of the third)
+satbias_records = '''\
+    1 amsua_n15        1  0.175683E+00  0.118547E+03 1000
+      0.100000    0.200000    0.300000
+    2 amsua_n15        2  0.275683E+00  0.218547E+03 1000
+      0.400000    0.500000    0.600000
+    3 amsua_n15_test   1  0.375683E+00  0.318547E+03 1000
+      0.700000    0.800000    0.900000
+    4 xamsua_n15       1  0.475683E+00  0.418547E+03 1000
+      1.000000    1.100000    1.200000
+'''
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class GsiSatbiasTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.satbias_file = os.path.join(self.work_dir.name, 'satbias.txt')
+        with open(self.satbias_file, 'w') as satbias_file_open:
+            satbias_file_open.write(satbias_records)
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def test_exact_sensor_names(self) -> None:
+
+        satbias_table = read_satbias_table(self.satbias_file)
+
+        self.assertEqual(sorted(satbias_table), ['amsua_n15', 'amsua_n15_test', 'xamsua_n15'])
+
+        # Only the records of the sensor itself, not of sensors containing its name
+        records = satbias_table['amsua_n15']
+        self.assertEqual([record['channel'] for record in records], [1, 2])
+        self.assertEqual(records[1]['coefficients'], [0.4, 0.5, 0.6])
+
+        self.assertEqual(tlapse_lines(satbias_table, 'amsua_n15'),
+                         'amsua_n15 1 0.175683E+00\namsua_n15 2 0.275683E+00\n')
+        self.assertEqual(tlapse_lines(satbias_table, 'amsua_n15_test'),
+                         'amsua_n15_test 1 0.375683E+00\n')
+
+        # Sensors that are not in the file have no records
+        self.assertNotIn('amsua_n1', satbias_table)
+        self.assertEqual(tlapse_lines(satbias_table, 'amsua_n1'), '')
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,200 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import netCDF4 as nc
+import numpy as np
+
+from swell.tasks.base.task_base import taskFactory
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Size of the synthetic CICE6 files (categories, rows, columns)
+ncat, nj, ni = 5, 7, 9
+
+# Aggregated SOCA variables and the restart variables summed over the categories
+soca2cice_vars = {'aicen': 'aicen', 'hicen': 'vicen', 'hsnon': 'vsnon'}
+
+# CICE6 history variables and their SOCA names
+history_vars = {'aice': 'aicen', 'hi': 'hicen', 'hs': 'hsnon'}
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_iced(filename: str) -> None:
+
+    # Synthetic CICE6 restart with the category variables
+    rng = np.random.default_rng(0)
+    with nc.Dataset(filename, 'w', format='NETCDF4') as ds:
+        ds.createDimension('ncat', ncat)
+        ds.createDimension('nj', nj)
+        ds.createDimension('ni', ni)
+        for var_name in soca2cice_vars.values():
+            ds.createVariable(var_name, 'f8', ('ncat', 'nj', 'ni'))[:] = \
+                rng.random((ncat, nj, ni))
+        ds.createVariable('uvel', 'f8', ('nj', 'ni'))[:] = rng.random((nj, ni))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_iceh(filename: str) -> None:
+
+    # Synthetic CICE6 history with a time coordinate and attributes
+    rng = np.random.default_rng(1)
+    with nc.Dataset(filename, 'w', format='NETCDF4') as ds:
+        ds.title = 'sea ice model output for CICE'
+        ds.createDimension('time', None)
+        ds.createDimension('nj', nj)
+        ds.createDimension('ni', ni)
+        time = ds.createVariable('time', 'f8', ('time',))
+        time.units = 'days since 2021-01-01 00:00:00'
+        time[:] = [181.125]
+        for var_name in history_vars:
+            var = ds.createVariable(var_name, 'f4', ('time', 'nj', 'ni'), fill_value=1.0e30)
+            var.units = 'm'
+            var[:] = rng.random((1, nj, ni))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def xarray_cice6_restart(iced_file: str, fname_out: str) -> None:
+
+    # The aggregation as it was done with xarray, for comparison
+    import xarray as xr
+
+    ds = xr.open_dataset(iced_file)
+    aggds = xr.merge(xr.DataArray(
+                     name=varname,
+                     data=np.reshape(np.sum(ds[soca2cice_vars[varname]].values, axis=0),
+                                     (1, nj, ni)),
+                     dims=['time', 'yaxis_1', 'xaxis_1']) for varname in soca2cice_vars.keys())
+    encoding = {varname: {'_FillValue': False} for varname in soca2cice_vars.keys()}
+    aggds.to_netcdf(fname_out, format='NETCDF4', unlimited_dims='time', encoding=encoding)
+
+    with nc.Dataset(fname_out, 'a') as ncf:
+        t = ncf.createVariable('time', 'f8', ('time'))
+        t[:] = 1.0
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def xarray_cice6_history(src_history: str, dst_history: str) -> None:
+
+    # The renaming as it was done with xarray, for comparison
+    import xarray as xr
+
+    ds = xr.open_dataset(src_history)
+    ds = ds.rename({'ni': 'xaxis_1', 'nj': 'yaxis_1'})
+    ds = ds.rename({'aice': 'aicen', 'hi': 'hicen', 'hs': 'hsnon'})
+    ds.to_netcdf(dst_history, mode='w')
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class LinkGeosOutputTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+
+        # LinkGeosOutput task of a cycle of a minimal marine experiment
+        config = os.path.join(self.work_dir.name, 'experiment.yaml')
+        with open(config, 'w') as config_file:
+            config_file.write(f'experiment_root: {self.work_dir.name}\n' +
+                              'experiment_id: link_geos_output_test\n' +
+                              "start_cycle_point: '2021-07-01T03:00:00Z'\n" +
+                              'models:\n' +
+                              '  geos_marine: {}\n')
+
+        self.task = taskFactory().create_task('LinkGeosOutput', config, '2021-07-01T03:00:00Z',
+                                              'geos_marine', None)
+        self.task.bkgr_time_iso = '2021-07-01T03:00:00Z'
+
+        os.makedirs(self.task.forecast_dir('RESTART'))
+        self.iced_file = self.task.forecast_dir(['RESTART', 'iced.nc'])
+        write_iced(self.iced_file)
+
+        self.src_history = self.task.forecast_dir('iceh_03h.2021-07-01-10800.nc')
+        write_iceh(self.src_history)
+
+        self.dst_file = os.path.join(self.task.cycle_dir(),
+                                     'cice.res.' + self.task.bkgr_time_iso + '.nc')
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def assert_same_files(self, file: str, expected_file: str) -> None:
+
+        # Same dimensions and variables (dimensions, values and attributes). xarray writes the
+        # time coordinate with a new encoding (calendar and fill value) while the streamed copy
+        # keeps that of the input, so only the values of coordinates are compared. Fill values
+        # are checked by the other tests since, depending on the version, xarray writes the
+        # '_FillValue: False' encoding used for the restart as a fill value of 0.
+        with nc.Dataset(file, 'r') as ds, nc.Dataset(expected_file, 'r') as expected_ds:
+
+            self.assertEqual({name: (dim.size, dim.isunlimited())
+                              for name, dim in ds.dimensions.items()},
+                             {name: (dim.size, dim.isunlimited())
+                              for name, dim in expected_ds.dimensions.items()})
+            self.assertEqual(set(ds.variables), set(expected_ds.variables))
+
+            for var_name, expected_var in expected_ds.variables.items():
+                var = ds[var_name]
+                self.assertEqual(var.dimensions, expected_var.dimensions)
+                np.testing.assert_allclose(var[:], expected_var[:])
+                if var_name not in expected_ds.dimensions:
+                    self.assertEqual(set(var.ncattrs()) - {'_FillValue'},
+                                     set(expected_var.ncattrs()) - {'_FillValue'})
+
+    def test_cice6_restart(self) -> None:
+
+        src, dst = self.task.prepare_cice6_restart()
+        self.assertEqual((src, dst), (self.iced_file, 'iced.res.2021-07-01T03:00:00Z.nc'))
+
+        # Categories summed, with a time dimension and no fill values
+        with nc.Dataset(self.dst_file, 'r') as ds, nc.Dataset(self.iced_file, 'r') as ds_iced:
+            self.assertTrue(ds.dimensions['time'].isunlimited())
+            np.testing.assert_array_equal(ds['time'][:], [1.0])
+            for varname, cice_varname in soca2cice_vars.items():
+                self.assertEqual(ds[varname].dimensions, ('time', 'yaxis_1', 'xaxis_1'))
+                self.assertNotIn('_FillValue', ds[varname].ncattrs())
+                np.testing.assert_allclose(ds[varname][0, ...],
+                                           np.sum(ds_iced[cice_varname][:], axis=0))
+
+    def test_cice6_history(self) -> None:
+
+        self.task.prepare_cice6_history(self.src_history, self.dst_file)
+
+        # Dimensions and variables renamed, everything else kept
+        with nc.Dataset(self.dst_file, 'r') as ds, nc.Dataset(self.src_history, 'r') as ds_src:
+            self.assertEqual(ds.title, ds_src.title)
+            self.assertEqual(list(ds.dimensions), ['time', 'yaxis_1', 'xaxis_1'])
+            self.assertEqual(ds['time'].units, ds_src['time'].units)
+            for var_name, soca_var_name in history_vars.items():
+                self.assertEqual(ds[soca_var_name].dimensions, ('time', 'yaxis_1', 'xaxis_1'))
+                self.assertEqual(ds[soca_var_name].units, 'm')
+                self.assertEqual(ds[soca_var_name]._FillValue, ds_src[var_name]._FillValue)
+                np.testing.assert_array_equal(ds[soca_var_name][:], ds_src[var_name][:])
+
+    @unittest.skipUnless(importlib.util.find_spec('xarray'), 'xarray is not installed')
+    def test_same_as_xarray(self) -> None:
+
+        expected_file = os.path.join(self.work_dir.name, 'expected.nc')
+
+        self.task.prepare_cice6_restart()
+        xarray_cice6_restart(self.iced_file, expected_file)
+        self.assert_same_files(self.dst_file, expected_file)
+
+        self.task.prepare_cice6_history(self.src_history, self.dst_file)
+        xarray_cice6_history(self.src_history, expected_file)
+        self.assert_same_files(self.dst_file, expected_file)
+
+
+# --------------------------------------------------------------------------------------------------
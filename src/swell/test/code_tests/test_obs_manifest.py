@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import netCDF4 as nc
+
+from swell.utilities import obs_manifest
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_obs_file(filename: str, nlocs: int, nchans: int) -> None:
+
+    with nc.Dataset(filename, 'w') as dataset:
+        dataset.createDimension('Location', nlocs)
+        dataset.createDimension('Channel', nchans)
+        dataset.createVariable('Location', 'i4', ('Location',))[:] = range(nlocs)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def add_entries(directory: str, worker: int, number_of_entries: int) -> None:
+
+    # Each worker adds its own entries one update at a time
+    for index in range(number_of_entries):
+        obs_manifest.update_manifest(directory, {f'obs_{worker}_{index}.nc': {'role': 'obs'}})
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class ObsManifestTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.obs_file = os.path.join(self.work_dir.name, 'amsua_n19.nc')
+        write_obs_file(self.obs_file, 5, 3)
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def metadata(self) -> tuple:
+
+        # Metadata of the file and the number of times a file was probed to get it
+        with mock.patch.object(obs_manifest, 'probe_obs_file',
+                               wraps=obs_manifest.probe_obs_file) as probe:
+            metadata = obs_manifest.obs_files_metadata([self.obs_file])[self.obs_file]
+
+        return metadata, probe.call_count
+
+    def test_probe_recorded(self) -> None:
+
+        metadata, probes = self.metadata()
+        self.assertEqual((metadata['nlocs'], metadata['nchans'], probes), (5, 3, 1))
+
+        manifest = obs_manifest.read_manifest(self.work_dir.name)
+        self.assertEqual(manifest['amsua_n19.nc']['nlocs'], 5)
+        self.assertEqual(obs_manifest.obs_file_locations(self.obs_file), 5)
+
+    def test_cache_reuse_and_invalidation(self) -> None:
+
+        self.metadata()
+
+        # Unchanged file is not probed again
+        metadata, probes = self.metadata()
+        self.assertEqual((metadata['nlocs'], probes), (5, 0))
+
+        # New modification time
+        file_stat = os.stat(self.obs_file)
+        os.utime(self.obs_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9))
+        metadata, probes = self.metadata()
+        self.assertEqual((metadata['nlocs'], probes), (5, 1))
+
+        # New content and size
+        write_obs_file(self.obs_file, 7, 3)
+        metadata, probes = self.metadata()
+        self.assertEqual((metadata['nlocs'], probes), (7, 1))
+
+    def test_probe_keeps_role(self) -> None:
+
+        # Entry recorded by a JEDI executable task, without the dimensions
+        entry = obs_manifest.manifest_entry(self.obs_file, 'diag', checksum=False, probe=False)
+        entry['file'] = 'amsua_n19.nc'
+        obs_manifest.add_to_manifest({self.obs_file: entry})
+
+        metadata, probes = self.metadata()
+        self.assertEqual((metadata['nlocs'], probes), (5, 1))
+
+        entry = obs_manifest.read_manifest(self.work_dir.name)['amsua_n19.nc']
+        self.assertEqual((entry['role'], entry['file'], entry['nlocs']),
+                         ('diag', 'amsua_n19.nc', 5))
+        self.assertEqual(obs_manifest.obs_output_file(self.obs_file), self.obs_file)
+
+    def test_concurrent_updates(self) -> None:
+
+        number_of_workers, number_of_entries = 8, 20
+
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=add_entries,
+                                   args=(self.work_dir.name, worker, number_of_entries))
+                   for worker in range(number_of_workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+
+        # No update was lost
+        manifest = obs_manifest.read_manifest(self.work_dir.name)
+        self.assertEqual(len(manifest), number_of_workers * number_of_entries)
+
+
+# --------------------------------------------------------------------------------------------------
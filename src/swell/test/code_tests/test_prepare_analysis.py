@@ -0,0 +1,223 @@
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import unittest
+
+import netCDF4 as nc
+import numpy as np
+
+from swell.tasks.base.task_base import taskFactory
+from swell.tasks.prepare_analysis import PrepareAnalysis
+from swell.utilities.logger import Logger
+
+
+# --------------------------------------------------------------------------------------------------
+
+# SOCA names of the analysis variables and their names in the MOM6 restarts
+soca_variables = {'sea_water_potential_temperature': 'Temp', 'sea_water_salinity': 'Salt'}
+
+# Dimensions of the analysis and of the restart
+ana_dims = ('zaxis_1', 'yaxis_1', 'xaxis_1')
+rst_dims = ('Layer', 'lath', 'lonh')
+
+# Size (nz, ny, nx) of the small files of the functional tests
+small_shape = (3, 6, 8)
+
+# Synthetic 1/4 degree MOM6 restart for the benchmark, written in the 64-bit offset format used
+# by FMS. Only a few of the 75 levels are used to keep the files (one analysis and one restart
+# with two variables) to about half a gigabyte.
+benchmark_shape = (10, 1080, 1440)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_synthetic_file(filename: str, dims: tuple, shape: tuple, var_names: list,
+                         value: float) -> None:
+
+    nz = shape[0]
+    with nc.Dataset(filename, 'w', format='NETCDF3_64BIT_OFFSET') as ds:
+        ds.createDimension('Time', None)
+        for dim, size in zip(dims, shape):
+            ds.createDimension(dim, size)
+        for var_name in var_names:
+            var = ds.createVariable(var_name, 'f8', ('Time',) + dims)
+            for level in range(nz):
+                var[0, level, :, :] = value + level
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def create_prepare_analysis(work_dir: str) -> PrepareAnalysis:
+
+    # PrepareAnalysis task of a minimal experiment. SOCA_dict comes from the rendered model
+    # metadata when the task is executed.
+    config = os.path.join(work_dir, 'experiment.yaml')
+    with open(config, 'w') as config_file:
+        config_file.write(f'experiment_root: {work_dir}\n' +
+                          'experiment_id: prepare_analysis_test\n' +
+                          'models:\n' +
+                          '  geos_marine:\n' +
+                          '    analysis_variables:\n' +
+                          ''.join(f'    - {soca_var}\n' for soca_var in soca_variables))
+
+    prepare_analysis = taskFactory().create_task('PrepareAnalysis', config, None, 'geos_marine',
+                                                 None)
+    prepare_analysis.SOCA_dict = soca_variables
+    prepare_analysis.soca_ana = prepare_analysis.config.analysis_variables()
+
+    return prepare_analysis
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def whole_array_copy(prepare_analysis: PrepareAnalysis, f_rst: str, f_ana: str) -> None:
+
+    # The update as it was done before the level by level copy, for comparison
+    with nc.Dataset(f_ana, 'r') as ds_ana, nc.Dataset(f_rst, 'r+') as ds_rst:
+        for soca_var in prepare_analysis.soca_ana:
+            var = prepare_analysis.SOCA_dict[soca_var]
+            ds_rst.variables[var][:] = ds_ana.variables[var][:]
+            ds_rst.sync()
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def measure_update(method: str, work_dir: str, f_rst: str, f_ana: str,
+                   queue: multiprocessing.Queue) -> None:
+
+    # Run in a new process so that the peak resident memory is that of the update alone
+    prepare_analysis = create_prepare_analysis(work_dir)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+
+    if method == 'whole array':
+        whole_array_copy(prepare_analysis, f_rst, f_ana)
+    else:
+        prepare_analysis.replace_ocn(f_rst, f_ana)
+
+    wall_time = time.perf_counter() - start_time
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((wall_time, (rss_after - rss_before) * 1024))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class PrepareAnalysisTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.restart_dir = os.path.join(self.work_dir.name, 'RESTART')
+        os.makedirs(self.restart_dir)
+
+        self.f_ana = os.path.join(self.work_dir.name, 'ocn.prepare_analysis_test.an.nc')
+        write_synthetic_file(self.f_ana, ana_dims, small_shape, list(soca_variables.values()),
+                             100.0)
+
+        self.prepare_analysis = create_prepare_analysis(self.work_dir.name)
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def write_split_restart(self, f_rst: str) -> list:
+
+        # Restart split in two files, one variable in each
+        f_rst_name, f_rst_ext = os.path.splitext(f_rst)
+        f_rsts = [f_rst, f_rst_name + '_1' + f_rst_ext]
+        for filename, var_name in zip(f_rsts, soca_variables.values()):
+            write_synthetic_file(filename, rst_dims, small_shape, [var_name], 0.0)
+
+        return f_rsts
+
+    def assert_updated(self, f_rsts: list) -> None:
+
+        nz = small_shape[0]
+        for filename, var_name in zip(f_rsts, soca_variables.values()):
+            with nc.Dataset(filename, 'r') as ds_rst:
+                self.assertEqual(list(ds_rst.variables), [var_name])
+                expected = (100.0 + np.arange(nz))[:, None, None] * np.ones(small_shape)
+                np.testing.assert_array_equal(ds_rst[var_name][0, ...], expected)
+
+    def test_multi_file_restart(self) -> None:
+
+        f_rsts = self.write_split_restart(os.path.join(self.restart_dir, 'MOM.res.nc'))
+
+        self.prepare_analysis.replace_ocn(f_rsts[0], self.f_ana)
+
+        # Each variable is updated in the file that holds it
+        self.assert_updated(f_rsts)
+
+    def test_record_time_restart(self) -> None:
+
+        f_rsts = self.write_split_restart(os.path.join(self.restart_dir,
+                                                       'MOM.res_Y2021_D182_S10800.nc'))
+
+        self.prepare_analysis.replace_ocn(f_rsts[0], self.f_ana)
+
+        # Restarts written at a record time are updated and renamed to the generic names
+        self.assertEqual(sorted(os.listdir(self.restart_dir)), ['MOM.res.nc', 'MOM.res_1.nc'])
+        self.assert_updated([os.path.join(self.restart_dir, 'MOM.res.nc'),
+                             os.path.join(self.restart_dir, 'MOM.res_1.nc')])
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class PrepareAnalysisBenchmark(unittest.TestCase):
+
+    # Not part of the code tests (it writes about half a gigabyte), run with
+    #   python -m unittest swell.test.code_tests.test_prepare_analysis.PrepareAnalysisBenchmark
+
+    def test_replace_ocn_benchmark(self) -> None:
+
+        logger = Logger('PrepareAnalysisBenchmark')
+        field_size = int(np.prod(benchmark_shape)) * 8
+
+        with tempfile.TemporaryDirectory() as work_dir:
+
+            f_ana = os.path.join(work_dir, 'ocn.an.nc')
+            f_rst = os.path.join(work_dir, 'MOM.res.nc')
+
+            timings = {}
+            for method in ['whole array', 'level by level']:
+
+                write_synthetic_file(f_ana, ana_dims, benchmark_shape,
+                                     list(soca_variables.values()), 1.0)
+                write_synthetic_file(f_rst, rst_dims, benchmark_shape,
+                                     list(soca_variables.values()), 0.0)
+
+                context = multiprocessing.get_context('fork')
+                queue = context.Queue()
+                process = context.Process(target=measure_update,
+                                          args=(method, work_dir, f_rst, f_ana, queue))
+                process.start()
+                timings[method] = queue.get()
+                process.join()
+                self.assertEqual(process.exitcode, 0)
+
+                wall_time, peak_rss = timings[method]
+                logger.info(f'{method:>14} update of {benchmark_shape} restart: ' +
+                            f'{wall_time:.2f} s, peak memory increase {peak_rss/1.0e6:.1f} MB')
+
+            # The restart has the analysis
+            nz = benchmark_shape[0]
+            with nc.Dataset(f_rst, 'r') as ds_rst:
+                for var_name in soca_variables.values():
+                    self.assertTrue(np.all(ds_rst[var_name][0, nz-1, :, :] == nz))
+
+        # Only a level of a variable is held in memory at a time
+        self.assertLess(timings['level by level'][1], field_size / 2)
+        self.assertLess(timings['level by level'][1], timings['whole array'][1])
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from swell.utilities.logger import Logger
+from swell.utilities.r2d2 import R2D2TransferPool
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class LocalR2D2:
+
+    '''
+        Stand-in for R2D2 fetch and store that keeps the files in a local directory. Each transfer
+        takes transfer_time seconds and the first failures_per_file transfers of each file fail.
+    '''
+
+    def __init__(self, store_dir: str, transfer_time: float = 0.0,
+                 failures_per_file: int = 0) -> None:
+
+        self.store_dir = store_dir
+        self.transfer_time = transfer_time
+        self.failures_per_file = failures_per_file
+
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+
+    def transfer(self, src: str, dst: str, key: str) -> None:
+
+        with self.lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            attempt = self.attempts[key]
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+        try:
+            time.sleep(self.transfer_time)
+            if attempt <= self.failures_per_file:
+                raise IOError(f'Transfer {attempt} of {key} failed')
+            shutil.copyfile(src, dst)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def stored_file(self, step: str) -> str:
+        return os.path.join(self.store_dir, f'bkg.{step}.nc')
+
+    def store(self, source_file: str, step: str) -> None:
+        self.transfer(source_file, self.stored_file(step), source_file)
+
+    def fetch(self, target_file: str, step: str) -> None:
+        self.transfer(self.stored_file(step), target_file, target_file)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class R2D2TransferPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.logger = Logger('R2D2TransferPoolTest')
+        self.work_dir = tempfile.TemporaryDirectory()
+
+        self.store_dir = os.path.join(self.work_dir.name, 'r2d2')
+        self.cycle_dir = os.path.join(self.work_dir.name, 'cycle')
+        os.makedirs(self.store_dir)
+        os.makedirs(self.cycle_dir)
+
+        # Backgrounds in the store
+        self.steps = [f'PT{hour}H' for hour in range(3, 11)]
+        for step in self.steps:
+            with open(os.path.join(self.store_dir, f'bkg.{step}.nc'), 'wb') as f:
+                f.write(os.urandom(1000))
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def target_file(self, step: str) -> str:
+        return os.path.join(self.cycle_dir, f'bkg.{step}.nc')
+
+    def add_fetches(self, pool: R2D2TransferPool, r2d2: LocalR2D2) -> None:
+        for step in self.steps:
+            pool.add(self.target_file(step), r2d2.fetch, target_file=self.target_file(step),
+                     step=step)
+
+    def test_concurrent_transfers(self) -> None:
+
+        r2d2 = LocalR2D2(self.store_dir, transfer_time=0.2)
+        pool = R2D2TransferPool(self.logger, max_workers=8, max_attempts=1)
+        self.add_fetches(pool, r2d2)
+
+        start_time = time.perf_counter()
+        groups = list(pool.run())
+        elapsed_time = time.perf_counter() - start_time
+
+        self.assertEqual(sorted(groups), sorted(self.target_file(step) for step in self.steps))
+        self.assertGreater(r2d2.max_active, 1)
+        self.assertLessEqual(r2d2.max_active, 8)
+        self.assertLess(elapsed_time, 0.2 * len(self.steps))
+
+        for step in self.steps:
+            with open(self.target_file(step), 'rb') as f_target, \
+                 open(r2d2.stored_file(step), 'rb') as f_stored:
+                self.assertEqual(f_target.read(), f_stored.read())
+
+        # The pool can be reused for the stores
+        r2d2.store_dir = os.path.join(self.work_dir.name, 'r2d2_store')
+        os.makedirs(r2d2.store_dir)
+        for step in self.steps:
+            pool.add(self.target_file(step), r2d2.store, source_file=self.target_file(step),
+                     step=step)
+        self.assertEqual(len(list(pool.run())), len(self.steps))
+        self.assertEqual(len(os.listdir(r2d2.store_dir)), len(self.steps))
+
+    def test_retry_then_succeed(self) -> None:
+
+        r2d2 = LocalR2D2(self.store_dir, failures_per_file=2)
+        pool = R2D2TransferPool(self.logger, max_workers=4, max_attempts=3, retry_wait=0.0)
+        self.add_fetches(pool, r2d2)
+
+        self.assertEqual(len(list(pool.run())), len(self.steps))
+        self.assertEqual(set(r2d2.attempts.values()), {3})
+
+    def test_abort_after_max_attempts(self) -> None:
+
+        r2d2 = LocalR2D2(self.store_dir, failures_per_file=3)
+        pool = R2D2TransferPool(self.logger, max_workers=4, max_attempts=3, retry_wait=0.0)
+        pool.add('background', r2d2.fetch, target_file=self.target_file('PT3H'), step='PT3H')
+
+        with self.assertRaises(SystemExit):
+            list(pool.run())
+
+        self.assertEqual(r2d2.attempts[self.target_file('PT3H')], 3)
+
+    def test_group_yielded_when_done(self) -> None:
+
+        # The slow transfer only finishes once the fast group has been handed back
+        fast_group_done = threading.Event()
+
+        def slow_transfer(target_file: str) -> None:
+            self.assertTrue(fast_group_done.wait(30), 'Fast group was not yielded first')
+
+        def fast_transfer(target_file: str) -> None:
+            pass
+
+        pool = R2D2TransferPool(self.logger, max_workers=4)
+        pool.add('slow', slow_transfer, target_file='slow.nc')
+        pool.add('fast', fast_transfer, target_file='fast_1.nc')
+        pool.add('fast', fast_transfer, target_file='fast_2.nc')
+
+        groups = []
+        for group in pool.run():
+            groups.append(group)
+            if group == 'fast':
+                fast_group_done.set()
+
+        self.assertEqual(groups, ['fast', 'slow'])
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from swell.tasks.base.task_base import rendered_cache_dir_name, taskFactory
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class RenderedConfigCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def create_task(self, task: str, disk_cache: bool) -> object:
+
+        # Task of a cycle of a minimal experiment
+        config = os.path.join(self.work_dir.name, 'experiment.yaml')
+        with open(config, 'w') as config_file:
+            config_file.write(f'experiment_root: {self.work_dir.name}\n' +
+                              'experiment_id: rendered_config_cache_test\n' +
+                              "start_cycle_point: '2021-12-12T00:00:00Z'\n" +
+                              f'rendered_config_disk_cache: {str(disk_cache).lower()}\n' +
+                              'models:\n' +
+                              '  geos_atmosphere: {}\n')
+
+        return taskFactory().create_task(task, config, '2021-12-12T00:00:00Z', 'geos_atmosphere',
+                                         None)
+
+    def test_disk_cache_off_by_default(self) -> None:
+
+        task = self.create_task('CleanCycle', False)
+        self.assertIsNone(task.jedi_rendering.rendered_cache_dir)
+
+    def test_disk_cache_removed_by_clean_cycle(self) -> None:
+
+        task = self.create_task('CleanCycle', True)
+
+        rendered_cache_dir = os.path.join(task.cycle_dir(), rendered_cache_dir_name)
+        self.assertEqual(task.jedi_rendering.rendered_cache_dir, rendered_cache_dir)
+
+        # Rendering cached by an earlier task of the cycle
+        os.makedirs(rendered_cache_dir)
+        with open(os.path.join(rendered_cache_dir, 'rendered.pickle'), 'wb') as cache_file:
+            cache_file.write(b'rendered')
+
+        task.execute()
+        self.assertFalse(os.path.exists(rendered_cache_dir))
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from swell.utilities.logger import Logger
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Packages that a simple task must not need at start up
+heavy_modules = ['eva', 'f90nml', 'jinja2', 'netCDF4', 'numpy', 'pandas', 'pyiodaconv',
+                 'questionary', 'r2d2', 'xarray']
+
+# Budget for the start up of a simple task: the number of modules imported beyond those of a bare
+# interpreter (about 110 when the budget was set) and the import time. The time budget is generous
+# so that loaded machines pass, and can be changed with the environment variable.
+startup_module_budget = 150
+startup_time_budget = float(os.environ.get('SWELL_STARTUP_TIME_BUDGET', '1.0'))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def import_times(statement: str) -> dict:
+
+    """
+    Run the statement in a fresh interpreter with -X importtime and return the cumulative import
+    time (seconds) of every module that was imported.
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                             check=True)
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative) / 1.0e6
+
+    return times
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_clean_cycle_startup(self) -> None:
+
+        times = import_times('import swell.swell, swell.tasks.clean_cycle')
+
+        for module in heavy_modules:
+            self.assertFalse(module in times, f'swell task CleanCycle imports {module}')
+
+        # Modules added to the start up, which does not depend on the machine
+        startup_modules = set(times) - set(import_times('pass'))
+        self.assertLessEqual(len(startup_modules), startup_module_budget,
+                             f'swell task CleanCycle imports {len(startup_modules)} modules')
+
+        startup_time = times['swell.swell'] + times['swell.tasks.clean_cycle']
+        Logger('StartupTest').info(f'swell task CleanCycle imports {len(startup_modules)} ' +
+                                   f'modules in {startup_time:.3f} seconds')
+        self.assertLess(startup_time, startup_time_budget,
+                        f'swell task CleanCycle imports in {startup_time:.3f} seconds')
+
+    def test_cli_does_not_import_subcommands(self) -> None:
+
+        times = import_times('import swell.swell')
+
+        for module in ['swell.deployment.create_experiment', 'swell.test.suite_tests.suite_tests',
+                       'swell.utilities.render_jedi_interface_files', 'swell.utilities.geos']:
+            self.assertFalse(module in times, f'swell imports {module} at start up')
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from swell.utilities import config
+from swell.utilities.yaml_io import dump_yaml, load_yaml_file
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class TaskKeysIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.work_dir.name, config.task_keys_index_file)
+        self.experiment_file = os.path.join(self.work_dir.name, 'experiment.yaml')
+
+        config.write_task_keys_index(self.work_dir.name)
+        self.clean_cycle_keys = set(config.compile_task_keys()['CleanCycle'])
+
+    def tearDown(self) -> None:
+
+        config.task_keys_cache.pop(self.index_file, None)
+        self.work_dir.cleanup()
+
+    def rewrite_index(self, index: dict) -> None:
+
+        with open(self.index_file, 'w') as index_file_open:
+            dump_yaml(index, index_file_open)
+
+    def test_index_used(self) -> None:
+
+        # Index of the installed task questions, with a key that only the index has
+        index = load_yaml_file(self.index_file)
+        index['task_keys']['CleanCycle'].append('index_only_key')
+        self.rewrite_index(index)
+
+        self.assertEqual(config.get_task_keys(self.experiment_file, 'CleanCycle'),
+                         self.clean_cycle_keys | {'index_only_key'})
+
+    def test_index_of_other_task_questions(self) -> None:
+
+        # Index written by another swell, newer than the installed task questions but compiled
+        # from different ones
+        index = load_yaml_file(self.index_file)
+        index['task_questions_sha256'] = '0' * 64
+        index['task_keys']['CleanCycle'] = []
+        self.rewrite_index(index)
+
+        task_questions_mtime = os.path.getmtime(config.task_questions_file())
+        os.utime(self.index_file, (task_questions_mtime + 60, task_questions_mtime + 60))
+
+        self.assertEqual(config.get_task_keys(self.experiment_file, 'CleanCycle'),
+                         self.clean_cycle_keys)
+
+    def test_index_without_checksum(self) -> None:
+
+        # Index in the format written before the checksum was recorded
+        self.rewrite_index({'CleanCycle': []})
+
+        self.assertEqual(config.get_task_keys(self.experiment_file, 'CleanCycle'),
+                         self.clean_cycle_keys)
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,258 @@
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from swell.tasks.base import task_base, task_server
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Environment variable giving the file where the stand-in task records what it received
+output_variable = 'SWELL_TASK_SERVER_TEST_OUTPUT'
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def fake_run_task(task: str, config: str, datetime: str, model: str, ensemblePacket: str) -> None:
+
+    # Stand-in for running a task, recording the task, model and working directory of the job
+    with open(os.environ[output_variable], 'w') as output_file:
+        output_file.write(f'{task} {model} {os.getcwd()}')
+
+    if task == 'FailingTask':
+        sys.exit(3)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def impostor_server(socket_path: str, uid: int, queue: multiprocessing.Queue) -> None:
+
+    # Server of another user listening on a socket file of the user (the credentials of the
+    # listening process are those it has when it starts listening)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as impostor:
+        impostor.bind(socket_path)
+        os.setgid(uid)
+        os.setuid(uid)
+        impostor.listen()
+        queue.put('listening')
+
+        # Record what the job sends
+        connection, _ = impostor.accept()
+        with connection:
+            queue.put(connection.recv(1024))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class TaskServerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.work_dir.name, 'experiment.yaml')
+        with open(self.config, 'w') as config_file:
+            config_file.write('experiment_id: task_server_test\n')
+
+        self.socket_path = task_server.task_server_socket(self.config)
+        self.output_file = os.path.join(self.work_dir.name, 'task_output.txt')
+
+        # dispatch_task forwards these signals to the task while it waits
+        self.signal_handlers = {signum: signal.getsignal(signum)
+                                for signum in [signal.SIGTERM, signal.SIGINT]}
+
+        self.servers = []
+
+        # Stand-in tasks that are run by the server
+        server_tasks = mock.patch.object(task_server, 'server_tasks', ['GoodTask', 'FailingTask'])
+        server_tasks.start()
+        self.addCleanup(server_tasks.stop)
+
+    def tearDown(self) -> None:
+
+        for signum, handler in self.signal_handlers.items():
+            signal.signal(signum, handler)
+
+        for server in self.servers:
+            if server.is_alive():
+                server.terminate()
+            server.join()
+
+        self.work_dir.cleanup()
+
+    def start_server(self) -> multiprocessing.Process:
+
+        # The server is forked with the stand-in task and without importing tasks
+        context = multiprocessing.get_context('fork')
+        with mock.patch.object(task_base, 'run_task', fake_run_task), \
+             mock.patch.object(task_server, 'server_tasks', []):
+            server = context.Process(target=task_server.serve_tasks, args=(self.config,))
+            server.start()
+        self.servers.append(server)
+
+        # Wait until the server accepts connections
+        for _ in range(600):
+            self.assertTrue(server.is_alive(), 'Task server did not start')
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.socket_path)
+                    return server
+                except OSError:
+                    time.sleep(0.1)
+
+        self.fail('Task server did not start listening')
+
+    def dispatch(self, task: str) -> int:
+
+        with mock.patch.dict(os.environ, {output_variable: self.output_file}):
+            return task_server.dispatch_task(task, self.config, None, 'geos_atmosphere', None)
+
+    def stop_server(self, server: multiprocessing.Process) -> None:
+
+        task_server.stop_task_server(self.config)
+        server.join(60)
+        self.assertEqual(server.exitcode, 0)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_runs_in_process_without_server(self) -> None:
+
+        self.assertIsNone(self.dispatch('GoodTask'))
+
+        # task_wrapper runs the task itself
+        with mock.patch.object(task_base, 'run_task') as run_task:
+            task_base.task_wrapper('GoodTask', self.config, None, 'geos_atmosphere', None)
+        run_task.assert_called_once_with('GoodTask', self.config, None, 'geos_atmosphere', None)
+
+    def test_dispatch_and_stop(self) -> None:
+
+        server = self.start_server()
+
+        # Only the user running the server can use the socket
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+        # The task runs with the environment and working directory of the job
+        self.assertEqual(self.dispatch('GoodTask'), 0)
+        with open(self.output_file, 'r') as output_file:
+            self.assertEqual(output_file.read(), f'GoodTask geos_atmosphere {os.getcwd()}')
+
+        # The exit code of a failing task is relayed to the job
+        self.assertEqual(self.dispatch('FailingTask'), 3)
+
+        self.stop_server(server)
+
+        # Without the server the task is left to the caller again
+        self.assertIsNone(self.dispatch('GoodTask'))
+
+    def test_long_task_runs_in_process(self) -> None:
+
+        server = self.start_server()
+
+        # Tasks that are not short are left to the job even when there is a server
+        self.assertIsNone(self.dispatch('RunJediVariationalExecutable'))
+        self.assertFalse(os.path.exists(self.output_file))
+
+        self.stop_server(server)
+
+    def test_stale_socket(self) -> None:
+
+        # Socket left behind by a server that died
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket_path)
+        self.assertTrue(os.path.exists(self.socket_path))
+
+        self.assertIsNone(self.dispatch('GoodTask'))
+
+        # A new server replaces the stale socket
+        server = self.start_server()
+        self.assertEqual(self.dispatch('GoodTask'), 0)
+        self.stop_server(server)
+
+    def test_socket_of_other_user(self) -> None:
+
+        server = self.start_server()
+
+        # The socket belongs to another user as far as the job is concerned
+        with mock.patch('os.getuid', return_value=os.getuid() + 1):
+            self.assertIsNone(self.dispatch('GoodTask'))
+        self.assertFalse(os.path.exists(self.output_file))
+
+        self.stop_server(server)
+
+    @unittest.skipUnless(os.getuid() == 0, 'Changing the user of the server requires root')
+    def test_peer_of_other_user(self) -> None:
+
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        impostor = context.Process(target=impostor_server, args=(self.socket_path, 65534, queue))
+        impostor.start()
+        self.servers.append(impostor)
+        self.assertEqual(queue.get(timeout=60), 'listening')
+
+        # The socket file is the user's but the process listening on it is not, so the job runs
+        # the task itself without sending its environment or output
+        self.assertEqual(os.stat(self.socket_path).st_uid, os.getuid())
+        self.assertIsNone(self.dispatch('GoodTask'))
+        self.assertEqual(queue.get(timeout=60), b'')
+
+    def test_fallback_socket_directory(self) -> None:
+
+        # The socket path next to a deeply nested configuration is too long for a Unix socket
+        config_dir = os.path.join(self.work_dir.name, 'experiment_' + 'x' * 100)
+        os.makedirs(config_dir)
+        self.config = os.path.join(config_dir, 'experiment.yaml')
+        with open(self.config, 'w') as config_file:
+            config_file.write('experiment_id: task_server_test\n')
+
+        environment = {key: value for key, value in os.environ.items()
+                       if key != 'XDG_RUNTIME_DIR'}
+        with mock.patch.object(tempfile, 'tempdir', self.work_dir.name), \
+             mock.patch.dict(os.environ, environment, clear=True):
+
+            # The socket goes in a directory that only the user can access
+            self.socket_path = task_server.task_server_socket(self.config)
+            socket_dir = os.path.dirname(self.socket_path)
+            self.assertEqual(socket_dir, os.path.join(self.work_dir.name, f'swell-{os.getuid()}'))
+            self.assertEqual(os.stat(socket_dir).st_mode & 0o777, 0o700)
+
+            server = self.start_server()
+            self.assertEqual(self.dispatch('GoodTask'), 0)
+
+            # A directory that others can access is not used
+            os.chmod(socket_dir, 0o755)
+            with self.assertRaises(PermissionError):
+                task_server.task_server_socket(self.config)
+            self.assertIsNone(self.dispatch('GoodTask'))
+            os.chmod(socket_dir, 0o700)
+
+            self.stop_server(server)
+
+    def test_single_server(self) -> None:
+
+        server = self.start_server()
+
+        # A second server for the experiment refuses to start and leaves the first one running
+        second_server = self.start_second_server()
+        self.assertNotEqual(second_server.exitcode, 0)
+
+        self.assertEqual(self.dispatch('GoodTask'), 0)
+        self.stop_server(server)
+
+    def start_second_server(self) -> multiprocessing.Process:
+
+        context = multiprocessing.get_context('fork')
+        second_server = context.Process(target=task_server.serve_tasks, args=(self.config,))
+        second_server.start()
+        second_server.join(60)
+
+        return second_server
+
+
+# --------------------------------------------------------------------------------------------------
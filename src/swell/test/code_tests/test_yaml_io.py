@@ -0,0 +1,116 @@
+import os
+import glob
+import time
+import unittest
+
+import yaml
+
+from swell.swell_path import get_swell_path
+from swell.utilities.logger import Logger
+from swell.utilities.jinja2 import template_file_jinja2, template_file_variables
+from swell.utilities import yaml_io
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def rendered_observers(logger: Logger) -> list:
+
+    # Render every geos_atmosphere observation template with stand-in values, which gives a list
+    # of observers the size of a full atmosphere 3DVar
+    observations_path = os.path.join(get_swell_path(), 'configuration', 'jedi', 'interfaces',
+                                     'geos_atmosphere', 'observations')
+
+    observers = []
+    for template_file in sorted(glob.glob(os.path.join(observations_path, '*.yaml'))):
+        if os.path.basename(template_file) in ['obsop_name_map.yaml', 'ufo_tests.yaml']:
+            continue
+        template_dict = {}
+        for variable in template_file_variables(template_file):
+            if variable.endswith('_channels'):
+                template_dict[variable] = list(range(1, 617))
+            else:
+                template_dict[variable] = '20211211T210000Z'
+        template_str = template_file_jinja2(logger, template_file, template_dict)
+        observers.append(yaml_io.load_yaml(template_str))
+
+    return observers
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class YamlIOTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.logger = Logger('YamlIOTest')
+        cls.jedi_config = {'cost function': {'observations': {
+                               'observers': rendered_observers(cls.logger)}}}
+
+    def test_same_as_pure_python(self) -> None:
+
+        config_str = yaml.safe_dump(self.jedi_config, default_flow_style=False)
+
+        self.assertEqual(yaml_io.dump_yaml(self.jedi_config, default_flow_style=False),
+                         config_str)
+        self.assertEqual(yaml_io.load_yaml(config_str), yaml.safe_load(config_str))
+
+    def test_libyaml_used(self) -> None:
+
+        # The libyaml loader and dumper are used whenever PyYAML has them
+        if yaml.__with_libyaml__:
+            self.assertIs(yaml_io.Loader, yaml.CSafeLoader)
+            self.assertIs(yaml_io.Dumper, yaml.CSafeDumper)
+        else:
+            self.assertIs(yaml_io.Loader, yaml.SafeLoader)
+            self.assertIs(yaml_io.Dumper, yaml.SafeDumper)
+
+    def test_no_python_tags(self) -> None:
+
+        # Only plain YAML is written, e.g. a tuple is a list rather than a !!python/tuple
+        self.assertEqual(yaml_io.dump_yaml({'channels': (1, 2)}), 'channels:\n- 1\n- 2\n')
+        with self.assertRaises(yaml.representer.RepresenterError):
+            yaml_io.dump_yaml({'channels': range(1, 3)})
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class YamlIOBenchmark(unittest.TestCase):
+
+    # Not part of the code tests (the timings depend on the load of the machine), run with
+    #   python -m unittest swell.test.code_tests.test_yaml_io.YamlIOBenchmark
+
+    def test_benchmark(self) -> None:
+
+        # Time the pure Python and swell (libyaml when available) paths on the rendered config
+        logger = Logger('YamlIOBenchmark')
+        jedi_config = {'cost function': {'observations': {
+                           'observers': rendered_observers(logger)}}}
+        config_str = yaml.safe_dump(jedi_config, default_flow_style=False)
+
+        timings = {}
+        for name, load, dump in [
+            ('pure python', yaml.safe_load,
+             lambda data: yaml.safe_dump(data, default_flow_style=False)),
+            ('swell', yaml_io.load_yaml,
+             lambda data: yaml_io.dump_yaml(data, default_flow_style=False)),
+        ]:
+            start_time = time.perf_counter()
+            load(config_str)
+            load_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            dump(jedi_config)
+            dump_time = time.perf_counter() - start_time
+
+            timings[name] = load_time + dump_time
+            logger.info(f'{name:>12} ({len(config_str)} characters): load ' +
+                        f'{load_time:.3f} s, dump {dump_time:.3f} s')
+
+        if yaml.__with_libyaml__:
+            self.assertLess(timings['swell'], timings['pure python'])
+
+
+# --------------------------------------------------------------------------------------------------
@@ -7,5 +7,7 @@ import contextlib
 def suppress_stdout():
     tmp_stdout = sys.stdout
     sys.stdout = io.StringIO()
-    yield
-    sys.stdout = tmp_stdout
+    try:
+        yield
+    finally:
+        sys.stdout = tmp_stdout
@@ -1,5 +1,4 @@
 import tempfile
-import yaml
 import random
 
 from pathlib import Path
@@ -9,6 +8,7 @@ from importlib import resources
 from swell.deployment.create_experiment import create_experiment_directory
 from swell.deployment.launch_experiment import launch_experiment
 from swell.utilities.dictionary import update_dict
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 
 def run_suite(suite: str):
@@ -24,7 +24,7 @@ def run_suite(suite: str):
     yamlfile = Path("~/.swell/swell-test.yaml").expanduser()
     try:
         with open(yamlfile, "r") as f:
-            test_user_config = yaml.safe_load(f)
+            test_user_config = load_yaml(f)
         print(f"Updating test defaults with user config from {yamlfile}.")
         test_config = {**test_config, **test_user_config}
     except FileNotFoundError:
@@ -45,7 +45,7 @@ def run_suite(suite: str):
                             f"{suite}-tier1.yaml")
     print(f"Reading suite overrides from: {suite_overrides_file}")
     with suite_overrides_file.open("r") as f:
-        suite_overrides = yaml.safe_load(f)
+        suite_overrides = load_yaml(f)
 
     override = {
         "experiment_id": experiment_id,
@@ -73,7 +73,7 @@ def run_suite(suite: str):
 
     override_yml = experiment_dir / "override.yaml"
     with open(override_yml, "w") as f:
-        yaml.dump(override, f)
+        dump_yaml(override, f)
 
     create_experiment_directory(
         suite, "defaults", "nccs_discover_sles15",
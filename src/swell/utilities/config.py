@@ -7,12 +7,124 @@
 # --------------------------------------------------------------------------------------------------
 
 
+import copy
+import hashlib
 import os
-import yaml
 from typing import Callable
 
 from swell.swell_path import get_swell_path
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import dump_yaml, load_yaml_file
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Name of the task to keys index that swell create writes next to experiment.yaml
+task_keys_index_file = 'task_keys.yaml'
+
+# Task to keys indices that have been read, keyed by the file they came from
+task_keys_cache = {}
+
+# SHA-256 checksums of task questions files, keyed by file
+task_questions_checksums = {}
+
+# Experiment configurations that have been read, keyed by file and stored with the file mtime.
+# These are reused by the tasks that a task server (see tasks/base/task_server.py) runs.
+experiment_dict_cache = {}
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def task_questions_file() -> str:
+
+    return os.path.join(get_swell_path(), 'tasks', 'task_questions.yaml')
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def task_questions_checksum() -> str:
+
+    # The index records the task questions it was compiled from by their content since pip keeps
+    # the modification times of the files in a wheel
+    questions_file = task_questions_file()
+
+    if questions_file not in task_questions_checksums:
+        with open(questions_file, 'rb') as questions_file_open:
+            task_questions_checksums[questions_file] = \
+                hashlib.sha256(questions_file_open.read()).hexdigest()
+
+    return task_questions_checksums[questions_file]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def compile_task_keys() -> dict:
+
+    '''
+        Function inverts the task questions into a dictionary holding, for each task, the sorted
+        list of experiment keys that the task can access
+    '''
+
+    task_keys = {}
+    for experiment_key, key_question_dict in load_yaml_file(task_questions_file()).items():
+        for task_name in key_question_dict['tasks']:
+            task_keys.setdefault(task_name, []).append(experiment_key)
+
+    return {task_name: sorted(keys) for task_name, keys in task_keys.items()}
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_task_keys_index(exp_suite_path: str) -> None:
+
+    index = {
+        'task_questions_sha256': task_questions_checksum(),
+        'task_keys': compile_task_keys(),
+    }
+
+    with open(os.path.join(exp_suite_path, task_keys_index_file), 'w') as index_file_open:
+        dump_yaml(index, index_file_open, default_flow_style=False)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def get_task_keys(input_file: str, task_name: str) -> set:
+
+    '''
+        Function returns the experiment keys that the task can access. These come from the index
+        next to the experiment configuration when it was compiled from the task_questions.yaml of
+        the installed swell, otherwise task_questions.yaml is read.
+    '''
+
+    index_file = os.path.join(os.path.dirname(input_file), task_keys_index_file)
+
+    if index_file not in task_keys_cache:
+
+        index = load_yaml_file(index_file) if os.path.isfile(index_file) else None
+
+        if isinstance(index, dict) and \
+           index.get('task_questions_sha256') == task_questions_checksum():
+            task_keys_cache[index_file] = index['task_keys']
+        else:
+            task_keys_cache[index_file] = compile_task_keys()
+
+    return set(task_keys_cache[index_file].get(task_name, []))
+
+
+def read_experiment_dict(input_file: str) -> dict:
+
+    mtime = os.stat(input_file).st_mtime_ns
+
+    if input_file not in experiment_dict_cache or experiment_dict_cache[input_file][0] != mtime:
+        experiment_dict_cache[input_file] = (mtime, load_yaml_file(input_file))
+
+    # Config modifies the dictionary so always hand out a copy
+    return copy.deepcopy(experiment_dict_cache[input_file][1])
 
 
 # --------------------------------------------------------------------------------------------------
@@ -52,8 +164,7 @@ class Config():
         self.__logger__ = logger
 
         # Read the configuration yaml file
-        with open(input_file, 'r') as ymlfile:
-            experiment_dict = yaml.safe_load(ymlfile)
+        experiment_dict = read_experiment_dict(input_file)
 
         # Save some things that all tasks can use (suite level questions)
         self.__experiment_root__ = experiment_dict.get('experiment_root')
@@ -61,6 +172,8 @@ class Config():
         self.__platform__ = experiment_dict.get('platform')
         self.__start_cycle_point__ = experiment_dict.get('start_cycle_point')
         self.__suite_to_run__ = experiment_dict.get('suite_to_run')
+        self.__rendered_config_disk_cache__ = experiment_dict.get('rendered_config_disk_cache',
+                                                                  False)
 
         # If experiment_dict contains models key add the model components to the object
         if 'models' in experiment_dict.keys():
@@ -99,40 +212,36 @@ class Config():
         # supposed to act upon.
         experiment_dict.update(model_config)
 
-        # Step 2: create variables in the object with the keys/values in the config
-        # -------------------------------------------------------------------------
-
-        # Open the question dictionary
-        with open(os.path.join(get_swell_path(), 'tasks', 'task_questions.yaml'), 'r') as ymlfile:
-            question_dict = yaml.safe_load(ymlfile)
-
-        # Loop through the dictionary
-        for experiment_key, experiment_value in experiment_dict.items():
+        # Step 2: keep the keys/values in the config that the task can access
+        # --------------------------------------------------------------------
 
-            key_question_dict = question_dict.get(experiment_key)
-
-            if key_question_dict is not None:
-
-                if task_name in key_question_dict['tasks']:
-
-                    # Add this variable to the object
-                    setattr(self, f'__{experiment_key}__', experiment_value)
-
-                    # Add a method to get the variable
-                    setattr(self, f'{experiment_key}', self.get(experiment_key))
+        # Variables are resolved on first use (see __getattr__)
+        self.__experiment_dict__ = experiment_dict
+        self.__task_keys__ = get_task_keys(input_file, task_name)
 
     # ----------------------------------------------------------------------------------------------
 
     def get(self, experiment_key: str) -> Callable:
         def getter(default='None'):
-            return getattr(self, f'__{experiment_key}__')
+            return self.__experiment_dict__[experiment_key]
         return getter
 
     # ----------------------------------------------------------------------------------------------
 
     # Implementation of __getattr__ to ensure there is no crash when a task requests a variable that
-    # does not exist. This is valid so long as the task provides a default value.
+    # does not exist. This is valid so long as the task provides a default value. Variables that
+    # the task can access are resolved here the first time they are requested.
     def __getattr__(self, name: str) -> Callable:
+
+        # Use the instance dictionary directly so that this works before __init__ has finished
+        experiment_dict = self.__dict__.get('__experiment_dict__', {})
+        task_keys = self.__dict__.get('__task_keys__', set())
+
+        if name in task_keys and name in experiment_dict:
+            # Add a method to get the variable
+            setattr(self, name, self.get(name))
+            return self.__dict__[name]
+
         def variable_not_found(default='LrZRExPGcQ'):
             if default == 'LrZRExPGcQ':
                 self.__logger__.abort(f'In config class, trying to get variable \'{name}\' but ' +
@@ -7,11 +7,11 @@
 # --------------------------------------------------------------------------------------------------
 
 
-import yaml
 from collections.abc import Hashable
 from typing import Union
 
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -121,13 +121,13 @@ def add_comments_to_dictionary(
 def replace_string_in_dictionary(dictionary: dict, string_in: str, string_out: str) -> object:
 
     # Convert dictionary to string
-    dictionary_string = yaml.dump(dictionary, default_flow_style=False, sort_keys=False)
+    dictionary_string = dump_yaml(dictionary, default_flow_style=False, sort_keys=False)
 
     # Replace string in the dictionary
     dictionary_string = dictionary_string.replace(string_in, string_out)
 
     # Convert back to dictionary
-    return yaml.safe_load(dictionary_string)
+    return load_yaml(dictionary_string)
 
 
 # --------------------------------------------------------------------------------------------------
@@ -136,7 +136,7 @@ def replace_string_in_dictionary(dictionary: dict, string_in: str, string_out: s
 def write_dict_to_yaml(dictionary: dict, file: str) -> None:
 
     # Convert dictionary to YAML string
-    dictionary_string = yaml.dump(dictionary, default_flow_style=False, sort_keys=False)
+    dictionary_string = dump_yaml(dictionary, default_flow_style=False, sort_keys=False)
 
     # Write string to file
     with open(file, 'w') as file_open:
@@ -55,18 +55,50 @@
 #
 #     Listed source files may contain wildcards. If the "files" parameter
 #     is omitted, all files in "src" will be copied to "dst".
+#
+# Files that are to be copied are staged using the staging strategy of the
+# file handler (staging keyword, default: copy):
+#
+#   copy:     copy the bytes of the file.
+#   reflink:  copy-on-write clone of the file (e.g. Btrfs, XFS), falling back
+#             to copy.
+#   hardlink: hard link to the file, falling back to reflink and then copy
+#             (e.g. when the source is on a different filesystem).
+#   symlink:  symbolic link to the file, falling back to copy.
+#
+# Hard links and symbolic links share the bytes of the source file, so they
+# are only suitable for files that are not modified once staged. The number
+# of bytes staged with each method is kept for reporting.
+#
+# Source files are found with one os.scandir of each source directory, which
+# is kept for the listing and reused for every pattern in the directory and
+# for the file ages of the readiness check. Patterns with wildcards in the
+# directory part are expanded with glob.
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
 import os
 import glob
 import copy
-import datetime as dt
+import fcntl
+import fnmatch
+import time
 from shutil import copyfile
 from typing import Union, Optional, Any
 
 from swell.utilities.exceptions import *
 
+# Methods tried in order for each staging strategy
+staging_fallbacks = {
+    'copy': ['copy'],
+    'reflink': ['reflink', 'copy'],
+    'hardlink': ['hardlink', 'reflink', 'copy'],
+    'symlink': ['symlink', 'copy'],
+}
+
+# ioctl request cloning a file on Linux filesystems that support it (FICLONE)
+ficlone = 0x40049409
+
 
 def get_file_handler(config: list, **kwargs) -> Union[StageFileHandler, GetDataFileHandler]:
     """Factory for determining the file handler type for retrieving data.
@@ -80,6 +112,9 @@ def get_file_handler(config: list, **kwargs) -> Union[StageFileHandler, GetDataF
          Staging data structure from YAML configuration
        strict : boolean, optional
          Requires that all specified files exist when True.
+       staging : string, optional
+         Staging strategy for files that are copied (copy, reflink,
+         hardlink or symlink).
 
        Returns
        -------
@@ -89,19 +124,20 @@ def get_file_handler(config: list, **kwargs) -> Union[StageFileHandler, GetDataF
     """
 
     strict = kwargs.get('strict', True)
+    staging = kwargs.get('staging', 'copy')
     if not isinstance(config, list):
         raise SWELLConfigError(config)
 
     group = config[0]
     collection = group.get('copy_files', {}).get('directories', [])
     if collection:
-        return StageFileHandler(config, strict=strict)
+        return StageFileHandler(config, strict=strict, staging=staging)
 
     collection = group.get('link_files', {}).get('directories', [])
     if collection:
-        return StageFileHandler(config, strict=strict)
+        return StageFileHandler(config, strict=strict, staging=staging)
 
-    return GetDataFileHandler(config, strict=strict)
+    return GetDataFileHandler(config, strict=strict, staging=staging)
 
 # ------------------------------------------------------------------------------
 
@@ -113,6 +149,18 @@ class FileHandler(object):
         self.listing = []
         self.config = copy.deepcopy(config)
         self.strict = kwargs.get('strict', True)
+        self.staging = kwargs.get('staging', 'copy')
+
+        if self.staging not in staging_fallbacks:
+            raise SWELLConfigError('Unknown staging strategy "' + str(self.staging) +
+                                   '", options are: ' + ', '.join(staging_fallbacks))
+
+        # Entries of the scanned source directories, keyed by directory and name
+        self.scan_cache = {}
+
+        # Number of files and bytes staged with each method
+        self.staged_files = {method: 0 for method in staging_fallbacks}
+        self.staged_bytes = {method: 0 for method in staging_fallbacks}
 
 # ------------------------------------------------------------------------------
 
@@ -124,7 +172,8 @@ class FileHandler(object):
            ----------
            fc : FileCollection, optional
              FileCollection object. If absent, all file collections will
-             be visited.
+             be visited in one pass over a new scan of the source
+             directories.
 
            Returns
            -------
@@ -133,29 +182,125 @@ class FileHandler(object):
              False: one or more collections are not ready
         """
 
-        if fc is None:
-            for fc in self.list(True):
-                if not self.is_ready(fc):
-                    return False
-            return True
+        use_scan = fc is None
+        listing = self.list(True) if use_scan else [fc]
 
-        if fc.num_files() < fc.min_count:
-            return False
+        now = time.time()
 
-        for srcfile, dstfile in fc:
+        for fc in listing:
+
+            if fc.num_files() < fc.min_count:
+                return False
 
-            if not os.path.isfile(srcfile):
+            # Only collections with a minimum age need the file times
+            if fc.min_age <= 0:
                 continue
 
-            mt = dt.datetime.fromtimestamp(os.stat(srcfile).st_mtime)
-            now = dt.datetime.now()
-            age = (now - mt).total_seconds()
+            for srcfile, dstfile in fc:
 
-            if age < fc.min_age:
-                return False
+                status = self.file_status(srcfile, use_scan)
+                if status is None:
+                    continue
+
+                if now - status.st_mtime < fc.min_age:
+                    return False
 
         return True
 
+# ------------------------------------------------------------------------
+
+    def file_status(self, srcfile: str, use_scan: bool = True) -> Optional[os.stat_result]:
+        """Status of a source file, from the directory scan if it holds the
+           file, or None when the file is not a regular file.
+
+           Parameters
+           ----------
+           srcfile : string, required
+             Source file.
+
+           use_scan : boolean, optional
+             Use the entries of the directory scan of the listing.
+
+           Returns
+           -------
+           status : os.stat_result or None
+             Status of the file.
+        """
+
+        directory, name = os.path.split(srcfile)
+
+        if use_scan and directory in self.scan_cache:
+            entry = self.scan_cache[directory].get(name)
+            if entry is None or not entry.is_file():
+                return None
+            return entry.stat()
+
+        if not os.path.isfile(srcfile):
+            return None
+
+        return os.stat(srcfile)
+
+# ------------------------------------------------------------------------
+
+    def scan(self, directory: str) -> dict:
+        """Entries of a directory keyed by name, read with a single
+           os.scandir the first time the directory is needed.
+
+           Parameters
+           ----------
+           directory : string, required
+             Directory to scan ('' for the working directory).
+
+           Returns
+           -------
+           entries : dict of os.DirEntry
+             Entries of the directory, in the order of the scan.
+        """
+
+        if directory not in self.scan_cache:
+            try:
+                with os.scandir(directory or os.curdir) as entries:
+                    self.scan_cache[directory] = {entry.name: entry for entry in entries}
+            except OSError:
+                self.scan_cache[directory] = {}
+
+        return self.scan_cache[directory]
+
+# ------------------------------------------------------------------------
+
+    def glob(self, pattern: str) -> list:
+        """Expands a file pattern like glob.glob, using the scan of the
+           directory of the pattern.
+
+           Parameters
+           ----------
+           pattern : string, required
+             File name, which may contain wildcards.
+
+           Returns
+           -------
+           filelist : list
+             Files matching the pattern.
+        """
+
+        directory, name = os.path.split(pattern)
+
+        if not name or glob.has_magic(directory):
+            return glob.glob(pattern)
+
+        entries = self.scan(directory)
+
+        if not glob.has_magic(name):
+            return [pattern] if name in entries else []
+
+        # As for glob, wildcards do not match hidden files
+        names = entries
+        if not name.startswith('.'):
+            names = [entry_name for entry_name in entries if not entry_name.startswith('.')]
+
+        return [os.path.join(directory, entry_name)
+                for entry_name in fnmatch.filter(names, name)]
+
 # ------------------------------------------------------------------------
 
     def get(self, fc: Optional[FileCollection] = None) -> None:
@@ -190,7 +335,8 @@ class FileHandler(object):
 # ---------------------------------------------------------------------------
 
     def copy(self, src: str, dst: str) -> None:
-        """File handler - copies a file
+        """File handler - stages a file that is to be copied using the
+           staging strategy, trying each method of the strategy in turn.
 
            Parameters
            ----------
@@ -204,14 +350,100 @@ class FileHandler(object):
         if not os.path.isfile(src):
             raise SWELLFileError('Source file does not exist: "' + src + '"')
 
+        for method in staging_fallbacks[self.staging]:
+            try:
+                if method == 'copy':
+                    # A link left by an earlier staging is replaced rather than written
+                    # through, which would change the source (or other) file it shares
+                    if os.path.lexists(dst) and (os.path.islink(dst) or
+                                                 os.lstat(dst).st_nlink > 1):
+                        os.remove(dst)
+                    copyfile(src, dst)
+                elif method == 'symlink':
+                    # A file copied by an earlier staging is replaced by the link
+                    if os.path.isfile(dst) and not os.path.islink(dst):
+                        os.remove(dst)
+                    self.link(src, dst, record=False)
+                else:
+                    self.clone(src, dst, method)
+            except Exception as e:
+                if method == 'copy':
+                    raise SWELLFileError(str(e))
+                continue
+
+            self.record(src, method)
+            return
+
+# ---------------------------------------------------------------------------
+
+    def clone(self, src: str, dst: str, method: str) -> None:
+        """File handler - hard links or reflinks (copy-on-write clone) a file,
+           replacing any existing destination file.
+
+           Parameters
+           ----------
+           src : string, required
+             Source file to be cloned.
+
+           dst : string, required
+             Destination file to be created.
+
+           method : string, required
+             Either hardlink or reflink.
+        """
+
+        if os.path.lexists(dst):
+            if method == 'hardlink' and not os.path.islink(dst) and os.path.samefile(src, dst):
+                return
+            os.remove(dst)
+
+        if method == 'hardlink':
+            os.link(src, dst)
+            return
+
         try:
-            copyfile(src, dst)
-        except Exception as e:
-            raise SWELLFileError(str(e))
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), ficlone, fsrc.fileno())
+        except Exception:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            raise
+
+# ---------------------------------------------------------------------------
+
+    def record(self, src: str, method: str) -> None:
+
+        # Keep the number of files and bytes staged with each method
+        self.staged_files[method] += 1
+        self.staged_bytes[method] += os.path.getsize(src)
+
+# ---------------------------------------------------------------------------
+
+    def staging_report(self) -> str:
+        """Summary of the files and bytes staged by the file handler, with
+           the bytes actually copied and the bytes linked (hard links,
+           reflinks and symbolic links) that do not take up more space.
+
+           Returns
+           -------
+           report : string
+             Summary of the staged files.
+        """
+
+        copied = self.staged_bytes['copy']
+        linked = sum(self.staged_bytes.values()) - copied
+
+        report = f'Staged {sum(self.staged_files.values())} files: ' + \
+                 f'{copied/1.0e6:.1f} MB copied, {linked/1.0e6:.1f} MB linked ('
+        report += ', '.join(f'{method}: {self.staged_files[method]} files, ' +
+                            f'{self.staged_bytes[method]/1.0e6:.1f} MB'
+                            for method in staging_fallbacks) + ')'
+
+        return report
 
 # ---------------------------------------------------------------------------
 
-    def link(self, src: str, dst: str) -> None:
+    def link(self, src: str, dst: str, record: bool = True) -> None:
         """File handler - Symbolically links a file
 
            Parameters
@@ -221,6 +453,9 @@ class FileHandler(object):
 
            dst : string, required
              Destination link file to be created.
+
+           record : boolean, optional
+             Count the link in the staged files.
         """
 
         if not os.path.isfile(src):
@@ -236,6 +471,9 @@ class FileHandler(object):
         except Exception as e:
             raise SWELLFileError(str(e))
 
+        if record:
+            self.record(src, 'symlink')
+
 # ---------------------------------------------------------------------------
 
 
@@ -259,9 +497,11 @@ class StageFileHandler(FileHandler):
              List of all file collections defined in configuration.
         """
 
-        listing = []
         if self.listing and not force:
-            return copy.deepcopy(self.listing)
+            return list(self.listing)
+
+        listing = []
+        self.scan_cache = {}
 
         for collection in self.config:
 
@@ -279,7 +519,7 @@ class StageFileHandler(FileHandler):
                     src = record[0]
                     dst = record[1]
 
-                    filelist = glob.glob(src)
+                    filelist = self.glob(src)
 
                     if not filelist and self.strict:
                         raise SWELLConfigError('Source inputs not found "'
@@ -292,9 +532,9 @@ class StageFileHandler(FileHandler):
 
                 listing.append(fc)
 
-        self.listing = copy.deepcopy(listing)
+        self.listing = listing
 
-        return listing
+        return list(listing)
 
 # ---------------------------------------------------------------------------
 
@@ -319,9 +559,11 @@ class GetDataFileHandler(FileHandler):
              List of all file collections defined in configuration.
         """
 
-        listing = []
         if self.listing and not force:
-            return copy.deepcopy(self.listing)
+            return list(self.listing)
+
+        listing = []
+        self.scan_cache = {}
 
         for collection in self.config:
 
@@ -351,7 +593,7 @@ class GetDataFileHandler(FileHandler):
                     if os.path.isabs(args[0]):
                         srcfile = args[0]
 
-                    filelist = glob.glob(srcfile)
+                    filelist = self.glob(srcfile)
                     found = found or filelist
 
                     for srcfile in filelist:
@@ -376,9 +618,9 @@ class GetDataFileHandler(FileHandler):
 
             listing.append(fc)
 
-        self.listing = copy.deepcopy(listing)
+        self.listing = listing
 
-        return listing
+        return list(listing)
 
 # ------------------------------------------------------------------------------
 
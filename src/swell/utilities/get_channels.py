@@ -7,13 +7,27 @@
 
 # --------------------------------------------------------------------------------------------------
 
-import yaml
+import numpy as np
+import pickle
 import os
+from bisect import bisect_left, bisect_right
 from datetime import datetime as dt
 from itertools import groupby
 from typing import Tuple, Optional
 
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import load_yaml
+
+# --------------------------------------------------------------------------------------------------
+
+# Name of the compiled records index written next to the channel info yaml files
+records_index_file = 'channel_info_index.pickle'
+
+# In-process caches of the loaded records indexes, the compiled records of each observation and
+# the channels looked up for each observation and cycle time
+records_index_cache = {}
+compiled_records_cache = {}
+channels_cache = {}
 
 # --------------------------------------------------------------------------------------------------
 
@@ -28,7 +42,7 @@ def process_channel_lists(channel_list: list) -> list:
     if not isinstance(channel_list, list):
         channel_list = [channel_list]
     for element in channel_list:
-        if '-' in element:
+        if isinstance(element, str) and '-' in element:
             start, end = map(int, element.split('-'))
             result_list = [x for x in range(start, end + 1)]
             final_channels_list += result_list
@@ -71,6 +85,136 @@ def get_channel_list(input_dict: dict, dt_cycle_time: dt) -> list:
 # --------------------------------------------------------------------------------------------------
 
 
+def compile_channel_records(records: list) -> dict:
+
+    '''
+        Function compiles a list of channel records (as loaded from the yaml file) into
+        parsed begin and end datetimes and integer channel arrays, ordered by begin date
+        so that the record for a cycle time can be found with bisect
+    '''
+
+    compiled_records = []
+    for element in records:
+        compiled_records.append((dt.strptime(element['begin date'], "%Y-%m-%dT%H:%M:%S"),
+                                 dt.strptime(element['end date'], "%Y-%m-%dT%H:%M:%S"),
+                                 np.array(process_channel_lists(element['channels']),
+                                          dtype=np.int32)))
+
+    # Stable sort so records with the same begin date keep their order
+    compiled_records.sort(key=lambda record: record[0])
+
+    # Running maximum of the end dates, the first record whose running maximum is beyond the
+    # cycle time is the first record whose end date is beyond the cycle time
+    max_end_dates = []
+    for _, end_date, _ in compiled_records:
+        max_end_dates.append(max(end_date, max_end_dates[-1]) if max_end_dates else end_date)
+
+    return {
+        'begin dates': [record[0] for record in compiled_records],
+        'max end dates': max_end_dates,
+        'channels': [record[2] for record in compiled_records],
+    }
+
+# --------------------------------------------------------------------------------------------------
+
+
+def compile_observation_records(observation_dict: dict) -> dict:
+
+    '''
+        Function compiles the available and active records of one observation
+    '''
+
+    return {record_type: compile_channel_records(observation_dict[record_type])
+            for record_type in ['available', 'active']}
+
+# --------------------------------------------------------------------------------------------------
+
+
+def lookup_channel_array(compiled_records: dict, dt_cycle_time: dt) -> Optional[np.ndarray]:
+
+    '''
+        Function returns the channels of the first record with begin date < cycle time < end date
+    '''
+
+    # Records that begin before the cycle time
+    num_begun = bisect_left(compiled_records['begin dates'], dt_cycle_time)
+
+    # First of those that ends after the cycle time
+    index = bisect_right(compiled_records['max end dates'], dt_cycle_time)
+
+    if index < num_begun:
+        return compiled_records['channels'][index]
+
+# --------------------------------------------------------------------------------------------------
+
+
+def write_records_index(path_to_observing_sys_yamls: str, observation_dicts: dict) -> None:
+
+    '''
+        Function compiles the channel records of all the observations and writes them to a
+        single index file next to the yaml files
+    '''
+
+    records_index = {observation: compile_observation_records(observation_dict)
+                     for observation, observation_dict in observation_dicts.items()}
+
+    index_file = os.path.join(path_to_observing_sys_yamls, records_index_file)
+    with open(index_file, 'wb') as file:
+        pickle.dump(records_index, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+# --------------------------------------------------------------------------------------------------
+
+
+def get_observation_records(
+    path_to_observing_sys_yamls: str,
+    observation: str
+) -> Optional[dict]:
+
+    '''
+        Function returns the compiled records of an observation. These come from the records
+        index when it is at least as new as the yaml file, otherwise the yaml file is compiled.
+        Compiled records are kept for the life of the process, until the yaml file changes.
+    '''
+
+    path_to_observing_sys_config = path_to_observing_sys_yamls + '/' + \
+        observation + '_channel_info.yaml'
+
+    if not os.path.isfile(path_to_observing_sys_config):
+        return None
+
+    config_mtime = os.stat(path_to_observing_sys_config).st_mtime_ns
+
+    cache_key = (path_to_observing_sys_yamls, observation)
+    if cache_key in compiled_records_cache:
+        cached_mtime, observation_records = compiled_records_cache[cache_key]
+        if cached_mtime == config_mtime:
+            return observation_records
+
+    observation_records = None
+
+    # Try the index first
+    index_file = os.path.join(path_to_observing_sys_yamls, records_index_file)
+    if os.path.isfile(index_file):
+        index_mtime = os.stat(index_file).st_mtime_ns
+        if index_mtime >= config_mtime:
+            cached_index = records_index_cache.get(path_to_observing_sys_yamls)
+            if cached_index is None or cached_index[0] != index_mtime:
+                with open(index_file, 'rb') as file:
+                    cached_index = (index_mtime, pickle.load(file))
+                records_index_cache[path_to_observing_sys_yamls] = cached_index
+            observation_records = cached_index[1].get(observation)
+
+    # Otherwise compile from the yaml file
+    if observation_records is None:
+        with open(path_to_observing_sys_config, 'r') as file:
+            observation_records = compile_observation_records(load_yaml(file))
+
+    compiled_records_cache[cache_key] = (config_mtime, observation_records)
+    return observation_records
+
+# --------------------------------------------------------------------------------------------------
+
+
 def get_channels(
     path_to_observing_sys_yamls: str,
     observation: str,
@@ -84,33 +228,35 @@ def get_channels(
         qc filter yaml files.
     '''
 
-    # Retrieve available and active channels from records yaml
-    path_to_observing_sys_config = path_to_observing_sys_yamls + '/' + \
-        observation + '_channel_info.yaml'
+    # Retrieve available and active channels from the compiled records
+    observation_records = get_observation_records(path_to_observing_sys_yamls, observation)
 
-    if os.path.isfile(path_to_observing_sys_config):
-        with open(path_to_observing_sys_config, 'r') as file:
-            data = yaml.safe_load(file)
-            available_channels = get_channel_list(data['available'], dt_cycle_time)
-            active_channels = get_channel_list(data['active'], dt_cycle_time)
+    if observation_records is None:
+        return None, None
 
-        if available_channels is None:
-            logger.abort(f'Missing available channels for {observation}, '
-                         'Confirm that you are using the right version of GEOSmksi')
+    # Lookups are cached for the life of the process, for as long as the records are unchanged
+    cache_key = (path_to_observing_sys_yamls, observation, dt_cycle_time)
+    if cache_key in channels_cache:
+        cached_records, available_range_string, use_flags = channels_cache[cache_key]
+        if cached_records is observation_records:
+            return available_range_string, list(use_flags)
 
-        if active_channels is None:
-            logger.abort(f'Missing active channels for {observation}, '
-                         'Confirm that you are using the right version of GEOSmksi')
+    available_channels = lookup_channel_array(observation_records['available'], dt_cycle_time)
+    active_channels = lookup_channel_array(observation_records['active'], dt_cycle_time)
 
-        available_channels_list = process_channel_lists(available_channels)
-        available_range_string = create_range_string(available_channels_list)
-        active_channels_list = process_channel_lists(active_channels)
-        use_flags = [1 if x in active_channels_list else -1 for x in available_channels_list]
+    if available_channels is None:
+        logger.abort(f'Missing available channels for {observation}, '
+                     'Confirm that you are using the right version of GEOSmksi')
 
-        return available_range_string, use_flags
+    if active_channels is None:
+        logger.abort(f'Missing active channels for {observation}, '
+                     'Confirm that you are using the right version of GEOSmksi')
 
-    else:
-        return None, None
+    available_range_string = create_range_string(available_channels.tolist())
+    use_flags = np.where(np.isin(available_channels, active_channels), 1, -1).tolist()
+
+    channels_cache[cache_key] = (observation_records, available_range_string, use_flags)
+    return available_range_string, list(use_flags)
 
 # --------------------------------------------------------------------------------------------------
 
@@ -121,17 +267,14 @@ def num_active_channels(
     dt_cycle_time: dt
 ) -> Optional[int]:
 
-    # Retrieve available and active channels from records yaml
-    path_to_observing_sys_config = path_to_observing_sys_yamls + '/' + \
-        observation + '_channel_info.yaml'
-
-    if os.path.isfile(path_to_observing_sys_config):
-        with open(path_to_observing_sys_config, 'r') as file:
-            data = yaml.safe_load(file)
-            active_channels = get_channel_list(data['active'], dt_cycle_time)
+    # Retrieve active channels from the compiled records, None if the observation has no
+    # records or no record covers the cycle time
+    observation_records = get_observation_records(path_to_observing_sys_yamls, observation)
+    if observation_records is None:
+        return None
 
-        active_channels_list = process_channel_lists(active_channels)
-        return len(active_channels_list)
+    active_channels = lookup_channel_array(observation_records['active'], dt_cycle_time)
+    if active_channels is None:
+        return None
 
-    else:
-        print('path_to_observing_sys_config undefined')
+    return len(active_channels)
@@ -19,20 +19,18 @@ class GSIRecordParser:
 
     def __init__(self) -> None:
         self.instr_df = None
-        self.return_df = None
+        self.start_dfs = None
+        self.return_columns = None
+        self.return_rows = None
         self.sat = None
         self.instr = None
 
-    def get_channel_list(self, start: int) -> list:
-        channel_list = []
-        rows = self.instr_df.loc[self.instr_df["start"] == start]
-        for row_ch_list in rows["channels"].values:
-            ch_list = eval(row_ch_list)
-            channel_list.extend(ch_list)
+    def get_channel_list(self, start: int) -> np.ndarray:
 
-        channel_list = list(set(channel_list))
-        channel_list.sort(key=int)
-        return channel_list
+        ''' Sorted union of the channel arrays of all the rows starting at start '''
+
+        rows = self.start_dfs[start]
+        return np.unique(np.concatenate(list(rows["channels"].values)))
 
     def run(self, instr_df: pd.DataFrame) -> None:
 
@@ -43,15 +41,19 @@ class GSIRecordParser:
         self.sat = self.instr_df.iloc[0]['sat']
         self.instr = self.instr_df.iloc[0]['instr']
 
-        # Initialize return dataframe
-        self.return_df = pd.DataFrame(columns=list(instr_df.columns.values))
+        # Initialize rows of the return dataframe, the dataframe is built once they are all known
+        self.return_columns = list(instr_df.columns.values)
+        self.return_rows = []
+
+        # Group the rows of the instrument dataframe by start time
+        self.start_dfs = dict(tuple(self.instr_df.groupby('start', sort=False)))
 
         # Create lists for start and end times
         end_times = []
-        start_times = list(np.unique(self.instr_df['start'].values))
+        start_times = list(self.start_dfs.keys())
         start_times.sort(key=int)
         for start in start_times:
-            end_times.append(self.instr_df.loc[self.instr_df['start'] == start]['end'].values[0])
+            end_times.append(self.start_dfs[start]['end'].values[0])
 
         done = []
         for idx in range(len(start_times)):
@@ -62,10 +64,10 @@ class GSIRecordParser:
             if main_start in done:
                 continue
 
-            start_df = self.instr_df.loc[self.instr_df['start'] == main_start]
+            start_df = self.start_dfs[main_start]
             if (len(start_df) == 1):
                 # Only one row to process
-                channel_list = eval(start_df['channels'].values[0])
+                channel_list = start_df['channels'].values[0]
                 comment = start_df['comments'].values[0]
                 self.update_return_df(main_start, main_end, channel_list, comment)
                 done.append(main_start)
@@ -98,18 +100,18 @@ class GSIRecordParser:
 
                 for inner_idx in range(len(inner_start)):
                     # Compare channels from next time range
-                    row = self.instr_df.loc[self.instr_df["start"] == inner_start[inner_idx]]
+                    row = self.start_dfs[inner_start[inner_idx]]
                     compare_channels = row["channels"].values[0]
 
-                    # Turn channels on or off
+                    # Turn channels on or off, a new array is created for every row
                     if (len(row_channel_list) > len(compare_channels)):
                         # Turn off
-                        turn_off = list(set(row_channel_list) - set(compare_channels))
-                        channel_list = [x for x in channel_list if x not in turn_off]
+                        turn_off = np.setdiff1d(row_channel_list, compare_channels)
+                        channel_list = channel_list[~np.isin(channel_list, turn_off)]
                     else:
                         # Turn on
-                        turn_on = list(set(compare_channels) - set(row_channel_list))
-                        channel_list += turn_on
+                        turn_on = np.setdiff1d(compare_channels, row_channel_list)
+                        channel_list = np.union1d(channel_list, turn_on)
 
                     # Update row
                     comment = row['comments'].values[0]
@@ -118,24 +120,28 @@ class GSIRecordParser:
                                           channel_list, comment)
                     done.append(inner_start[inner_idx])
 
-    def update_return_df(self, start: str, end: str, channel_list: list, comment: str) -> None:
+    def update_return_df(
+        self,
+        start: str,
+        end: str,
+        channel_list: np.ndarray,
+        comment: str
+    ) -> None:
 
         # Fix end time if on the 24 hour mark
         end = check_end_time(end)
 
-        new_row = pd.DataFrame.from_dict({
-                  'sat': [self.sat],
-                  'start': [start],
-                  'end': [end],
-                  'instr': [self.instr],
-                  'channel_num': [len(channel_list)],
-                  'channels': [channel_list],
-                  'comments': [comment]})
+        self.return_rows.append((self.sat, start, end, self.instr, len(channel_list),
+                                 channel_list, comment))
+
+    def get_instr_rows(self) -> list:
+
+        ''' Returns the rows that the state machine generated, as a list of tuples '''
 
-        self.return_df = pd.concat([self.return_df, new_row], ignore_index=True)
+        return self.return_rows
 
     def get_instr_df(self) -> pd.DataFrame:
 
         ''' Returns the dataframe that the state machine generated! '''
 
-        return self.return_df
+        return pd.DataFrame(self.return_rows, columns=self.return_columns)
@@ -0,0 +1,67 @@
+# (C) Copyright 2021- United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+
+
+# --------------------------------------------------------------------------------------------------
+#
+#  GSI satellite bias coefficient (satbias) files have a record for each sensor and channel. The
+#  first line of a record holds the record index, the sensor name, the channel, the time lapse
+#  (tlapse), the time lapse sum and the number of time lapse updates. The predictor coefficients
+#  follow on the next lines.
+#
+#      1 amsua_n15              1  0.175683E+00  0.118547E+03 1000
+#        0.000000    0.000000    0.000000 ...
+#
+# --------------------------------------------------------------------------------------------------
+
+
+def read_satbias_table(satbias_file: str) -> dict:
+
+    '''
+        Function reads a GSI satbias coefficient file in one pass and returns the records of each
+        sensor, keyed by the exact sensor name, in the order of the file. Each record is a
+        dictionary with the channel, the tlapse, the fields of the first line of the record (as
+        written in the file) and the predictor coefficients.
+    '''
+
+    satbias_table = {}
+    record = None
+
+    with open(satbias_file, 'r') as satbias_file_open:
+        for line in satbias_file_open:
+
+            fields = line.split()
+            if not fields:
+                continue
+
+            # First line of a record, which starts with the integer record index
+            if fields[0].isdigit() and len(fields) >= 4:
+                record = {
+                    'channel': int(fields[2]),
+                    'tlapse': fields[3],
+                    'fields': fields,
+                    'coefficients': [],
+                }
+                satbias_table.setdefault(fields[1], []).append(record)
+
+            # Coefficients of the current record
+            elif record is not None:
+                record['coefficients'] += [float(field) for field in fields]
+
+    return satbias_table
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def tlapse_lines(satbias_table: dict, sensor: str) -> str:
+
+    # Content of the tlapse file of the sensor: sensor, channel and tlapse of each of its records
+    return ''.join(' '.join(record['fields'][1:4]) + '\n'
+                   for record in satbias_table.get(sensor, []))
+
+
+# --------------------------------------------------------------------------------------------------
@@ -7,9 +7,11 @@
 # --------------------------------------------------------------------------------------------------
 
 from __future__ import annotations
-from typing import Union
+import os
+from typing import Callable, Optional, Tuple, Union
 
 import jinja2 as j2
+import jinja2.meta
 
 from swell.utilities.logger import Logger
 
@@ -55,31 +57,111 @@ class SilentUndefined(j2.Undefined):
 # --------------------------------------------------------------------------------------------------
 
 
-def template_string_jinja2(
-    logger: Logger,
-    templated_string: str,
-    dictionary_of_templates: dict,
-    allow_unresolved: bool = False
-) -> str:
+class AbsolutePathLoader(j2.BaseLoader):
+    """
+    Jinja2 loader for templates that are referenced by their path on disk.
 
-    # Handling of templates that cannot be resolved
-    # ---------------------------------------------
-    undefined = SilentUndefined if allow_unresolved else j2.StrictUndefined
+    The environment keeps the compiled template in its cache and only reloads it when the
+    modification time of the file changes, so each template is compiled at most once per process.
+    """
+    def get_source(
+        self,
+        environment: j2.Environment,
+        template: str
+    ) -> Tuple[str, str, Callable[[], bool]]:
 
-    # Create the Jinja2 environment
-    # -----------------------------
-    env = j2.Environment(undefined=undefined)
+        path = os.path.abspath(template)
 
-    # Load the algorithm template
-    # ---------------------------
-    template = env.from_string(templated_string)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, 'r') as template_file_open:
+                source = template_file_open.read()
+        except OSError:
+            raise j2.TemplateNotFound(template)
+
+        def uptodate() -> bool:
+            try:
+                return os.path.getmtime(path) == mtime
+            except OSError:
+                return False
+
+        return source, path, uptodate
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+# Environments shared by all renderings in the process, keyed by allow_unresolved
+environments = {}
+
+# Optional cache of compiled template bytecode that persists across processes
+bytecode_cache = None
+
+# Variables referenced by each template file, keyed by path and stored with the file mtime
+template_variables_cache = {}
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def get_environment(allow_unresolved: bool = False) -> j2.Environment:
+
+    # Reuse the environment (and its compiled templates) if it already exists
+    # ------------------------------------------------------------------------
+    if allow_unresolved not in environments:
+
+        # Handling of templates that cannot be resolved
+        undefined = SilentUndefined if allow_unresolved else j2.StrictUndefined
+
+        environments[allow_unresolved] = j2.Environment(loader=AbsolutePathLoader(),
+                                                        undefined=undefined,
+                                                        bytecode_cache=bytecode_cache,
+                                                        auto_reload=True)
+
+    return environments[allow_unresolved]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def set_bytecode_cache(cache_dir: Optional[str]) -> None:
+
+    """
+    Store compiled templates below cache_dir so that other processes (e.g. later tasks of the
+    same experiment) can skip compilation. Entries are validated against the template source so
+    an edited template is always recompiled. Passing None disables the cache.
+    """
+
+    global bytecode_cache
+
+    if cache_dir is None:
+        bytecode_cache = None
+    else:
+        os.makedirs(cache_dir, 0o755, exist_ok=True)
+        bytecode_cache = j2.FileSystemBytecodeCache(cache_dir)
+
+    # Update environments that have already been created
+    for environment in environments.values():
+        environment.bytecode_cache = bytecode_cache
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def render_template_jinja2(
+    logger: Logger,
+    template: j2.Template,
+    dictionary_of_templates: dict,
+    allow_unresolved: bool,
+    template_name: str
+) -> str:
 
     # Render the template hierarchy
     # -----------------------------
     try:
         string_rendered = template.render(dictionary_of_templates)
     except j2.exceptions.UndefinedError as e:
-        logger.abort('Resolving templates for templated_string failed with the following ' +
+        logger.abort(f'Resolving templates for {template_name} failed with the following ' +
                      f'exception: {e}')
 
     # Extra safety checks
@@ -88,7 +170,7 @@ def template_string_jinja2(
         logger.assert_abort(
             not (('{{' in string_rendered) or ('}}' in string_rendered)),
             f"""
-            In template_string_jinja2, the output string still contains template directives:
+            In {template_name}, the output string still contains template directives:
             '''
             {string_rendered}
             '''
@@ -99,3 +181,68 @@ def template_string_jinja2(
 
 
 # --------------------------------------------------------------------------------------------------
+
+
+def template_string_jinja2(
+    logger: Logger,
+    templated_string: str,
+    dictionary_of_templates: dict,
+    allow_unresolved: bool = False
+) -> str:
+
+    # Load the algorithm template
+    # ---------------------------
+    template = get_environment(allow_unresolved).from_string(templated_string)
+
+    # Render the template hierarchy
+    # -----------------------------
+    return render_template_jinja2(logger, template, dictionary_of_templates, allow_unresolved,
+                                  'templated_string')
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def template_file_jinja2(
+    logger: Logger,
+    template_file: str,
+    dictionary_of_templates: dict,
+    allow_unresolved: bool = False
+) -> str:
+
+    # Load the template, compiling it only if it is new or has changed on disk
+    # -------------------------------------------------------------------------
+    try:
+        template = get_environment(allow_unresolved).get_template(template_file)
+    except j2.TemplateNotFound:
+        logger.abort(f'In template_file_jinja2 failed to find file \'{template_file}\'')
+
+    # Render the template hierarchy
+    # -----------------------------
+    return render_template_jinja2(logger, template, dictionary_of_templates, allow_unresolved,
+                                  template_file)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def template_file_variables(template_file: str) -> set:
+
+    """
+    Return the names of the top level variables that the template file references. The result is
+    cached until the modification time of the file changes.
+    """
+
+    path = os.path.abspath(template_file)
+    mtime = os.path.getmtime(path)
+
+    if path not in template_variables_cache or template_variables_cache[path][0] != mtime:
+        environment = get_environment()
+        source, _, _ = environment.loader.get_source(environment, path)
+        variables = j2.meta.find_undeclared_variables(environment.parse(source))
+        template_variables_cache[path] = (mtime, variables)
+
+    return template_variables_cache[path][1]
+
+
+# --------------------------------------------------------------------------------------------------
@@ -9,8 +9,10 @@
 
 
 import os
-import xarray as xr
-from typing import Hashable, Union
+import tempfile
+import netCDF4 as nc
+import numpy as np
+from typing import Optional, Union
 
 from swell.utilities.logger import Logger
 
@@ -21,24 +23,82 @@ def combine_files_without_groups(
     logger: Logger,
     list_of_input_files: list,
     output_file: str,
-    concat_dim: Union[Hashable, xr.Variable, xr.DataArray],
-    delete_input: bool = False
+    concat_dim: str,
+    delete_input: bool = False,
+    block_elements: int = 16777216
 ) -> None:
 
+    '''
+        Concatenates netCDF files without groups (e.g. the GeoVaLs files written by each
+        processor) along the concat_dim dimension. The output is created with its final size
+        from the sizes of the inputs, then each input is opened once and its variables are
+        written, a block at a time, to their place in the output. The memory needed therefore
+        does not depend on the number or the size of the input files. Variables that do not use
+        the dimension are taken from the first file.
+    '''
+
     # Write some information
     logger.info('Combining the following netCDF files (using no-group combine): ')
     for f in list_of_input_files:
         logger.info(f' - {f}', False)
     logger.info(f'Writing to file {output_file}')
 
-    # Load the files as Xarray datasets
-    datasets = [xr.open_dataset(f) for f in list_of_input_files]
+    # Offset of each input file along the dimension, and the size of the output
+    offsets = []
+    concat_size = 0
+    for f in list_of_input_files:
+        with nc.Dataset(f, 'r') as ds:
+            offsets.append(concat_size)
+            concat_size += ds.dimensions[concat_dim].size
+
+    with nc.Dataset(output_file, 'w') as out_ds:
+
+        # Dimensions, attributes and variables from the first file
+        with nc.Dataset(list_of_input_files[0], 'r') as ds:
+
+            out_ds.setncatts({name: ds.getncattr(name) for name in ds.ncattrs()})
+
+            for dim_name, dim in ds.dimensions.items():
+                if dim_name == concat_dim:
+                    out_ds.createDimension(dim_name, concat_size)
+                else:
+                    out_ds.createDimension(dim_name, None if dim.isunlimited() else dim.size)
 
-    # Concatenate the datasets along the 'nlocs' dimension
-    concatenated_ds = xr.concat(datasets, dim=concat_dim)
+            concat_vars = []
+            for var_name, var in ds.variables.items():
+                if concat_dim in var.dimensions:
+                    fill_value = None
+                    if '_FillValue' in var.ncattrs():
+                        fill_value = var.getncattr('_FillValue')
+                    out_var = out_ds.createVariable(var_name, var.datatype, var.dimensions,
+                                                    fill_value=fill_value)
+                    out_var.setncatts({name: var.getncattr(name) for name in var.ncattrs()
+                                       if name != '_FillValue'})
+                    out_var.set_auto_maskandscale(False)
+                    concat_vars.append(var_name)
+                else:
+                    copy_variable(var, out_ds, block_elements)
 
-    # Write the concatenated dataset to a new file
-    concatenated_ds.to_netcdf(output_file)
+        # Stream each input file into its slice of the output variables
+        for f, offset in zip(list_of_input_files, offsets):
+            with nc.Dataset(f, 'r') as ds:
+                for var_name in concat_vars:
+
+                    in_var = ds.variables[var_name]
+                    in_var.set_auto_maskandscale(False)
+
+                    axis = in_var.dimensions.index(concat_dim)
+                    size = in_var.shape[axis]
+                    row_size = int(np.prod(in_var.shape)) // size if size > 0 else 1
+                    rows = max(1, block_elements // max(1, row_size))
+
+                    for row in range(0, size, rows):
+                        row_end = min(row + rows, size)
+                        in_index = [slice(None)] * in_var.ndim
+                        out_index = [slice(None)] * in_var.ndim
+                        in_index[axis] = slice(row, row_end)
+                        out_index[axis] = slice(offset + row, offset + row_end)
+                        out_ds.variables[var_name][tuple(out_index)] = in_var[tuple(in_index)]
 
     # Delete the input files if requested
     if delete_input:
@@ -47,3 +107,230 @@ def combine_files_without_groups(
 
 
 # --------------------------------------------------------------------------------------------------
+
+
+def copy_group_subset(
+    in_group: nc.Group,
+    out_group: nc.Group,
+    dimension: str,
+    location_slice: slice
+) -> None:
+
+    # Attributes of the group
+    out_group.setncatts({name: in_group.getncattr(name) for name in in_group.ncattrs()})
+
+    # Dimensions, with the subset dimension reduced to the size of the slice
+    for dim_name, dim in in_group.dimensions.items():
+        if dim.isunlimited():
+            out_group.createDimension(dim_name, None)
+        elif dim_name == dimension:
+            out_group.createDimension(dim_name, len(range(dim.size)[location_slice]))
+        else:
+            out_group.createDimension(dim_name, dim.size)
+
+    # Variables, keeping their attributes, fill values and compression
+    for var_name, var in in_group.variables.items():
+
+        fill_value = None
+        if '_FillValue' in var.ncattrs():
+            fill_value = var.getncattr('_FillValue')
+
+        filters = var.filters() or {}
+
+        out_var = out_group.createVariable(var_name, var.datatype, var.dimensions,
+                                           fill_value=fill_value,
+                                           zlib=filters.get('zlib', False),
+                                           complevel=filters.get('complevel', 4),
+                                           shuffle=filters.get('shuffle', True),
+                                           fletcher32=filters.get('fletcher32', False))
+        out_var.setncatts({name: var.getncattr(name) for name in var.ncattrs()
+                           if name != '_FillValue'})
+
+        var.set_auto_maskandscale(False)
+        out_var.set_auto_maskandscale(False)
+
+        if not var.dimensions:
+            out_var.assignValue(var.getValue())
+            continue
+
+        # Select the slice along the subset dimension
+        index = tuple(location_slice if dim_name == dimension else slice(None)
+                      for dim_name in var.dimensions)
+        data = var[index]
+        if data.size > 0:
+            out_var[(slice(None),) * data.ndim] = data
+
+    # Groups
+    for group_name, group in in_group.groups.items():
+        copy_group_subset(group, out_group.createGroup(group_name), dimension, location_slice)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def subset_locations(
+    logger: Logger,
+    input_file: str,
+    dimension: str = 'Location',
+    first: int = 0,
+    count: int = 1,
+    output_file: str = None
+) -> None:
+
+    '''
+        Writes the locations first to first+count-1 of a netCDF file (e.g. IODA files with the
+        Location dimension or GeoVaLs files with the nlocs dimension) to the output file, which
+        is the input file itself if not given. All the groups, attributes and the variables not
+        using the dimension are kept, as with 'ncks -d <dimension>,<first>,<last>'.
+    '''
+
+    if output_file is None:
+        output_file = input_file
+
+    logger.info(f'Writing locations {first} to {first+count-1} of {input_file} to {output_file}')
+
+    location_slice = slice(first, first + count)
+
+    # Write to a temporary file next to the output so that the input can be replaced
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    output_temp = tempfile.NamedTemporaryFile(dir=output_dir, suffix='.nc4', delete=False)
+    output_temp.close()
+
+    try:
+        with nc.Dataset(input_file, 'r') as in_ds:
+            logger.assert_abort(dimension in in_ds.dimensions, f'The file {input_file} does not ' +
+                                f'have the dimension {dimension}.')
+            with nc.Dataset(output_temp.name, 'w', format=in_ds.data_model) as out_ds:
+                copy_group_subset(in_ds, out_ds, dimension, location_slice)
+        os.chmod(output_temp.name, os.stat(input_file).st_mode & 0o777)
+        os.replace(output_temp.name, output_file)
+    finally:
+        if os.path.exists(output_temp.name):
+            os.remove(output_temp.name)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def copy_variable_data(
+    in_var: nc.Variable,
+    out_var: nc.Variable,
+    block_elements: int = 16777216,
+    mask_and_scale: bool = False
+) -> None:
+
+    '''
+        Copies the data of a netCDF variable to a variable of the same shape, as stored (without
+        masking or scaling) unless mask_and_scale is True. The data is copied in blocks along the
+        leading dimensions (e.g. a level at a time) of at most block_elements values, so that the
+        memory needed does not depend on the size of the variable.
+    '''
+
+    in_var.set_auto_maskandscale(mask_and_scale)
+    out_var.set_auto_maskandscale(mask_and_scale)
+
+    if not in_var.dimensions:
+        out_var.assignValue(in_var.getValue())
+        return
+
+    shape = in_var.shape
+
+    # Number of leading indices copied at a time
+    for leading_dims in range(len(shape) + 1):
+        if int(np.prod(shape[leading_dims:])) <= block_elements:
+            break
+
+    if leading_dims == 0:
+        out_var[...] = in_var[...]
+        return
+
+    # Copy blocks of rows of the last leading dimension for each index of the ones before
+    rows = max(1, block_elements // max(1, int(np.prod(shape[leading_dims:]))))
+    for index in np.ndindex(*shape[:leading_dims - 1]):
+        for row in range(0, shape[leading_dims - 1], rows):
+            block = index + (slice(row, min(row + rows, shape[leading_dims - 1])),)
+            out_var[block] = in_var[block]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def copy_variable(
+    in_var: nc.Variable,
+    out_group: Union[nc.Dataset, nc.Group],
+    block_elements: int = 16777216,
+    name: Optional[str] = None,
+    dimensions: Optional[tuple] = None
+) -> nc.Variable:
+
+    # Create a variable like in_var (type, dimensions, fill value and attributes) in the output
+    # dataset or group, whose dimensions must already exist, and copy its data in blocks. The
+    # variable and its dimensions can be given new names.
+    fill_value = None
+    if '_FillValue' in in_var.ncattrs():
+        fill_value = in_var.getncattr('_FillValue')
+
+    out_var = out_group.createVariable(name or in_var.name, in_var.datatype,
+                                       dimensions or in_var.dimensions, fill_value=fill_value)
+    out_var.setncatts({attr_name: in_var.getncattr(attr_name) for attr_name in in_var.ncattrs()
+                       if attr_name != '_FillValue'})
+
+    copy_variable_data(in_var, out_var, block_elements)
+
+    return out_var
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def copy_group_renamed(
+    in_group: Union[nc.Dataset, nc.Group],
+    out_group: Union[nc.Dataset, nc.Group],
+    dimension_names: dict,
+    variable_names: dict
+) -> None:
+
+    # Attributes and dimensions of the group
+    out_group.setncatts({name: in_group.getncattr(name) for name in in_group.ncattrs()})
+
+    for dim_name, dim in in_group.dimensions.items():
+        out_group.createDimension(dimension_names.get(dim_name, dim_name),
+                                  None if dim.isunlimited() else dim.size)
+
+    # Variables, a block at a time. Coordinate variables follow their dimension.
+    for var_name, var in in_group.variables.items():
+        new_var_name = variable_names.get(var_name, dimension_names.get(var_name, var_name))
+        copy_variable(var, out_group, name=new_var_name,
+                      dimensions=tuple(dimension_names.get(dim_name, dim_name)
+                                       for dim_name in var.dimensions))
+
+    for group_name, group in in_group.groups.items():
+        copy_group_renamed(group, out_group.createGroup(group_name), dimension_names,
+                           variable_names)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def copy_file_renamed(
+    logger: Logger,
+    input_file: str,
+    output_file: str,
+    dimension_names: Optional[dict] = None,
+    variable_names: Optional[dict] = None
+) -> None:
+
+    '''
+        Copies a netCDF file renaming dimensions and variables (dictionaries from the old to the
+        new names). The variables are copied a block at a time so the memory needed does not
+        depend on the size of the file.
+    '''
+
+    logger.info(f'Copying {input_file} to {output_file}')
+
+    with nc.Dataset(input_file, 'r') as in_ds:
+        with nc.Dataset(output_file, 'w', format=in_ds.data_model) as out_ds:
+            copy_group_renamed(in_ds, out_ds, dimension_names or {}, variable_names or {})
+
+
+# --------------------------------------------------------------------------------------------------
@@ -0,0 +1,278 @@
+# (C) Copyright 2021- United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+import fcntl
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+import netCDF4 as nc
+
+from swell.utilities.yaml_io import dump_yaml, load_yaml_file
+
+
+# --------------------------------------------------------------------------------------------------
+#
+#  Metadata of observation files (byte size, modification time and the sizes of the Location and
+#  Channel dimensions) is kept in a manifest in the directory holding the files, normally the
+#  cycle directory. Tasks of the cycle that need the metadata read the manifest and only open the
+#  files that are not in it or have changed since they were recorded.
+#
+#  The tasks that create the input files of the cycle (GetObservations, GsiNcdiagToIoda) add every
+#  observation, bias correction and time lapse file with its role and checksum. The tasks running
+#  the JEDI executables add the name of the file written for each obsdataout, which can have a
+#  _0000 suffix, so that later tasks do not have to look for it.
+#
+#  Tasks of a cycle running at the same time update the same manifest, so each update holds an
+#  exclusive lock on a lock file next to the manifest while it reads, updates and replaces it.
+#
+# --------------------------------------------------------------------------------------------------
+
+# Name of the manifest in each directory and of the lock file serialising its updates
+manifest_file = 'obs_manifest.yaml'
+manifest_lock_file = 'obs_manifest.yaml.lock'
+
+# Manifests that have been read, keyed by directory and stored with the manifest status
+manifest_cache = {}
+
+# Size of the blocks read when computing checksums
+checksum_block_size = 4194304
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def read_manifest(directory: str) -> dict:
+
+    manifest_path = os.path.join(directory, manifest_file)
+
+    # The manifest is replaced on update so a new inode also means a new manifest
+    try:
+        manifest_stat = os.stat(manifest_path)
+    except OSError:
+        return {}
+
+    status = (manifest_stat.st_ino, manifest_stat.st_mtime_ns, manifest_stat.st_size)
+
+    if directory not in manifest_cache or manifest_cache[directory][0] != status:
+        manifest_cache[directory] = (status, load_yaml_file(manifest_path) or {})
+
+    return manifest_cache[directory][1]
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def update_manifest(directory: str, entries: dict, merge: bool = False) -> None:
+
+    '''
+        Function adds entries (keyed by file name) to the manifest of the directory. The manifest
+        is read, updated and replaced in one step under an exclusive lock, so that updates of
+        tasks running at the same time are not lost and readers never see a partially written
+        file. With merge the new fields are added to an existing entry of the file instead of
+        replacing it. Directories that cannot be written to are left without a manifest.
+    '''
+
+    manifest_path = os.path.join(directory, manifest_file)
+
+    try:
+        with open(os.path.join(directory, manifest_lock_file), 'a') as lock_open:
+            fcntl.flock(lock_open, fcntl.LOCK_EX)
+
+            # Read the manifest as it is now rather than from the cache
+            manifest = {}
+            if os.path.isfile(manifest_path):
+                manifest = load_yaml_file(manifest_path) or {}
+
+            for basename, entry in entries.items():
+                if merge and basename in manifest:
+                    entry = merge_entries(manifest[basename], entry)
+                manifest[basename] = entry
+
+            with tempfile.NamedTemporaryFile('w', dir=directory or '.', suffix='.tmp',
+                                             delete=False) as manifest_open:
+                dump_yaml(manifest, manifest_open, default_flow_style=False)
+            os.chmod(manifest_open.name, 0o644)
+            os.replace(manifest_open.name, manifest_path)
+    except OSError:
+        return
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def merge_entries(entry: dict, new_entry: dict) -> dict:
+
+    # Keep the role (and the diag file name) of the entry, but not a checksum of older content
+    merged_entry = dict(entry)
+    if entry.get('mtime') != new_entry.get('mtime') or entry.get('size') != new_entry.get('size'):
+        merged_entry.pop('checksum', None)
+
+    merged_entry.update(new_entry)
+
+    return merged_entry
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def probe_obs_file(filename: str) -> dict:
+
+    '''
+        Function reads the sizes of the Location and Channel dimensions of an IODA file. Only the
+        file metadata is read and the file is closed straight away. Dimensions that are not in the
+        file have size zero.
+    '''
+
+    file_stat = os.stat(filename)
+
+    with nc.Dataset(filename, 'r') as dataset:
+        dimensions = dataset.dimensions
+        nlocs = dimensions['Location'].size if 'Location' in dimensions else 0
+        nchans = dimensions['Channel'].size if 'Channel' in dimensions else 0
+
+    return {
+        'mtime': file_stat.st_mtime_ns,
+        'size': file_stat.st_size,
+        'nlocs': nlocs,
+        'nchans': nchans,
+    }
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def obs_files_metadata(filenames: list) -> dict:
+
+    '''
+        Function returns the metadata of each of the (existing) files, keyed by file name. The
+        manifests of the directories are used for files that have not changed since they were
+        recorded, the other files are probed and added to the manifests, keeping the role of
+        files that are already in the manifests.
+    '''
+
+    metadata = {}
+    new_entries = {}
+
+    for filename in filenames:
+
+        directory, basename = os.path.split(filename)
+        entry = read_manifest(directory).get(basename)
+
+        file_stat = os.stat(filename)
+        if entry is None or 'nlocs' not in entry or entry['mtime'] != file_stat.st_mtime_ns or \
+           entry['size'] != file_stat.st_size:
+            entry = probe_obs_file(filename)
+            new_entries.setdefault(directory, {})[basename] = entry
+
+        metadata[filename] = entry
+
+    for directory, entries in new_entries.items():
+        update_manifest(directory, entries, merge=True)
+
+    return metadata
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def obs_file_locations(filename: str) -> Optional[int]:
+
+    # Size of the Location dimension or None if the file does not exist
+    if not os.path.exists(filename):
+        return None
+
+    return obs_files_metadata([filename])[filename]['nlocs']
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def file_checksum(filename: str) -> str:
+
+    # MD5 checksum of the file, read a block at a time
+    checksum = hashlib.md5()
+
+    with open(filename, 'rb') as file_open:
+        for block in iter(lambda: file_open.read(checksum_block_size), b''):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def manifest_entry(filename: str, role: str, checksum: bool = True, probe: bool = True) -> dict:
+
+    '''
+        Function returns the manifest entry of a file that a task has created. The role says what
+        the file is (obs, geovals, bias, tlapse, diag). NetCDF files are probed for the sizes of
+        their Location and Channel dimensions unless probe is False, other files (e.g. time lapse
+        and aircraft bias tables) only get their byte size and modification time.
+    '''
+
+    if probe and os.path.splitext(filename)[1] in ['.nc', '.nc4']:
+        entry = probe_obs_file(filename)
+    else:
+        file_stat = os.stat(filename)
+        entry = {'mtime': file_stat.st_mtime_ns, 'size': file_stat.st_size}
+
+    entry['role'] = role
+
+    if checksum:
+        entry['checksum'] = file_checksum(filename)
+
+    return entry
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def add_to_manifest(entries: dict) -> None:
+
+    # Add entries keyed by the full path of the files to the manifests of their directories
+    directory_entries = {}
+    for filename, entry in entries.items():
+        directory, basename = os.path.split(filename)
+        directory_entries.setdefault(directory, {})[basename] = entry
+
+    for directory, entries in directory_entries.items():
+        update_manifest(directory, entries)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def obs_output_file(filename: str, use_manifest: bool = True) -> Optional[str]:
+
+    '''
+        Function returns the file that the JEDI executable wrote for the obsdataout file name,
+        which is the name itself or the name with a _0000 suffix, or None if there is no such
+        file. The manifest is used when the executable task recorded the file, otherwise the
+        directory is checked.
+    '''
+
+    directory, basename = os.path.split(filename)
+
+    entry = read_manifest(directory).get(basename) if use_manifest else None
+    if entry is not None and entry.get('role') == 'diag':
+        return os.path.join(directory, entry['file'])
+
+    filename_name, filename_ext = os.path.splitext(filename)
+    for output_file in [filename, filename_name + '_0000' + filename_ext]:
+        if os.path.exists(output_file):
+            return output_file
+
+    return None
+
+
+# --------------------------------------------------------------------------------------------------
@@ -8,10 +8,10 @@
 
 
 import os
-import yaml
 
 from swell.swell_path import get_swell_path
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -27,7 +27,7 @@ def ioda_name_to_long_name(ioda_name: str, logger: Logger) -> str:
 
     # Open file and convert to dictionary
     with open(obs_ioda_names_file, 'r') as obs_ioda_names_str:
-        obs_ioda_names_dict = yaml.safe_load(obs_ioda_names_str)
+        obs_ioda_names_dict = load_yaml(obs_ioda_names_str)
 
     # Get the list of ioda instrument names
     obs_ioda_names = obs_ioda_names_dict['ioda instrument names']
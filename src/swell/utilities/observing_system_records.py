@@ -1,12 +1,13 @@
 import os
-import yaml
-import pandas as pd
 import numpy as np
+import pandas as pd
 import datetime as dt
 from typing import Optional
 
+from swell.utilities.get_channels import process_channel_lists, write_records_index
 from swell.utilities.logger import Logger
 from swell.utilities.gsi_record_parser import GSIRecordParser
+from swell.utilities.yaml_io import dump_yaml
 
 # --------------------------------------------------------------------------------------------------
 
@@ -20,59 +21,50 @@ def format_date(old_date: str) -> str:
 # --------------------------------------------------------------------------------------------------
 
 
+def channel_array(channel_list: list) -> np.ndarray:
+
+    ''' Converting list of channel strings (or ranges) into an integer array '''
+
+    return np.array(process_channel_lists(channel_list), dtype=np.int32)
+
+# --------------------------------------------------------------------------------------------------
+
+
 def read_sat_db(path_to_sat_db: str, column_names: list[str]) -> pd.DataFrame:
 
     '''
-        Reading GSI observing system records row by row into
-        a pandas dataframe to be used by the gsi_record_parser
+        Reading GSI observing system records into a pandas dataframe to
+        be used by the gsi_record_parser. The table is tokenised in a
+        single pass into a list of rows and the dataframe is built once.
     '''
 
-    filename = path_to_sat_db
-    df = pd.DataFrame(columns=column_names)
-
-    with open(filename, "r") as file:
-        lines = file.readlines()
-
-    # Read blindly into an array, throw line away if it starts with # or newline
-    idx = 0
-    for line in lines:
-        line_parts = line.split()
-        if (line_parts):
-
-            if (line_parts[0][0] != '#' and line_parts[0][0] != '\n'):
-                new_row = pd.DataFrame.from_dict({
-                    'sat': [''],
-                    'start': [''],
-                    'end': [''],
-                    'instr': [''],
-                    'channel_num': [0],
-                    'channels': [''],
-                    'comments': ['']})
-
-                df = pd.concat([df, new_row], ignore_index=True)
-                df.loc[idx, 'sat'] = line_parts[0]
-                df.loc[idx, 'start'] = line_parts[1]+line_parts[2]
-                df.loc[idx, 'end'] = line_parts[3]+line_parts[4]
-                df.loc[idx, 'instr'] = line_parts[5]
-                df.loc[idx, 'channel_num'] = line_parts[6]
-
-                comment_present = next((i for i, x in enumerate(line_parts) if x == '#'), None)
-
-                if (comment_present):
-                    channel_list = line_parts[7:comment_present]
-                    comment = line_parts[comment_present:]
-                    comment_str = ' '.join(comment)
-                    # Accounting for no comment
-                    if (len(comment_str) != 1):
-                        df.loc[idx, 'comments'] = comment_str
-                else:
-                    channel_list = line_parts[7:]
+    rows = []
+    with open(path_to_sat_db, "r") as file:
+
+        # Throw line away if it is empty or starts with #
+        for line in file:
+            line_parts = line.split()
+            if not line_parts or line_parts[0][0] == '#':
+                continue
 
-                # convert channel list to string
-                df.loc[idx, 'channels'] = str(channel_list)
-                idx += 1
+            comment = ''
+            comment_present = next((i for i, x in enumerate(line_parts) if x == '#'), None)
+
+            if (comment_present):
+                channel_list = line_parts[7:comment_present]
+                comment_str = ' '.join(line_parts[comment_present:])
+                # Accounting for no comment
+                if (len(comment_str) != 1):
+                    comment = comment_str
+            else:
+                channel_list = line_parts[7:]
 
-    return df
+            # Row in the order of the column names, channel list converted to integer array
+            rows.append((line_parts[0], line_parts[1]+line_parts[2],
+                         line_parts[3]+line_parts[4], line_parts[5],
+                         line_parts[6], channel_array(channel_list), comment))
+
+    return pd.DataFrame(rows, columns=column_names)
 
 # --------------------------------------------------------------------------------------------------
 
@@ -106,16 +98,14 @@ class ObservingSystemRecords:
             are parsed using GSIRecordParser to get the final dataframes.
         '''
 
-        # Make a couple modifications based on what record is parsed
+        # Make a couple modifications based on what record is parsed. Levels are stored in the
+        # same columns as channels since GSIRecordParser processes both in the same way
+        self.column_names = ['sat', 'start', 'end',
+                             'instr', 'channel_num',
+                             'channels', 'comments']
         if self.record_type == 'channel':
-            self.column_names = ['sat', 'start', 'end',
-                                 'instr', 'channel_num',
-                                 'channels', 'comments']
             file_ext_name = '_channels.tbl'
         elif self.record_type == 'level':
-            self.column_names = ['sat', 'start', 'end',
-                                 'instr', 'level_num',
-                                 'level', 'comments']
             file_ext_name = '.tbl'
         else:
             self.logger.abort(f'Record type {self.record_type} not supported. \
@@ -124,22 +114,19 @@ class ObservingSystemRecords:
         parser = GSIRecordParser()
         channel_types = ['active', 'available']
         for channel_type in channel_types:
-            df = pd.DataFrame(columns=self.column_names)
             path_to_records = os.path.join(path_to_sat_db, channel_type + file_ext_name)
 
             org_df = read_sat_db(path_to_records, self.column_names)
-            sat_list = np.unique(org_df['sat'].values)
-            for sat in sat_list:
-                sat_df = org_df.loc[org_df['sat'] == sat]
-                instr_list = np.unique(sat_df['instr'].values)
-
-                for instr in instr_list:
-                    instr_df = sat_df.loc[sat_df['instr'] == instr]
-                    parser.run(instr_df)
-                    new_instr_df = parser.get_instr_df()
-                    df = pd.concat([df, new_instr_df], ignore_index=True)
-                    if instr+'_'+sat not in self.obs_registry:
-                        self.obs_registry.append(instr+'_'+sat)
+
+            # Parse each satellite and instrument, collect the rows and build the dataframe once
+            rows = []
+            for (sat, instr), instr_df in org_df.groupby(['sat', 'instr'], sort=True):
+                parser.run(instr_df)
+                rows.extend(parser.get_instr_rows())
+                if instr+'_'+sat not in self.obs_registry:
+                    self.obs_registry.append(instr+'_'+sat)
+
+            df = pd.DataFrame(rows, columns=self.column_names)
 
             if channel_type == 'active':
                 self.active_df = df
@@ -156,7 +143,8 @@ class ObservingSystemRecords:
 
         '''
             Fields are taken from the internal dataframes populated
-            by parse_records and saved to yaml files.
+            by parse_records and saved to yaml files. For channel records
+            a compiled index of all the saved records is also written.
         '''
 
         if not observation_list:
@@ -165,51 +153,58 @@ class ObservingSystemRecords:
         if not os.path.exists(output_dir):
             os.mkdir(output_dir)
 
+        if self.record_type == 'channel':
+            output_ext_name = '_channel_info.yaml'
+        elif self.record_type == 'level':
+            output_ext_name = '_level_info.yaml'
+        else:
+            self.logger.abort(f'Record type {self.record_type} not supported. \
+                         Use channel or level')
+
+        # Rows of the available records for each satellite and instrument
+        available_records = {}
+        for (sat, instr), instr_df in self.available_df.groupby(['sat', 'instr'], sort=False):
+            available_records[(sat, instr)] = instr_df.to_dict('records')
+
+        # Records of each observation written, these are also compiled into an index
+        observation_dicts = {}
+
         # Assume that active and available channels have corresponding sat/instr fields
-        sat_list = np.unique(self.active_df['sat'].values)
-        for sat in sat_list:
-            active_df = self.active_df.loc[self.active_df['sat'] == sat]
-            available_df = self.available_df.loc[self.available_df['sat'] == sat]
-            instr_list = np.unique(active_df['instr'].values)
-
-            for instr in instr_list:
-                sat_dict = {}
-                instr_active_df = active_df.loc[active_df['instr'] == instr]
-                instr_available_df = available_df.loc[available_df['instr'] == instr]
-
-                compare_name = instr+'_'+sat
-                if compare_name in observation_list:
-
-                    active_field_list = []
-                    for idx, row in instr_active_df.iterrows():
-                        row_dict = {}
-                        row_dict['begin date'] = format_date(row['start'])
-                        row_dict['end date'] = format_date(row['end'])
-                        row_dict['channels'] = row['channels']
-                        if (row['comments']):
-                            row_dict['comments'] = row['comments']
-                        else:
-                            row_dict['comments'] = 'no comment'
-                        active_field_list.append(row_dict)
-
-                    available_field_list = []
-                    for idx, row in instr_available_df.iterrows():
-                        row_dict = {}
-                        row_dict['begin date'] = format_date(row['start'])
-                        row_dict['end date'] = format_date(row['end'])
-                        row_dict['channels'] = row['channels']
-                        available_field_list.append(row_dict)
-
-                    sat_dict['available'] = available_field_list
-                    sat_dict['active'] = active_field_list
-
-                    if self.record_type == 'channel':
-                        output_ext_name = '_channel_info.yaml'
-                    elif self.record_type == 'level':
-                        output_ext_name = '_level_info.yaml'
-                    else:
-                        self.logger.abort(f'Record type {self.record_type} not supported. \
-                                     Use channel or level')
-
-                    with open(output_dir + '/' + instr + '_' + sat + output_ext_name, 'w') as file:
-                        yaml.dump(sat_dict, file)
+        for (sat, instr), instr_active_df in self.active_df.groupby(['sat', 'instr'], sort=True):
+
+            compare_name = instr+'_'+sat
+            if compare_name not in observation_list:
+                continue
+
+            active_field_list = []
+            for row in instr_active_df.to_dict('records'):
+                row_dict = {}
+                row_dict['begin date'] = format_date(row['start'])
+                row_dict['end date'] = format_date(row['end'])
+                row_dict['channels'] = row['channels'].tolist()
+                if (row['comments']):
+                    row_dict['comments'] = row['comments']
+                else:
+                    row_dict['comments'] = 'no comment'
+                active_field_list.append(row_dict)
+
+            available_field_list = []
+            for row in available_records.get((sat, instr), []):
+                row_dict = {}
+                row_dict['begin date'] = format_date(row['start'])
+                row_dict['end date'] = format_date(row['end'])
+                row_dict['channels'] = row['channels'].tolist()
+                available_field_list.append(row_dict)
+
+            sat_dict = {}
+            sat_dict['available'] = available_field_list
+            sat_dict['active'] = active_field_list
+
+            with open(output_dir + '/' + instr + '_' + sat + output_ext_name, 'w') as file:
+                dump_yaml(sat_dict, file)
+
+            observation_dicts[compare_name] = sat_dict
+
+        # Write the compiled index of the channel records, used by get_channels
+        if self.record_type == 'channel':
+            write_records_index(output_dir, observation_dicts)
@@ -1,9 +1,9 @@
 import os
-import yaml
 import subprocess
 from pathlib import Path
 import importlib.resources
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import load_yaml
 
 
 def get_pinned_vers_path() -> Path:
@@ -18,7 +18,7 @@ def check_hashes(jedi_bundle_loc: str, logger: Logger) -> None:
     pinned_vers_path = get_pinned_vers_path()
     # Loaded pinned_versions into dict
     with open(pinned_vers_path) as stream:
-        pinned_vers = yaml.safe_load(stream)
+        pinned_vers = load_yaml(stream)
 
     incorrect_hash = []
     for repo_dict in pinned_vers:
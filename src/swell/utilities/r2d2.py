@@ -8,6 +8,9 @@
 
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Tuple
 
 from swell.swell_path import get_swell_path
 from swell.utilities.jinja2 import template_string_jinja2
@@ -56,3 +59,127 @@ def create_r2d2_config(
 
 
 # ----------------------------------------------------------------------------------------------
+
+
+class R2D2TransferPool:
+
+    """
+    Runs R2D2 transfers (fetch or store) concurrently using a bounded pool of worker threads.
+
+    Each transfer is added with the name of the group it belongs to (e.g. the observation type).
+    Running the pool yields each group name as soon as all the transfers belonging to that group
+    have completed, so that the caller can process the group while other transfers are in flight.
+    Failed transfers are retried and the task is aborted if a transfer fails on every attempt.
+    The progress of the transfers and the overall throughput are logged as they complete.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        max_workers: int = 8,
+        max_attempts: int = 3,
+        retry_wait: float = 5.0
+    ) -> None:
+
+        self.logger = logger
+        self.max_workers = max(1, int(max_workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_wait = retry_wait
+
+        # List of (group, transfer function, transfer arguments)
+        self.transfers = []
+
+    # ----------------------------------------------------------------------------------------------
+
+    def add(self, group: str, transfer: Callable, **kwargs) -> None:
+
+        self.transfers.append((group, transfer, kwargs))
+
+    # ----------------------------------------------------------------------------------------------
+
+    def transfer_with_retry(self, transfer: Callable, kwargs: dict) -> Tuple[int, float]:
+
+        # File being transferred, for logging
+        transfer_file = kwargs.get('target_file', kwargs.get('source_file'))
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                start_time = time.perf_counter()
+                transfer(**kwargs)
+                transfer_time = time.perf_counter() - start_time
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                self.logger.info(f'R2D2 transfer of {transfer_file} failed on attempt {attempt} ' +
+                                 f'of {self.max_attempts} with: {e}. Retrying.')
+                time.sleep(self.retry_wait * attempt)
+
+        # Size of the file transferred (fetched file or stored source file)
+        transfer_size = 0
+        if transfer_file is not None and os.path.isfile(transfer_file):
+            transfer_size = os.path.getsize(transfer_file)
+
+        return transfer_size, transfer_time
+
+    # ----------------------------------------------------------------------------------------------
+
+    def run(self) -> Iterator[str]:
+
+        # Number of outstanding transfers for each group
+        remaining = {}
+        for group, _, _ in self.transfers:
+            remaining[group] = remaining.get(group, 0) + 1
+
+        number_of_transfers = len(self.transfers)
+        self.logger.info(f'Running {number_of_transfers} R2D2 transfers using ' +
+                         f'{self.max_workers} workers')
+
+        # Progress of the transfers
+        completed = 0
+        total_size = 0
+        start_time = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {}
+            for group, transfer, kwargs in self.transfers:
+                future = executor.submit(self.transfer_with_retry, transfer, kwargs)
+                futures[future] = (group, kwargs)
+
+            for future in as_completed(futures):
+                group, kwargs = futures[future]
+                try:
+                    transfer_size, transfer_time = future.result()
+                except Exception as e:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.logger.abort(f'R2D2 transfer for {group} failed after ' +
+                                      f'{self.max_attempts} attempts. Transfer arguments: ' +
+                                      f'{kwargs}. Error: {e}')
+
+                completed += 1
+                total_size += transfer_size
+                transfer_file = kwargs.get('target_file', kwargs.get('source_file'))
+                self.logger.info(f'R2D2 transfer {completed} of {number_of_transfers} done: ' +
+                                 f'{transfer_file} ({transfer_size/1.0e6:.1f} MB in ' +
+                                 f'{transfer_time:.2f} seconds)')
+
+                # Once every transfer of the group is done hand the group back to the caller
+                remaining[group] -= 1
+                if remaining[group] == 0:
+                    yield group
+
+        finally:
+            executor.shutdown(wait=True)
+
+        # Overall throughput of the transfers
+        elapsed_time = time.perf_counter() - start_time
+        self.logger.info(f'Completed {completed} R2D2 transfers of {total_size/1.0e6:.1f} MB in ' +
+                         f'{elapsed_time:.2f} seconds ' +
+                         f'({total_size/1.0e6/max(elapsed_time, 1.0e-6):.1f} MB/s)')
+
+        # Clear the transfers so the pool can be reused
+        self.transfers = []
+
+
+# --------------------------------------------------------------------------------------------------
@@ -7,14 +7,25 @@
 # --------------------------------------------------------------------------------------------------
 
 
+import copy
+import hashlib
+import json
 import os
-import yaml
+import pickle
+import tempfile
 from typing import Union, Optional, Any
 
-from swell.utilities.jinja2 import template_string_jinja2
+from swell.utilities.jinja2 import set_bytecode_cache, template_file_jinja2, \
+                                   template_file_variables
 from swell.utilities.get_channels import get_channels
 from swell.utilities.logger import Logger
 from swell.utilities.datetime_util import Datetime
+from swell.utilities.yaml_io import load_yaml
+
+# --------------------------------------------------------------------------------------------------
+
+# Rendered and parsed configurations, keyed by the template and the values it references
+rendered_configs = {}
 
 # --------------------------------------------------------------------------------------------------
 
@@ -28,7 +39,9 @@ class JediConfigRendering():
         experiment_id: str,
         cycle_dir: Optional[str],
         cycle_time: Optional[Datetime],
-        jedi_interface: Optional[str] = None
+        jedi_interface: Optional[str] = None,
+        template_cache_dir: Optional[str] = None,
+        rendered_cache_dir: Optional[str] = None
     ) -> None:
 
         # Keep a copy of the logger
@@ -41,6 +54,13 @@ class JediConfigRendering():
         self.jedi_config_path = os.path.join(experiment_root, experiment_id, 'configuration',
                                              'jedi')
 
+        # Optionally share the compiled templates with the other tasks of the experiment
+        if template_cache_dir is not None:
+            set_bytecode_cache(template_cache_dir)
+
+        # Optional directory where rendered configurations are shared with the other tasks
+        self.rendered_cache_dir = rendered_cache_dir
+
         # Fields needed for get_active_channels
         self.cycle_time = None
 
@@ -154,6 +174,23 @@ class JediConfigRendering():
 
     # ----------------------------------------------------------------------------------------------
 
+    # Key identifying a rendering of config_file: the template and the template values it uses
+    def __rendered_config_key__(self, config_file: str) -> str:
+
+        # Only the values that the template references affect the result
+        referenced_values = {key: self.__template_dict__[key]
+                             for key in sorted(template_file_variables(config_file))
+                             if key in self.__template_dict__}
+
+        config_file_stat = os.stat(config_file)
+        key_inputs = [os.path.abspath(config_file), config_file_stat.st_mtime_ns,
+                      config_file_stat.st_size, referenced_values]
+
+        return hashlib.sha256(json.dumps(key_inputs, sort_keys=True,
+                                         default=str).encode()).hexdigest()
+
+    # ----------------------------------------------------------------------------------------------
+
     # Open the file at the provided path, use dictionary to complete templates and return dictionary
     def __open_file_render_to_dict__(self, config_file: str) -> dict[Any, Any]:
 
@@ -161,16 +198,45 @@ class JediConfigRendering():
         self.logger.assert_abort(os.path.exists(config_file), f'In open_file_and_render failed ' +
                                  f'to find file \'{config_file}\'')
 
-        # Open file as a string
-        with open(config_file, 'r') as config_file_open:
-            config_file_str_templated = config_file_open.read()
+        # Identical renderings are only done once, by this process or by an earlier task
+        rendered_config_key = self.__rendered_config_key__(config_file)
+
+        if rendered_config_key not in rendered_configs:
+
+            rendered_cache_file = None
+            if self.rendered_cache_dir is not None:
+                rendered_cache_file = os.path.join(self.rendered_cache_dir,
+                                                   f'{rendered_config_key}.pickle')
 
-        # Fill templates in the configuration file using the config
-        config_file_str = template_string_jinja2(self.logger, config_file_str_templated,
-                                                 self.__template_dict__)
+            if rendered_cache_file is not None and os.path.exists(rendered_cache_file):
 
-        # Convert string to dictionary
-        return yaml.safe_load(config_file_str)
+                with open(rendered_cache_file, 'rb') as rendered_cache_file_open:
+                    config_dict = pickle.load(rendered_cache_file_open)
+
+            else:
+
+                # Fill templates in the configuration file using the config (the compiled
+                # template is cached and only recompiled when the file changes)
+                config_file_str = template_file_jinja2(self.logger, config_file,
+                                                       self.__template_dict__)
+
+                # Convert string to dictionary
+                config_dict = load_yaml(config_file_str)
+
+                # Share with later tasks, writing to a temporary file first so that a task never
+                # reads a partially written file
+                if rendered_cache_file is not None:
+                    os.makedirs(self.rendered_cache_dir, 0o755, exist_ok=True)
+                    with tempfile.NamedTemporaryFile('wb', dir=self.rendered_cache_dir,
+                                                     delete=False) as rendered_cache_file_open:
+                        pickle.dump(config_dict, rendered_cache_file_open,
+                                    protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(rendered_cache_file_open.name, rendered_cache_file)
+
+            rendered_configs[rendered_config_key] = config_dict
+
+        # Callers are free to modify the dictionary they receive
+        return copy.deepcopy(rendered_configs[rendered_config_key])
 
     # ----------------------------------------------------------------------------------------------
 
@@ -213,17 +279,8 @@ class JediConfigRendering():
 
     # ----------------------------------------------------------------------------------------------
 
-    # Prepare path to interface observations file and call rendering
-    def render_interface_observations(self, config_name: str) -> dict:
-
-        # Assert that there is a jedi interface associated with the task
-        self.logger.assert_abort(self.jedi_interface is not None, f'In order to render a ' +
-                                 f'jedi interface config file the task must have an associated' +
-                                 f'jedi interface.')
-
-        # Path to configuration file
-        config_file = os.path.join(self.jedi_config_path, 'interfaces', self.jedi_interface,
-                                   'observations', f'{config_name}.yaml')
+    # Add the available and active channels of an observation to the template dictionary
+    def __add_observation_channels__(self, config_name: str) -> None:
 
         # Check that the self.observing_system_records_path was set
         if self.observing_system_records_path is not None:
@@ -245,11 +302,51 @@ class JediConfigRendering():
                 self.__template_dict__[f'{new_config_name}_avail_channels'] = avail_channels
                 self.__template_dict__[f'{new_config_name}_active_channels'] = active_channels
 
+    # ----------------------------------------------------------------------------------------------
+
+    # Path to an interface observations file
+    def __interface_observations_file__(self, config_name: str) -> str:
+
+        # Assert that there is a jedi interface associated with the task
+        self.logger.assert_abort(self.jedi_interface is not None, f'In order to render a ' +
+                                 f'jedi interface config file the task must have an associated' +
+                                 f'jedi interface.')
+
+        return os.path.join(self.jedi_config_path, 'interfaces', self.jedi_interface,
+                            'observations', f'{config_name}.yaml')
+
+    # ----------------------------------------------------------------------------------------------
+
+    # Prepare path to interface observations file and call rendering
+    def render_interface_observations(self, config_name: str) -> dict:
+
+        # Path to configuration file
+        config_file = self.__interface_observations_file__(config_name)
+
+        # Add the channels of the observation to the template dictionary
+        self.__add_observation_channels__(config_name)
+
         # Render templates in file and return dictionary
         return self.__open_file_render_to_dict__(config_file)
 
     # ----------------------------------------------------------------------------------------------
 
+    # Render the interface observations files of a list of observations at once. The channels of
+    # all the observations are added first so every file is rendered from the same template
+    # dictionary. Returns a dictionary of the rendered dictionaries keyed by observation.
+    def render_interface_observations_batch(self, config_names: list[str]) -> dict[str, dict]:
+
+        config_files = {config_name: self.__interface_observations_file__(config_name)
+                        for config_name in config_names}
+
+        for config_name in config_names:
+            self.__add_observation_channels__(config_name)
+
+        return {config_name: self.__open_file_render_to_dict__(config_file)
+                for config_name, config_file in config_files.items()}
+
+    # ----------------------------------------------------------------------------------------------
+
     # Prepare path to interface metadata file and call rendering
 
     def render_interface_meta(self, model_component_in: Union[str, dict, None] = None) -> dict:
@@ -9,13 +9,14 @@
 
 
 import os
-import netCDF4 as nc
 from typing import Optional
 import datetime
 
 from swell.utilities.shell_commands import run_track_log_subprocess
 from swell.utilities.logger import Logger
-from swell.tasks.base.task_base import JediConfigRendering
+from swell.utilities.obs_manifest import add_to_manifest, manifest_entry, obs_file_locations, \
+    obs_files_metadata, obs_output_file
+from swell.utilities.render_jedi_interface_files import JediConfigRendering
 
 # --------------------------------------------------------------------------------------------------
 
@@ -27,22 +28,53 @@ def check_obs(
     cycle_time: Optional[str]
 ) -> bool:
 
-    use_observation = False
-
-    # Check if file exists
-    # --------------------
+    # Check if file exists and the number of locations is nonzero. The number of locations comes
+    # from the observation manifest of the cycle when the file has not changed since it was added.
+    # -------------------------------------------------------------------------------------------
     filename = obs_dict['obs space']['obsdatain']['engine']['obsfile']
-    if os.path.exists(filename):
+    nlocs = obs_file_locations(filename)
+
+    return nlocs is not None and nlocs > 0
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def check_obs_batch(
+    path_to_observing_sys_yamls: Optional[str],
+    obs_dicts: dict,
+    cycle_time: Optional[str]
+) -> dict:
 
-        # Open file and check if number of location dimension is nonzero
-        # --------------------------------------------------------------
-        dataset = nc.Dataset(filename, 'r')
+    '''
+        Function applies check_obs to a dictionary of observation dictionaries (keyed by
+        observation) and returns whether each observation is used. The directories holding the
+        observation files are listed once rather than testing each file, and only files that are
+        present and not already in the observation manifest are opened.
+    '''
 
-        for dim_name, dim in dataset.dimensions.items():
-            if dim_name == 'Location' and dim.size > 0:
-                use_observation = True
+    directory_listings = {}
+    filenames = {}
 
-    return use_observation
+    for observation, obs_dict in obs_dicts.items():
+
+        filename = obs_dict['obs space']['obsdatain']['engine']['obsfile']
+        directory, basename = os.path.split(filename)
+
+        if directory not in directory_listings:
+            try:
+                directory_listings[directory] = set(os.listdir(directory or '.'))
+            except OSError:
+                directory_listings[directory] = set()
+
+        if basename in directory_listings[directory]:
+            filenames[observation] = filename
+
+    # Metadata of all the files, with one read and update of the manifest per directory
+    metadata = obs_files_metadata(list(set(filenames.values())))
+
+    return {observation: observation in filenames and metadata[filenames[observation]]['nlocs'] > 0
+            for observation in obs_dicts}
 
 
 # --------------------------------------------------------------------------------------------------
@@ -85,25 +117,63 @@ def jedi_dictionary_iterator(
             elif 'SPECIAL' in value:
                 value_special = value.replace('SPECIAL', '')
                 if value_special == 'observations':
-                    observations = []
-                    obs_list = obs.copy()
-                    for ob in obs_list:
-                        obs_dict = jedi_rendering.render_interface_observations(ob)
-                        use_observation = check_obs(jedi_rendering.observing_system_records_path,
-                                                    ob, obs_dict, cycle_time)
-                        if use_observation:
-                            observations.append(obs_dict)
-                        else:
-                            # Remove observation from obs list passed into function
-                            obs.remove(ob)
-                    jedi_config_dict[key] = observations
+                    obs_dicts = jedi_rendering.render_interface_observations_batch(obs)
+                    use_observations = check_obs_batch(
+                        jedi_rendering.observing_system_records_path, obs_dicts, cycle_time)
+                    # Remove unused observations from obs list passed into function
+                    obs[:] = [ob for ob in obs if use_observations[ob]]
+                    jedi_config_dict[key] = [obs_dicts[ob] for ob in obs]
 
                 elif value_special == 'model' and window_type == '4D':
                     model_dict = jedi_rendering.render_interface_model(jedi_forecast_model)
                     jedi_config_dict[key] = model_dict
 
 
-# ----------------------------------------------------------------------------------------------
+# --------------------------------------------------------------------------------------------------
+
+
+def obs_output_files(jedi_config_dict: dict) -> list:
+
+    # File names of all the obsdataout in a JEDI configuration
+    output_files = []
+
+    for key, value in jedi_config_dict.items():
+        if key == 'obsdataout' and isinstance(value, dict) and 'engine' in value:
+            output_files.append(value['engine']['obsfile'])
+        elif isinstance(value, dict):
+            output_files += obs_output_files(value)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    output_files += obs_output_files(item)
+
+    return output_files
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def record_obs_output_files(logger: Logger, jedi_config_dict: dict) -> None:
+
+    '''
+        Function adds the files written by the JEDI executable for each obsdataout to the
+        observation manifest, so that the tasks using them (SaveObsDiags, EvaObservations) get
+        the name of the file, which may have a _0000 suffix, without looking for it.
+    '''
+
+    entries = {}
+    for filename in obs_output_files(jedi_config_dict):
+        output_file = obs_output_file(filename, use_manifest=False)
+        if output_file is None:
+            logger.info(f'No observation file was written for {filename}')
+            continue
+        entries[filename] = manifest_entry(output_file, 'diag', checksum=False, probe=False)
+        entries[filename]['file'] = os.path.basename(output_file)
+
+    add_to_manifest(entries)
+
+
+# --------------------------------------------------------------------------------------------------
 
 
 def run_executable(
@@ -12,12 +12,12 @@ import glob
 import os
 import random
 import string
-import yaml
 
 # swell imports
 from swell.swell_path import get_swell_path
 from swell.utilities.logger import Logger
 from swell.utilities.case_switching import snake_case_to_camel_case
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -43,7 +43,7 @@ def tq_dicts(tempdir: str):
     if os.path.exists(destination_yaml):
         with open(destination_yaml, 'r') as ymlfile:
             question_dict_str = ymlfile.read()
-        question_dict = yaml.safe_load(question_dict_str)
+        question_dict = load_yaml(question_dict_str)
     else:
         question_dict = {}
         question_dict_str = ''
@@ -128,7 +128,7 @@ def tq_dicts(tempdir: str):
         # Create dictionary one at a time and write
         dict_to_write = {}
         dict_to_write[key] = value
-        dict_to_write_str = dict_to_write_str + yaml.dump(dict_to_write, default_flow_style=False)
+        dict_to_write_str = dict_to_write_str + dump_yaml(dict_to_write, default_flow_style=False)
         dict_to_write_str = dict_to_write_str + '\n'
 
     # Check whether the string of the new dictionary matches the existing one.
@@ -11,12 +11,12 @@
 import os
 import random
 import string
-import yaml
 from typing import Union
 
 # swell imports
 from swell.swell_path import get_swell_path
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import dump_yaml, load_yaml
 
 
 # --------------------------------------------------------------------------------------------------
@@ -33,7 +33,7 @@ def create_jedi_tq_dicts(
     if jedi_tq_dicts_str_in == '':
         jedi_tq_dicts = {}
     else:
-        jedi_tq_dicts = yaml.safe_load(jedi_tq_dicts_str_in)
+        jedi_tq_dicts = load_yaml(jedi_tq_dicts_str_in)
 
     # Create string that will hold the new dictionaries
     jedi_tq_dicts_str = ''
@@ -73,7 +73,7 @@ def create_jedi_tq_dicts(
                     jedi_tq_dict[tq] = jedi_tq_dicts[tq]
 
                 # Add dictionary to the output dictionary
-                jedi_tq_dicts_str = jedi_tq_dicts_str + yaml.dump(jedi_tq_dict,
+                jedi_tq_dicts_str = jedi_tq_dicts_str + dump_yaml(jedi_tq_dict,
                                                                   default_flow_style=False)
                 jedi_tq_dicts_str = jedi_tq_dicts_str + '\n'
 
@@ -95,7 +95,7 @@ def create_platform_tq_dicts(
     if platform_tq_dicts_str_in == '':
         platform_tq_dicts = {}
     else:
-        platform_tq_dicts = yaml.safe_load(platform_tq_dicts_str_in)
+        platform_tq_dicts = load_yaml(platform_tq_dicts_str_in)
 
     # Create string that will hold the new dictionaries
     platform_tq_dicts_str = ''
@@ -124,7 +124,7 @@ def create_platform_tq_dicts(
                 platform_tq_dict[tq] = platform_tq_dicts[tq]
 
             # Add dictionary to the output dictionary
-            platform_tq_dicts_str = platform_tq_dicts_str + yaml.dump(platform_tq_dict,
+            platform_tq_dicts_str = platform_tq_dicts_str + dump_yaml(platform_tq_dict,
                                                                       default_flow_style=False)
             platform_tq_dicts_str = platform_tq_dicts_str + '\n'
 
@@ -146,7 +146,7 @@ def tq_dicts_defaults(tempdir: str) -> int:
     # Read input file into dictionary
     if os.path.exists(task_questions_config):
         with open(task_questions_config, 'r') as ymlfile:
-            tq_dicts = yaml.safe_load(ymlfile)
+            tq_dicts = load_yaml(ymlfile)
     else:
         logger.abort(f'Did not fine the task questions dictionary at {task_questions_config}')
 
@@ -10,13 +10,13 @@ import importlib
 import os
 import platform as pltfrm
 import re
-import yaml
 from typing import Union
 
 from importlib import resources
 from logging import Logger as pyLogger
 
 from swell.utilities.logger import Logger
+from swell.utilities.yaml_io import load_yaml
 
 
 def prepare_scheduling_dict(
@@ -41,7 +41,7 @@ def prepare_scheduling_dict(
 
     logger.info(f'Loading SLURM user configuration for the "{platform}" platform')
     with resources.open_text(path_import, 'slurm.yaml') as yaml_file:
-        global_defaults = yaml.safe_load(yaml_file)
+        global_defaults = load_yaml(yaml_file)
 
     # Hard-coded SLURM defaults for certain tasks
     # -------------------------------------------
@@ -223,7 +223,7 @@ def slurm_global_defaults(
     if os.path.exists(yaml_path):
         logger.info(f"Loading SLURM user configuration from {yaml_path}")
         with open(yaml_path, "r") as yaml_file:
-            user_globals = yaml.safe_load(yaml_file)
+            user_globals = load_yaml(yaml_file)
     return user_globals
 
 
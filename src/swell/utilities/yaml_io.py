@@ -0,0 +1,64 @@
+# (C) Copyright 2021- United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+import yaml
+from typing import Any, IO, Optional, Union
+
+# Use the libyaml based loader and dumper when PyYAML was built with them. They produce the same
+# objects and text as the pure Python versions but are many times faster on large JEDI configs.
+# Both are the safe versions so that dumps never contain Python specific tags.
+# -------------------------------------------------------------------------------------------------
+try:
+    from yaml import CSafeLoader as Loader
+    from yaml import CSafeDumper as Dumper
+except ImportError:
+    from yaml import SafeLoader as Loader
+    from yaml import SafeDumper as Dumper
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def load_yaml(stream: Union[str, bytes, IO]) -> Any:
+
+    """
+    Parse a YAML string or open file, equivalent to yaml.safe_load.
+    """
+
+    return yaml.load(stream, Loader=Loader)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def load_yaml_file(file: str) -> Any:
+
+    """
+    Open and parse a YAML file.
+    """
+
+    with open(file, 'r') as file_open:
+        return load_yaml(file_open)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def dump_yaml(data: Any, stream: Optional[IO] = None, **kwargs: Any) -> Optional[str]:
+
+    """
+    Serialize data as YAML, equivalent to yaml.safe_dump. When no stream is given the YAML string
+    is returned.
+    """
+
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)
+
+
+# --------------------------------------------------------------------------------------------------